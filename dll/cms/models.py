@@ -1,7 +1,7 @@
-import random
-
+from django.conf import settings
 from django.contrib.sites.models import Site
 from django.db.models import TextField
+from django.utils.decorators import method_decorator
 from django.utils.functional import cached_property
 from meta.views import Meta
 from wagtail.admin.edit_handlers import FieldPanel, StreamFieldPanel
@@ -14,7 +14,9 @@ from dll.cms.blocks import (
     MultiElementBlock,
     SideBySideBlock,
 )
-from dll.content.models import TeachingModule, Trend, Tool, Content, Potential
+from dll.content.models import Trend, Potential
+from dll.content.utils import get_random_content
+from dll.general.cache import cache_public_response
 
 
 class DllPageMixin:
@@ -114,6 +116,10 @@ class BlockPage(DllPageMixin, Page):
         verbose_name_plural = "Block Pages"
 
 
+@method_decorator(
+    cache_public_response("content", "cms", timeout=settings.FRONTPAGE_CACHE_TIMEOUT),
+    name="serve",
+)
 class Frontpage(DllPageMixin, Page):
     body = StreamField(
         [
@@ -139,41 +145,32 @@ class Frontpage(DllPageMixin, Page):
 
     def get_context(self, request, *args, **kwargs):
         ctx = super(Frontpage, self).get_context(request, *args, **kwargs)
-        content_pks = []
         site = Site.objects.get_current(request)
-        try:
-            if site.id == 1:
-                content_pks += random.choices(
-                    TeachingModule.objects.published().values_list("pk", flat=True), k=2
-                )
-                content_pks += random.choices(
-                    Trend.objects.published().values_list("pk", flat=True), k=2
-                )
-                content_pks += random.choices(
-                    Tool.objects.published().values_list("pk", flat=True), k=2
-                )
-            elif site.id == 2:
-                content_pks += random.choices(
-                    Tool.objects.published().values_list("pk", flat=True), k=6
-                )
-                ctx["potentials"] = zip(
-                    Potential.objects.all()[:10],
-                    [
-                        "img/icons/dlt/dlt_Potenzialkategorien_VisualisierenAnimierenSimulieren_weiß.svg",
-                        "img/icons/dlt/dlt_Potenzialkategorien_Kommunizieren_weiß.svg",
-                        "img/icons/dlt/dlt_Potenzialkategorien_InhalteTeilen_weiß.svg",
-                        "img/icons/dlt/dlt_Potenzialkategorien_Zusammenarbeiten_weiß.svg",
-                        "img/icons/dlt/dlt_Potenzialkategorien_Reflektieren_weiß.svg",
-                        "img/icons/dlt/dlt_Potenzialkategorien_StrukturierenSystematisieren_weiß.svg",
-                        "img/icons/dlt/dlt_Potenzialkategorien_TestenBewerten_weiß.svg",
-                        "img/icons/dlt/dlt_Potenzialkategorien_SpielerischLernen_weiß.svg",
-                        "img/icons/dlt/dlt_Potenzialkategorien_InhalteProduzieren_weiß.svg",
-                        "img/icons/dlt/dlt_Potenzialkategorien_ProblemeLoesen_weiß.svg",
-                    ],
-                )
-        except IndexError:
-            pass  # no content yet
-        ctx["contents"] = Content.objects.filter(pk__in=content_pks)
+        contents = []
+        if site.id == 1:
+            contents = get_random_content(
+                limit_teaching_modules=2, limit_tools=2, limit_trends=2
+            )
+        elif site.id == 2:
+            contents = get_random_content(
+                limit_teaching_modules=0, limit_tools=6, limit_trends=0
+            )
+            ctx["potentials"] = zip(
+                Potential.objects.all()[:10],
+                [
+                    "img/icons/dlt/dlt_Potenzialkategorien_VisualisierenAnimierenSimulieren_weiß.svg",
+                    "img/icons/dlt/dlt_Potenzialkategorien_Kommunizieren_weiß.svg",
+                    "img/icons/dlt/dlt_Potenzialkategorien_InhalteTeilen_weiß.svg",
+                    "img/icons/dlt/dlt_Potenzialkategorien_Zusammenarbeiten_weiß.svg",
+                    "img/icons/dlt/dlt_Potenzialkategorien_Reflektieren_weiß.svg",
+                    "img/icons/dlt/dlt_Potenzialkategorien_StrukturierenSystematisieren_weiß.svg",
+                    "img/icons/dlt/dlt_Potenzialkategorien_TestenBewerten_weiß.svg",
+                    "img/icons/dlt/dlt_Potenzialkategorien_SpielerischLernen_weiß.svg",
+                    "img/icons/dlt/dlt_Potenzialkategorien_InhalteProduzieren_weiß.svg",
+                    "img/icons/dlt/dlt_Potenzialkategorien_ProblemeLoesen_weiß.svg",
+                ],
+            )
+        ctx["contents"] = contents
         try:
             ctx["training_trend"] = Trend.objects.published().get(
                 slug="fortbildung-digitallearninglab"
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 
 import logging
 import os
+from celery.schedules import crontab
 from environs import Env
 from django.utils.translation import gettext_lazy as _
 import sentry_sdk
@@ -103,6 +104,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "dll.user.middleware.PermissionCacheMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django.contrib.flatpages.middleware.FlatpageFallbackMiddleware",
@@ -232,13 +234,15 @@ WEBPACK_LOADER = {
 
 AUTH_USER_MODEL = "user.DllUser"
 AUTHENTICATION_BACKENDS = (
-    "rules.permissions.ObjectPermissionBackend",
+    "dll.user.permissions.CachedObjectPermissionBackend",
     "django.contrib.auth.backends.ModelBackend",  # this is default
 )
 
 DEFAULT_USER_USERNAME = "TUHH"
 DEFAULT_USER_EMAIL = os.getenv("DEFAULT_USER_EMAIL")
 DEFAULT_USER_PASSWORD = os.getenv("DEFAULT_USER_PASSWORD")
+# users with more contents are retired and deleted by a background task
+RETIRE_USER_SYNC_LIMIT = env.int("RETIRE_USER_SYNC_LIMIT", 50)
 SHELL_PLUS = "bpython"  # bpython does not work on pycharm terminal. use plain
 
 TAGGIT_CASE_INSENSITIVE = True
@@ -307,6 +311,46 @@ CELERY_BROKER_URL = env(
     ),
 )
 CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER")
+CELERY_BEAT_SCHEDULE = {
+    "rebuild-content-recommendations": {
+        "task": "dll.content.tasks.rebuild_content_recommendations",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "flush-content-view-counts": {
+        "task": "dll.content.tasks.flush_content_view_counts",
+        "schedule": crontab(minute="*/10"),
+    },
+}
+
+# ---------------------- Cache --------------------
+
+CACHES = {
+    # integers are stored unpickled, so incr is atomic on the server; clear()
+    # flushes the whole database, which must not be shared with the broker
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": env(
+            "CACHE_URL",
+            default="redis://{hostname}:6379/1".format(
+                hostname=env.str("REDIS_HOSTNAME"),
+            ),
+        ),
+    },
+    # per process cache of the typeahead suggestions of hot prefixes
+    "suggest": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "suggest",
+        "TIMEOUT": 5 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 2000},
+    },
+}
+# anonymous responses of public pages, invalidated on (un)publish and config changes
+RESPONSE_CACHE_ENABLED = env.bool("RESPONSE_CACHE_ENABLED", True)
+RESPONSE_CACHE_TIMEOUT = env.int("RESPONSE_CACHE_TIMEOUT", 60 * 60)
+# the front page shows random contents, so its cached copy is short-lived
+FRONTPAGE_CACHE_TIMEOUT = env.int("FRONTPAGE_CACHE_TIMEOUT", 60)
+# views of a content detail page are counted once per visitor within this time
+VIEW_COUNT_DEDUP_TIMEOUT = env.int("VIEW_COUNT_DEDUP_TIMEOUT", 24 * 60 * 60)
 
 # ---------------------- Haystack --------------------
 
@@ -319,6 +363,18 @@ HAYSTACK_CONNECTIONS = {
     },
 }
 HAYSTACK_SIGNAL_PROCESSOR = "dll.content.signals.ContentSignalProcessor"
+# documents per Solr update request of the reindex_content command
+SEARCH_INDEX_BATCH_SIZE = 200
+# seconds within which index updates of a content are coalesced into one task
+SEARCH_INDEX_UPDATE_DELAY = env.int("SEARCH_INDEX_UPDATE_DELAY", 10)
+
+# Typeahead suggestions of the navbar search
+SUGGEST_TIMEOUT = env.float("SUGGEST_TIMEOUT", 0.3)
+SUGGEST_COUNT = 10
+
+# More like this (suggested contents on detail pages)
+MORE_LIKE_THIS_TIMEOUT = env.float("MORE_LIKE_THIS_TIMEOUT", 10.0)
+MORE_LIKE_THIS_BATCH_SIZE = 50
 
 
 # ---------------------- Django Meta --------------------
@@ -359,6 +415,15 @@ if CORS_ADD_ALLOW_HEADERS:
 
 FILE_UPLOAD_PERMISSIONS = 0o644
 
+# ---------------------- django-filer --------------------
+FILER_STORAGES = {
+    "public": {
+        "main": {
+            "UPLOAD_TO": "dll.general.storage_backends.content_addressed_upload_to",
+        },
+    },
+}
+
 THUMBNAIL_OPTIMIZE_COMMAND = {
     "png": "/usr/bin/optipng {filename}",
     "gif": "/usr/bin/optipng {filename}",
@@ -390,6 +455,8 @@ CKEDITOR_CONFIGS = {
 
 # ---------------------- Constance --------------------
 CONSTANCE_BACKEND = "constance.backends.database.DatabaseBackend"
+# keeps the config values in the cache, so reading them costs no database queries
+CONSTANCE_DATABASE_CACHE_BACKEND = "default"
 CONSTANCE_CONFIG_FIELDSETS = {
     """
     Vorgeschlagene Inhalte (Content Teaser) - Einstellungen für die 'More Like This (MLT)' Funktionalität von Solr, \
@@ -3,3 +3,17 @@ from dll.configuration.settings import *
 # remove 'haystack' from INSTALLED_APPS
 INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "haystack"]
 print("INSTALLED_APPS", INSTALLED_APPS)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "suggest": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "suggest",
+    },
+}
+# the tests of the response cache enable it explicitly
+RESPONSE_CACHE_ENABLED = False
+# the cache is not rolled back between tests
+CONSTANCE_DATABASE_CACHE_BACKEND = None
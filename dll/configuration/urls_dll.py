@@ -33,7 +33,9 @@ from dll.content.views import (
     CompetenceFilterView,
     TeachingModuleFilterView,
     TeachingModuleDataFilterView,
+    TeachingModuleFacetsView,
     ToolDataFilterView,
+    ToolFacetsView,
     TrendFilterView,
     ToolFilterView,
     TrendDataFilterView,
@@ -57,6 +59,7 @@ from dll.content.views import (
     ApproveContentView,
     DeclineContentView,
     search_view,
+    suggest_view,
     HelpTextFieldChoices,
     ImageUploadView,
     DeleteContentFileView,
@@ -198,7 +201,13 @@ urlpatterns = [
         TeachingModuleDataFilterView.as_view(),
         name="teaching-modules-data-filter",
     ),
+    path(
+        "api/unterrichtsbausteine/facets",
+        TeachingModuleFacetsView.as_view(),
+        name="teaching-modules-facets",
+    ),
     path("api/tools", ToolDataFilterView.as_view(), name="tools-data-filter"),
+    path("api/tools/facets", ToolFacetsView.as_view(), name="tools-facets"),
     path("api/trends", TrendDataFilterView.as_view(), name="trends-data-filter"),
     path("api/authors", AuthorSearchView.as_view(), name="author-search"),
     path("api/reviewers", ReviewerSearchView.as_view(), name="reviewer-search"),
@@ -290,6 +299,7 @@ urlpatterns = [
         name="trigger-list",
     ),
     path("suche", search_view, name="search"),
+    path("suche/vorschlaege", suggest_view, name="search-suggest"),
     path("testimonial", TestimonialView.as_view(), name="testimonial"),
     path("cms/", include(wagtailadmin_urls)),
     path("documents/", include(wagtaildocs_urls)),
@@ -18,10 +18,12 @@ from dll.content.views import (
     TestimonialOverview,
     ToolDetailView,
     ToolDataFilterView,
+    ToolFacetsView,
     ToolFilterView,
     ToolDetailPreviewView,
     ToolsFeed,
     search_view,
+    suggest_view,
     TrendDetailView,
     TeachingModuleDetailView,
     TestimonialView,
@@ -172,7 +174,9 @@ urlpatterns = [
     path("api/meine-inhalte", UserContentView.as_view(), name="user-contents"),
     path("api/", include(router.urls)),
     path("api/tools", ToolDataFilterView.as_view(), name="tools-data-filter"),
+    path("api/tools/facets", ToolFacetsView.as_view(), name="tools-facets"),
     path("suche", search_view, name="search"),
+    path("suche/vorschlaege", suggest_view, name="search-suggest"),
     path("cms/", include(wagtailadmin_urls)),
     path("documents/", include(wagtaildocs_urls)),
     path("shared-session/", shared_session.urls),
@@ -0,0 +1,115 @@
+import time
+
+from django.db.models import Prefetch
+from django.db.models.signals import post_delete, post_save
+
+from dll.content.models import (
+    Competence,
+    ContentFile,
+    ContentLink,
+    Potential,
+    TeachingModule,
+    Tool,
+    ToolFunction,
+    Trend,
+)
+
+# the taxonomies are edited in the admin only, other processes pick changes up
+# after this many seconds
+TAXONOMIES_TIMEOUT = 10 * 60
+
+# relations of the concrete content types rendered on their detail pages
+DETAIL_RELATIONS = {
+    TeachingModule: {
+        "select": (),
+        "prefetch": ("subjects", "school_types"),
+    },
+    Tool: {
+        "select": ("url", "data_privacy_assessment"),
+        "prefetch": ("potentials", "subjects", "applications", "operating_systems"),
+    },
+    Trend: {
+        "select": (),
+        "prefetch": (),
+    },
+}
+
+_taxonomies = None
+_taxonomies_loaded = 0
+
+
+def get_taxonomies():
+    """
+    Returns the competences, tool functions and potentials every detail page
+    shows. They are loaded once per process and reloaded after they have been
+    changed or TAXONOMIES_TIMEOUT has passed.
+    """
+    global _taxonomies, _taxonomies_loaded
+    if (
+        _taxonomies is None
+        or time.monotonic() - _taxonomies_loaded > TAXONOMIES_TIMEOUT
+    ):
+        _taxonomies = {
+            "competences": list(Competence.objects.all()),
+            "functions": list(ToolFunction.objects.all()),
+            "potentials": list(Potential.objects.all()),
+        }
+        _taxonomies_loaded = time.monotonic()
+    return _taxonomies
+
+
+def clear_taxonomies(sender, **kwargs):
+    global _taxonomies
+    _taxonomies = None
+
+
+def get_detail_queryset(queryset):
+    """
+    Adds everything the detail page of the queryset's content type renders, so
+    the page costs the same number of queries regardless of its relations.
+    """
+    relations = DETAIL_RELATIONS.get(queryset.model, {"select": (), "prefetch": ()})
+    return queryset.select_related(
+        "author", "image", *relations["select"]
+    ).prefetch_related(
+        "co_authors",
+        "competences",
+        "sub_competences",
+        Prefetch("contentlink_set", queryset=ContentLink.objects.order_by("pk")),
+        Prefetch(
+            "contentfile_set", queryset=ContentFile.objects.select_related("file")
+        ),
+        "related_content",
+        "related_content__image",
+        "related_content__competences",
+        *relations["prefetch"]
+    )
+
+
+def prepare_detail_object(obj):
+    """
+    Fills the cached relation properties of a content loaded by
+    get_detail_queryset from its prefetched relations.
+    """
+    links = obj.contentlink_set.all()
+    obj.video_links = [link for link in links if link.type == "video"]
+    obj.textual_links = [link for link in links if link.type in ("href", "literature")]
+    obj.has_tutorial_links = bool(obj.video_links or obj.textual_links)
+    obj.content_files = obj.contentfile_set.all()
+
+    related_content = obj.related_content.all()
+    obj.related_teaching_modules = [
+        content for content in related_content if isinstance(content, TeachingModule)
+    ]
+    obj.related_tools = [
+        content for content in related_content if isinstance(content, Tool)
+    ]
+    obj.related_trends = [
+        content for content in related_content if isinstance(content, Trend)
+    ]
+    return obj
+
+
+for model in (Competence, ToolFunction, Potential):
+    post_save.connect(clear_taxonomies, sender=model)
+    post_delete.connect(clear_taxonomies, sender=model)
@@ -1,14 +1,56 @@
+from django_filters.rest_framework import DjangoFilterBackend
 from haystack.backends import SQ
 from haystack.inputs import AutoQuery
 from haystack.query import SearchQuerySet
 from rest_framework.filters import BaseFilterBackend
 
+from dll.content.models import ToolApplication
+
+
+def search_terms(field, values):
+    """Builds a Solr filter query matching documents with any of the given values."""
+    terms = " OR ".join(
+        '"{}"'.format(str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for value in values
+    )
+    return f"{field}:({terms})"
+
+
+def narrow_to_terms(sqs, field, values):
+    if not values:
+        return sqs.none()
+    return sqs.narrow(search_terms(field, values))
+
+
+def narrow_to_pks(sqs, pks):
+    if not pks:
+        return sqs.none()
+    return sqs.narrow("{!terms f=django_id}" + ",".join(str(pk) for pk in pks))
+
 
 class SolrTagFilter(BaseFilterBackend):
-    def filter_queryset(self, request, queryset, view):
+    """
+    Full text filter backed by Solr. The other filters of the view are applied
+    to the search as Solr filter queries on the indexed filter attributes (see
+    ``filter_search_queryset`` of the filter backends and views); sorting and
+    pagination happen in Solr (see ``SolrSearchPagination``), so only the pks of
+    the current page are loaded from the database.
+    """
+
+    SORTING = {
+        "az": "name_sort",
+        "latest": "published",
+        "-latest": "-published",
+        "most-viewed": "-view_count",
+        "relevance": None,
+    }
+
+    BOOST_FIELDS = {"tags": 2, "name": 3}
+
+    def get_search_queryset(self, request):
         q = request.GET.get("q", "")
         if len(q) >= 3:
-            q = AutoQuery(request.GET.get("q", ""))
+            q = AutoQuery(q)
             sqs = SearchQuerySet().filter(
                 SQ(tags=q)
                 | SQ(name=q)
@@ -16,15 +58,60 @@ class SolrTagFilter(BaseFilterBackend):
                 | SQ(subjects=q)
                 | SQ(operating_systems=q)
             )
-            sqs.query.boost_fields = {"tags": 2, "name": 3}
-            pks = list(set(sqs.values_list("pk", flat=True)))
-            return queryset.filter(pk__in=pks)
-        else:
-            return queryset
+            sqs.query.boost_fields = self.BOOST_FIELDS
+            return sqs
+        return None
+
+    def narrow_search_queryset(self, request, sqs, view, exclude=None):
+        """
+        Applies the filters of ``view`` (except the backend ``exclude``) to
+        ``sqs``. Returns None if one of them can only be applied in the database.
+        """
+        view_filter = getattr(view, "filter_search_queryset", None)
+        if view_filter is None:
+            return None
+        sqs = view_filter(sqs)
+        for backend in view.filter_backends:
+            if backend in (exclude, SortingFilter) or issubclass(
+                backend, SolrTagFilter
+            ):
+                continue
+            if backend is DjangoFilterBackend:
+                if getattr(view, "filterset_class", None) or getattr(
+                    view, "filterset_fields", None
+                ):
+                    return None
+                continue
+            if not hasattr(backend, "filter_search_queryset"):
+                return None
+            sqs = backend().filter_search_queryset(request, sqs, view)
+        return sqs
+
+    def filter_queryset(self, request, queryset, view):
+        sqs = self.get_search_queryset(request)
+        if sqs is not None:
+            filtered = self.narrow_search_queryset(request, sqs, view)
+            if filtered is None:
+                # restrict the search to the database results instead
+                pks = list(queryset.values_list("pk", flat=True))
+                if not pks:
+                    return queryset.none()
+                filtered = narrow_to_pks(sqs, pks)
+            sqs = filtered
+            sorting = request.GET.get("sorting", "relevance")
+            sort_field = self.SORTING.get(sorting, "-name_sort")
+            if sort_field:
+                sqs = sqs.order_by(sort_field)
+            # cloning the query drops the boosts
+            sqs.query.boost_fields = self.BOOST_FIELDS
+            view.search_queryset = sqs
+        return queryset
 
 
 class SortingFilter(BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
+        if getattr(view, "search_queryset", None) is not None:
+            return queryset  # sorted by Solr
         sorting = request.GET.get("sorting", "az")
         if sorting == "az":
             return queryset.order_by("name")
@@ -32,108 +119,236 @@ class SortingFilter(BaseFilterBackend):
             return queryset.order_by("created")
         elif sorting == "-latest":
             return queryset.order_by("-created")
+        elif sorting == "most-viewed":
+            return queryset.order_by("-view_count", "name")
         else:
             return queryset.order_by("-name")
 
 
 class FavoriteFilter(BaseFilterBackend):
+    def get_favorite_pks(self, request):
+        return request.user.favorites.values_list("publisher_linked__pk", flat=True)
+
     def filter_queryset(self, request, queryset, view):
         favorites = request.GET.get("favorites", "false") == "true"
         if favorites:
-            return queryset.filter(
-                pk__in=request.user.favorites.values_list(
-                    "publisher_linked__pk", flat=True
-                )
-            )
+            return queryset.filter(pk__in=self.get_favorite_pks(request))
         return queryset
 
+    def filter_search_queryset(self, request, sqs, view):
+        favorites = request.GET.get("favorites", "false") == "true"
+        if favorites:
+            return narrow_to_pks(
+                sqs, [pk for pk in self.get_favorite_pks(request) if pk]
+            )
+        return sqs
+
 
 class PolymorphicAttributeFilter(BaseFilterBackend):
     query_parameter_name = None
     field_name = None
     model = None
+    # indexed field of the filter attribute, see ``filter_search_queryset``
+    search_field = None
+
+    @property
+    def lookup(self):
+        if self.model:
+            return f"{self.model}___{self.field_name}"
+        return self.field_name
+
+    @property
+    def facet_name(self):
+        """Key of the filter in the facets response."""
+        if self.query_parameter_name.endswith("[]"):
+            return self.query_parameter_name[:-2]
+        return self.query_parameter_name
 
-    def filter_queryset(self, request, queryset, view):
+    @property
+    def facet_field(self):
+        """Field of the filtered model whose values are counted as facet options."""
+        if self.field_name.endswith("__in"):
+            return self.field_name[:-4]
+        return self.field_name
+
+    def format_facet_value(self, value):
+        """Maps a facet option to the query parameter value selecting it."""
+        return value
+
+    def format_search_facet_counts(self, counts):
+        """Maps the Solr facet counts of ``search_field`` to the facet options."""
+        return {self.format_facet_value(value): count for value, count in counts}
+
+    def get_value(self, request):
         if self.query_parameter_name.endswith("[]"):
-            value = request.GET.getlist(self.query_parameter_name, None)
-        else:
-            value = request.GET.get(self.query_parameter_name, None)
+            return request.GET.getlist(self.query_parameter_name, None)
+        return request.GET.get(self.query_parameter_name, None)
+
+    def to_search_values(self, value):
+        """Maps the query parameter value to the indexed values it selects."""
+        return value if isinstance(value, list) else [value]
+
+    def filter_queryset(self, request, queryset, view):
+        value = self.get_value(request)
         if value:
-            query = {f"{self.model}___{self.field_name}": value}
-            queryset = queryset.filter(**query)
-        return queryset.distinct()
+            query = {self.lookup: value}
+            queryset = queryset.filter(**query).distinct()
+        return queryset
 
+    def filter_search_queryset(self, request, sqs, view):
+        """Applies the filter to the search results of ``SolrTagFilter``."""
+        value = self.get_value(request)
+        if value:
+            sqs = narrow_to_terms(sqs, self.search_field, self.to_search_values(value))
+        return sqs
 
-class ToolStatusFilter(PolymorphicAttributeFilter):
-    model = "Tool"
-    query_parameter_name = "status"
-    field_name = "status"
 
+class CompetenceFilter(PolymorphicAttributeFilter):
+    query_parameter_name = "competences[]"
+    field_name = "competences__pk__in"
+    search_field = "competences"
 
-class ToolApplicationFilter(PolymorphicAttributeFilter):
-    model = "Tool"
-    query_parameter_name = "applications[]"
-    field_name = "applications__name__in"
 
+class ToolFilter(PolymorphicAttributeFilter):
+    """
+    Filters tools on their denormalized ``ToolFilterIndex`` row. All tool filters share the single
+    ``filter_index`` join, so the query neither multiplies rows nor needs a ``DISTINCT``. The facet
+    counts still aggregate over the relations given by ``facet_field``.
+    """
 
-class ToolOperationSystemFilter(PolymorphicAttributeFilter):
     model = "Tool"
+
+    def filter_queryset(self, request, queryset, view):
+        value = self.get_value(request)
+        if value:
+            queryset = queryset.filter(**{self.lookup: self.to_index_value(value)})
+        return queryset
+
+    def to_index_value(self, value):
+        return value
+
+    def to_search_values(self, value):
+        return super(ToolFilter, self).to_search_values(self.to_index_value(value))
+
+
+class ToolStatusFilter(ToolFilter):
+    query_parameter_name = "status"
+    field_name = "filter_index__status"
+    facet_field = "status"
+    search_field = "status"
+
+
+class ToolApplicationFilter(ToolFilter):
+    query_parameter_name = "applications[]"
+    field_name = "filter_index__applications__overlap"
+    facet_field = "applications__name"
+    search_field = "applications"
+
+    def to_index_value(self, value):
+        # the index stores pks, so renamed applications do not leave it stale
+        return list(
+            ToolApplication.objects.filter(name__in=value).values_list("pk", flat=True)
+        )
+
+    def format_search_facet_counts(self, counts):
+        names = dict(
+            ToolApplication.objects.filter(
+                pk__in=[pk for pk, count in counts]
+            ).values_list("pk", "name")
+        )
+        facets = {}
+        for pk, count in counts:
+            if int(pk) in names:
+                name = names[int(pk)]
+                facets[name] = facets.get(name, 0) + count
+        return facets
+
+
+class ToolOperationSystemFilter(ToolFilter):
     query_parameter_name = "operatingSystems[]"
-    field_name = "operating_systems__pk__in"
+    field_name = "filter_index__operating_systems__overlap"
+    facet_field = "operating_systems__pk"
+    search_field = "operating_system_ids"
 
+    def to_index_value(self, value):
+        return [int(pk) for pk in value if pk.isdigit()]
 
-class ToolFunctionFilter(PolymorphicAttributeFilter):
-    model = "Tool"
+
+class ToolFunctionFilter(ToolOperationSystemFilter):
     query_parameter_name = "toolFunctions[]"
-    field_name = "functions__pk__in"
+    field_name = "filter_index__functions__overlap"
+    facet_field = "functions__pk"
+    search_field = "functions"
 
 
-class ToolPotentialFilter(PolymorphicAttributeFilter):
-    model = "Tool"
+class ToolPotentialFilter(ToolOperationSystemFilter):
     query_parameter_name = "potentials[]"
-    field_name = "potentials__pk__in"
+    field_name = "filter_index__potentials__overlap"
+    facet_field = "potentials__pk"
+    search_field = "potentials"
 
 
-class ToolSubjectFilter(PolymorphicAttributeFilter):
-    model = "Tool"
+class ToolSubjectFilter(ToolFilter):
     query_parameter_name = "subject"
-    field_name = "subjects"
+    field_name = "filter_index__subjects__contains"
+    facet_field = "subjects"
+    search_field = "subject_ids"
 
+    def to_index_value(self, value):
+        return [int(value)] if value.isdigit() else []
 
-class ToolDataPrivacyFilter(PolymorphicAttributeFilter):
-    model = "Tool"
+
+class ToolDataPrivacyFilter(ToolFilter):
     query_parameter_name = "dataPrivacy"
-    field_name = "dataprivacyassessment__overall"
+    field_name = "filter_index__data_privacy"
+    facet_field = "data_privacy_assessment__overall"
+    search_field = "data_privacy"
 
 
-class ToolWithCostsFilter(PolymorphicAttributeFilter):
-    model = "Tool"
+class ToolWithCostsFilter(ToolFilter):
     query_parameter_name = "withCosts"
-    field_name = "with_costs"
+    field_name = "filter_index__with_costs"
+    facet_field = "with_costs"
+    search_field = "with_costs"
+
+    VALUE_MAP = {"0": False, "1": True}
+
+    def format_facet_value(self, value):
+        return {"true": "1", "false": "0"}.get(value, value)
 
     def filter_queryset(self, request, queryset, view):
         value = request.GET.get(self.query_parameter_name)
-        VALUE_MAP = {"0": False, "1": True}
-        res = VALUE_MAP[value] if value in VALUE_MAP.keys() else None
+        res = self.VALUE_MAP[value] if value in self.VALUE_MAP.keys() else None
         if res is not None:
-            query = {f"{self.model}___{self.field_name}": res}
+            query = {self.lookup: res}
             queryset = queryset.filter(**query)
-        return queryset.distinct()
+        return queryset
+
+    def filter_search_queryset(self, request, sqs, view):
+        value = request.GET.get(self.query_parameter_name)
+        if value in self.VALUE_MAP.keys():
+            sqs = sqs.narrow(
+                f"{self.search_field}:{str(self.VALUE_MAP[value]).lower()}"
+            )
+        return sqs
 
 
 class TeachingModuleSubjectFilter(PolymorphicAttributeFilter):
     model = "TeachingModule"
     query_parameter_name = "subjects[]"
     field_name = "subjects__pk__in"
+    search_field = "subject_ids"
 
 
 class TeachingModuleStateFilter(PolymorphicAttributeFilter):
     model = "TeachingModule"
     query_parameter_name = "state"
     field_name = "state"
+    search_field = "state"
 
 
 class TeachingModuleSchoolTypeFilter(PolymorphicAttributeFilter):
     model = "TeachingModule"
     query_parameter_name = "schoolType"
     field_name = "school_types__pk__in"
+    search_field = "school_type_ids"
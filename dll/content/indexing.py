@@ -0,0 +1,154 @@
+import logging
+import multiprocessing
+
+from django.apps import apps
+from django.db import connections as db_connections
+from haystack import connections
+from haystack.constants import DJANGO_CT, DJANGO_ID
+from haystack.exceptions import SkipDocument
+from haystack.utils import get_model_ct
+
+logger = logging.getLogger("dll.content.indexing")
+
+
+def get_backend(using="default"):
+    return connections[using].get_backend()
+
+
+def get_indexes(using="default"):
+    """Returns a dict of model -> search index of all indexed models."""
+    return connections[using].get_unified_index().get_indexes()
+
+
+def prepare_documents(model_label, pks, using="default"):
+    """
+    Loads the given published contents with their relations prefetched and
+    returns their Solr documents.
+    """
+    model = apps.get_model(model_label)
+    index = connections[using].get_unified_index().get_index(model)
+    docs = []
+    for obj in index.index_queryset(using=using).filter(pk__in=pks):
+        try:
+            docs.append(index.full_prepare(obj))
+        except SkipDocument:
+            logger.debug("Indexing for object `%s` skipped", obj)
+    return docs
+
+
+def _prepare_chunk(args):
+    return prepare_documents(*args)
+
+
+def post_documents(conn, docs, boost):
+    if docs:
+        conn.add(docs, commit=False, boost=boost)
+    return len(docs)
+
+
+def get_indexed_pks(model, using="default"):
+    """Returns the pks of all documents of the given model in the Solr core."""
+    conn = get_backend(using).conn
+    query = f"{DJANGO_CT}:{get_model_ct(model)}"
+    hits = conn.search(query, fl=DJANGO_ID, rows=0).hits
+    if not hits:
+        return set()
+    results = conn.search(query, fl=DJANGO_ID, rows=hits)
+    return {int(doc[DJANGO_ID]) for doc in results.docs}
+
+
+def get_pending_update_key(model_label, pk):
+    return f"search-index:pending:{model_label}.{pk}"
+
+
+def update_document(model_label, pk, using="default"):
+    """
+    Brings the document of a single content in line with the database: published
+    contents are (re)indexed, all others are removed from the core. Returns
+    whether the content was indexed.
+    """
+    conn = get_backend(using).conn
+    docs = prepare_documents(model_label, [pk], using=using)
+    if docs:
+        index = get_indexes(using)[apps.get_model(model_label)]
+        conn.add(docs, commit=True, boost=index.get_field_weights())
+    else:
+        conn.delete(id=f"{model_label}.{pk}", commit=True)
+    return bool(docs)
+
+
+def update_documents(changes, batch_size=200, using="default"):
+    """
+    Indexes and removes the documents of many contents with batched update requests
+    and a single commit. ``changes`` maps model labels to a pair of (pks to index,
+    pks to remove).
+    """
+    conn = get_backend(using).conn
+    indexes = get_indexes(using)
+    for model_label, (pks, removed_pks) in changes.items():
+        boost = indexes[apps.get_model(model_label)].get_field_weights()
+        pks = sorted(pks)
+        for start in range(0, len(pks), batch_size):
+            docs = prepare_documents(
+                model_label, pks[start : start + batch_size], using
+            )
+            post_documents(conn, docs, boost)
+        if removed_pks:
+            conn.delete(id=[f"{model_label}.{pk}" for pk in removed_pks], commit=False)
+    conn.commit()
+
+
+def find_drift(using="default"):
+    """
+    Compares the published contents with the documents in the Solr core.
+    Returns a dict of model -> (pks missing in the core, stale pks in the core).
+    """
+    drift = {}
+    for model, index in get_indexes(using).items():
+        published = set(index.index_queryset(using=using).values_list("pk", flat=True))
+        indexed = get_indexed_pks(model, using=using)
+        drift[model] = (published - indexed, indexed - published)
+    return drift
+
+
+def reindex(batch_size=200, workers=1, using="default"):
+    """
+    Rebuilds the search index of all published contents. The pks are streamed in
+    chunks, each chunk is loaded with one query per relation and prepared (in a
+    process pool if ``workers`` > 1). Every chunk is sent as one update request,
+    documents of unpublished contents are deleted and a single commit is issued
+    at the end. Returns the number of indexed documents.
+    """
+    conn = get_backend(using).conn
+    indexed = 0
+    for model, index in get_indexes(using).items():
+        pks = list(
+            index.index_queryset(using=using)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        chunks = [
+            (model._meta.label_lower, pks[start : start + batch_size], using)
+            for start in range(0, len(pks), batch_size)
+        ]
+        boost = index.get_field_weights()
+
+        if workers > 1 and len(chunks) > 1:
+            # forked workers must not share the parent's database connections
+            db_connections.close_all()
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                for docs in pool.imap_unordered(_prepare_chunk, chunks):
+                    indexed += post_documents(conn, docs, boost)
+        else:
+            for chunk in chunks:
+                indexed += post_documents(conn, _prepare_chunk(chunk), boost)
+
+        stale = get_indexed_pks(model, using=using) - set(pks)
+        if stale:
+            conn.delete(
+                id=[f"{model._meta.label_lower}.{pk}" for pk in stale], commit=False
+            )
+        logger.info("Indexed %s documents of %s", len(pks), model._meta.label)
+
+    conn.commit()
+    return indexed
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from django.core.management import BaseCommand
+from filer import settings as filer_settings
+
+from dll.content.media import find_orphaned_blobs, find_orphaned_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the filer files of contents which are not referenced anymore and, "
+        "with --blobs, stored blobs without a filer file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list what would be deleted.",
+        )
+        parser.add_argument(
+            "--blobs",
+            action="store_true",
+            help="Also walk the public media storage for orphaned blobs.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        files = 0
+        for filer_file in find_orphaned_files():
+            self.stdout.write(f"File {filer_file.pk}: {filer_file.file.name}")
+            if not dry_run:
+                # removes the blob as well unless another filer file shares it
+                filer_file.delete()
+            files += 1
+
+        blobs = 0
+        if options["blobs"]:
+            storage = filer_settings.FILER_PUBLICMEDIA_STORAGE
+            prefix = filer_settings.FILER_STORAGES["public"]["main"]["UPLOAD_TO_PREFIX"]
+            for name in list(find_orphaned_blobs(storage, prefix)):
+                self.stdout.write(f"Blob: {name}")
+                if not dry_run:
+                    storage.delete(name)
+                blobs += 1
+
+        verb = "Found" if dry_run else "Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {files} orphaned files and {blobs} blobs.")
+        )
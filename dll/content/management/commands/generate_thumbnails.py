@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from django.core.management import BaseCommand
+
+from dll.content.models import Content
+from dll.content.tasks import generate_content_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Queues the thumbnail generation of all contents without thumbnails."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Regenerate the thumbnails of all contents with an image.",
+        )
+
+    def handle(self, *args, **options):
+        contents = Content.objects.filter(image__isnull=False)
+        if not options["all"]:
+            contents = contents.filter(thumbnails={})
+        count = 0
+        for pk, image_pk in contents.values_list("pk", "image_id").iterator():
+            generate_content_thumbnails.delay(pk, image_pk)
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Queued the thumbnails of {count} contents.")
+        )
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from dll.content.more_like_this import rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = "Recomputes the suggested contents of all published contents from Solr."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.MORE_LIKE_THIS_BATCH_SIZE,
+            help="Number of contents per MLT query.",
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        contents, count = rebuild_recommendations(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Stored {count} recommendations for {contents} contents "
+                f"in {time.monotonic() - start:.1f}s."
+            )
+        )
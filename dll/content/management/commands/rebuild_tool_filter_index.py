@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from dll.content.models import Tool, ToolFilterIndex
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the denormalized filter attributes of all published tools."
+
+    def handle(self, *args, **options):
+        tools = Tool.objects.published().prefetch_related(
+            "applications", "operating_systems", "functions", "potentials", "subjects"
+        )
+        with transaction.atomic():
+            ToolFilterIndex.objects.all().delete()
+            for tool in tools:
+                ToolFilterIndex.update_for_tool(tool)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {ToolFilterIndex.objects.count()} published tools."
+            )
+        )
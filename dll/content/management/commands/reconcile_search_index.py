@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from django.core.management import BaseCommand
+
+from dll.content.indexing import (
+    find_drift,
+    get_backend,
+    get_indexes,
+    prepare_documents,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Detects published contents missing in the Solr core and stale documents "
+        "of unpublished contents."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Index the missing contents and delete the stale documents.",
+        )
+
+    def handle(self, *args, **options):
+        conn = get_backend().conn
+        drifted = False
+        for model, (missing, stale) in find_drift().items():
+            label = model._meta.label_lower
+            if not missing and not stale:
+                continue
+            drifted = True
+            self.stdout.write(
+                f"{label}: {len(missing)} missing, {len(stale)} stale documents"
+            )
+            if options["fix"]:
+                if missing:
+                    conn.add(
+                        prepare_documents(label, missing),
+                        commit=False,
+                        boost=get_indexes()[model].get_field_weights(),
+                    )
+                if stale:
+                    conn.delete(id=[f"{label}.{pk}" for pk in stale], commit=False)
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("The search index is in sync."))
+        elif options["fix"]:
+            conn.commit()
+            self.stdout.write(self.style.SUCCESS("The search index has been fixed."))
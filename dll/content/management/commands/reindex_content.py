@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from dll.content.indexing import reindex
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the Solr index of all published contents with batched update "
+        "requests and a single commit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.SEARCH_INDEX_BATCH_SIZE,
+            help="Number of documents per update request.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of processes preparing the documents.",
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        count = reindex(batch_size=options["batch_size"], workers=options["workers"])
+        duration = time.monotonic() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {count} documents in {duration:.1f}s "
+                f"({count / max(duration, 0.001):.0f} documents/s)."
+            )
+        )
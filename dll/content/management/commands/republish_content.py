@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import datetime
+import time
+
+from django.core.management import BaseCommand
+
+from dll.content.models import TeachingModule, Tool, Trend
+from dll.content.publishing import get_published_drafts, republish_drafts
+
+CONTENT_TYPES = {
+    "teaching-module": TeachingModule,
+    "tool": Tool,
+    "trend": Trend,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Republishes the published contents, e.g. after the copying of their "
+        "relations changed. Drafts with unreviewed changes or under review are "
+        "skipped. The search index is updated once at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--type",
+            action="append",
+            choices=CONTENT_TYPES.keys(),
+            help="Only republish contents of this type (can be repeated).",
+        )
+        parser.add_argument("--site", type=int, help="Only republish this site.")
+        parser.add_argument(
+            "--modified-since",
+            type=datetime.date.fromisoformat,
+            help="Only republish drafts modified since this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=50,
+            help="Number of drafts per chunk.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes republishing the chunks.",
+        )
+
+    def handle(self, *args, **options):
+        models = [CONTENT_TYPES[name] for name in options["type"] or []]
+        pks = list(
+            get_published_drafts(
+                models=models,
+                site_id=options["site"],
+                modified_since=options["modified_since"],
+            ).values_list("pk", flat=True)
+        )
+
+        def progress(totals):
+            done = len(totals["republished"]) + totals["skipped"] + totals["failed"]
+            self.stdout.write(f"{done}/{len(pks)}")
+
+        start = time.monotonic()
+        totals = republish_drafts(
+            pks,
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            progress=progress,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Republished {len(totals['republished'])} contents in "
+                f"{time.monotonic() - start:.1f}s, skipped {totals['skipped']} "
+                f"with unreviewed changes, {totals['failed']} failed."
+            )
+        )
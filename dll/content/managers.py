@@ -1,4 +1,4 @@
-from django.db.models import Count
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
 from polymorphic.query import PolymorphicQuerySet
 
 from dll.general.managers import PublisherQuerySetMixin
@@ -22,3 +22,30 @@ class ContentQuerySet(PublisherQuerySetMixin, PolymorphicQuerySet):
 
     def order_by_number_of_coauthors(self, desc=True):
         return self.annotate(n=Count("co_authors")).order_by("-n" if desc else "n")
+
+    def editable_by(self, user):
+        """
+        Filters the contents the user authored or co-authors. The co-authorships
+        are a semi-join on the indexed user column of the co-author table, so no
+        rows are duplicated.
+        """
+        co_authored = self.model.co_authors.through.objects.filter(
+            dlluser=user.pk
+        ).values("content")
+        return self.filter(Q(author=user.pk) | Q(pk__in=co_authored))
+
+    def with_review_status(self):
+        """
+        Annotates the status of the active review (``active_review_status``) and
+        whether the content has ever been submitted (``has_reviews``), so listings
+        can derive the review status of every row without further queries.
+        """
+        from .models import Review
+
+        active_reviews = Review.objects.filter(
+            content=OuterRef("pk"), is_active=True
+        ).order_by("-modified")
+        return self.annotate(
+            active_review_status=Subquery(active_reviews.values("status")[:1]),
+            has_reviews=Exists(Review.objects.filter(content=OuterRef("pk"))),
+        )
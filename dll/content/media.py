@@ -0,0 +1,87 @@
+import logging
+
+from filer.models import File as FilerFile, Folder
+
+from dll.content.models import Content, ContentFile, TeachingModule, Tool, Trend
+
+logger = logging.getLogger("dll.content.media")
+
+
+def find_blob(sha1, is_public=True):
+    """Returns the name of an already stored blob with the given content hash."""
+    if not sha1:
+        return None
+    return (
+        FilerFile.objects.non_polymorphic()
+        .filter(sha1=sha1, is_public=is_public)
+        .exclude(file="")
+        .values_list("file", flat=True)
+        .first()
+    )
+
+
+def create_filer_file(model, uploaded_file, **kwargs):
+    """
+    Creates a filer file (or image) of an upload. If a blob with the same content is
+    stored already, the new file references it instead of storing the upload again.
+    """
+    obj = model(original_filename=uploaded_file.name, file=uploaded_file, **kwargs)
+    name = find_blob(obj.sha1, obj.is_public)
+    if name:
+        # size, hash and dimensions are the ones of the upload
+        obj._file_data_changed_hint = False
+        obj.file = name
+    obj.save()
+    return obj
+
+
+def is_image_referenced(image_pk):
+    return Content.objects.filter(image_id=image_pk).exists()
+
+
+def is_file_referenced(file_pk):
+    return ContentFile.objects.filter(file_id=file_pk).exists()
+
+
+def get_content_folders():
+    """Returns the filer folders holding the media of contents."""
+    roots = Folder.objects.filter(
+        level=0,
+        name__in=[
+            str(model._meta.verbose_name_plural)
+            for model in (TeachingModule, Tool, Trend)
+        ],
+    )
+    return Folder.objects.filter(tree_id__in=roots.values("tree_id"))
+
+
+def find_orphaned_files():
+    """
+    Returns the filer files in the content folders which neither a content nor a
+    content file references anymore.
+    """
+    return (
+        FilerFile.objects.filter(folder__in=get_content_folders())
+        .exclude(pk__in=Content.objects.filter(image__isnull=False).values("image"))
+        .exclude(pk__in=ContentFile.objects.values("file"))
+    )
+
+
+def find_orphaned_blobs(storage, directory=""):
+    """
+    Walks the storage and yields the names of blobs no filer file references.
+    Thumbnails are kept, they are managed by easy-thumbnails.
+    """
+    directories, files = storage.listdir(directory)
+    names = [f"{directory}/{name}" if directory else name for name in files]
+    referenced = set(
+        FilerFile.objects.non_polymorphic()
+        .filter(file__in=names)
+        .values_list("file", flat=True)
+    )
+    for name in names:
+        if name not in referenced:
+            yield name
+    for name in directories:
+        path = f"{directory}/{name}" if directory else name
+        yield from find_orphaned_blobs(storage, path)
@@ -0,0 +1,55 @@
+# Generated by Django 3.2.18 on 2026-10-18 15:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("content", "0036_auto_20230214_1145"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContentRecommendation",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField()),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "content",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendations",
+                        to="content.content",
+                    ),
+                ),
+                (
+                    "recommended",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommended_in",
+                        to="content.content",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="contentrecommendation",
+            index=models.Index(
+                fields=["content", "-score"], name="content_con_content_a00445_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="contentrecommendation",
+            unique_together={("content", "recommended")},
+        ),
+    ]
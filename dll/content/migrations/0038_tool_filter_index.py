@@ -0,0 +1,115 @@
+# Generated by Django 3.2.18 on 2026-10-18 15:31
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+import django_better_admin_arrayfield.models.fields
+
+
+def build_tool_filter_index(apps, schema_editor):
+    Tool = apps.get_model("content", "Tool")
+    ToolFilterIndex = apps.get_model("content", "ToolFilterIndex")
+    DataPrivacyAssessment = apps.get_model("content", "DataPrivacyAssessment")
+    for tool in Tool.objects.filter(publisher_is_draft=False):
+        assessment = DataPrivacyAssessment.objects.filter(tool=tool).first()
+        ToolFilterIndex.objects.create(
+            tool=tool,
+            status=tool.status,
+            with_costs=tool.with_costs,
+            data_privacy=assessment.overall if assessment else None,
+            applications=list(tool.applications.values_list("name", flat=True)),
+            operating_systems=list(tool.operating_systems.values_list("pk", flat=True)),
+            functions=list(tool.functions.values_list("pk", flat=True)),
+            potentials=list(tool.potentials.values_list("pk", flat=True)),
+            subjects=list(tool.subjects.values_list("pk", flat=True)),
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("content", "0037_content_recommendation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ToolFilterIndex",
+            fields=[
+                (
+                    "tool",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="filter_index",
+                        serialize=False,
+                        to="content.tool",
+                    ),
+                ),
+                ("status", models.CharField(max_length=7, null=True)),
+                ("with_costs", models.BooleanField(default=False)),
+                ("data_privacy", models.CharField(max_length=32, null=True)),
+                (
+                    "applications",
+                    django_better_admin_arrayfield.models.fields.ArrayField(
+                        base_field=models.CharField(max_length=50),
+                        default=list,
+                        size=None,
+                    ),
+                ),
+                (
+                    "operating_systems",
+                    django_better_admin_arrayfield.models.fields.ArrayField(
+                        base_field=models.IntegerField(), default=list, size=None
+                    ),
+                ),
+                (
+                    "functions",
+                    django_better_admin_arrayfield.models.fields.ArrayField(
+                        base_field=models.IntegerField(), default=list, size=None
+                    ),
+                ),
+                (
+                    "potentials",
+                    django_better_admin_arrayfield.models.fields.ArrayField(
+                        base_field=models.IntegerField(), default=list, size=None
+                    ),
+                ),
+                (
+                    "subjects",
+                    django_better_admin_arrayfield.models.fields.ArrayField(
+                        base_field=models.IntegerField(), default=list, size=None
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="toolfilterindex",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["applications"], name="content_too_applica_2744e7_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="toolfilterindex",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["operating_systems"], name="content_too_operati_97159c_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="toolfilterindex",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["functions"], name="content_too_functio_2d07df_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="toolfilterindex",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["potentials"], name="content_too_potenti_cba609_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="toolfilterindex",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["subjects"], name="content_too_subject_7de9cd_gin"
+            ),
+        ),
+        migrations.RunPython(build_tool_filter_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.18 on 2026-10-18 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0038_tool_filter_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Vorschaubilder'),
+        ),
+        migrations.AddField(
+            model_name='historicalcontent',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Vorschaubilder'),
+        ),
+        migrations.AddField(
+            model_name='historicalteachingmodule',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Vorschaubilder'),
+        ),
+        migrations.AddField(
+            model_name='historicaltool',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Vorschaubilder'),
+        ),
+        migrations.AddField(
+            model_name='historicaltrend',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Vorschaubilder'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.18 on 2026-10-18 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0039_content_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='publisher_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='historicalcontent',
+            name='publisher_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='historicalteachingmodule',
+            name='publisher_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='historicaltool',
+            name='publisher_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='historicaltrend',
+            name='publisher_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='testimonial',
+            name='publisher_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
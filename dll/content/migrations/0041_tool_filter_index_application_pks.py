@@ -0,0 +1,47 @@
+# Generated by Django 3.2.18 on 2026-10-18 18:02
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django_better_admin_arrayfield.models.fields
+
+
+def build_tool_filter_index_applications(apps, schema_editor):
+    ToolFilterIndex = apps.get_model("content", "ToolFilterIndex")
+    for index in ToolFilterIndex.objects.select_related("tool"):
+        index.applications = list(
+            index.tool.applications.values_list("pk", flat=True)
+        )
+        index.save(update_fields=["applications"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("content", "0040_publisher_fingerprint"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="toolfilterindex",
+            name="content_too_applica_2744e7_gin",
+        ),
+        migrations.RemoveField(
+            model_name="toolfilterindex",
+            name="applications",
+        ),
+        migrations.AddField(
+            model_name="toolfilterindex",
+            name="applications",
+            field=django_better_admin_arrayfield.models.fields.ArrayField(
+                base_field=models.IntegerField(), default=list, size=None
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="toolfilterindex",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["applications"], name="content_too_applica_2744e7_gin"
+            ),
+        ),
+        migrations.RunPython(
+            build_tool_filter_index_applications, migrations.RunPython.noop
+        ),
+    ]
@@ -6,6 +6,7 @@ from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import JSONField
 from django.contrib.postgres.fields import IntegerRangeField
+from django.contrib.postgres.indexes import GinIndex
 from django.contrib.sites.models import Site
 from django.core.files import File
 from django.db import models, IntegrityError, transaction
@@ -36,6 +37,7 @@ from wagtail.snippets.models import register_snippet
 
 from .managers import ContentQuerySet
 from dll.general.models import DllSlugField, PublisherModel
+from dll.general.publisher import clone_objects, copy_m2m, copy_tags
 from dll.user.utils import (
     get_default_tuhh_user,
 )
@@ -49,6 +51,14 @@ from ..general.managers import PublisherQuerySet
 
 logger = logging.getLogger("dll.content.models")
 
+LIST_THUMBNAIL_OPTIONS = {"size": (300, 300), "crop": True}
+# thumbnails generated for every content image, each also as a webp variant
+CONTENT_THUMBNAIL_OPTIONS = {
+    "list": LIST_THUMBNAIL_OPTIONS,
+    "detail": {"size": (750, 500), "upscale": True},
+    "detail_2x": {"size": (1500, 1000)},
+    "og": {"size": (1200, 630), "crop": True},
+}
 
 LICENCE_CHOICES = (
     (0, _("CC0")),
@@ -145,6 +155,9 @@ class Content(ModelMeta, RulesModelMixin, PublisherModel, PolymorphicModel):
     image = FilerImageField(
         on_delete=models.SET_NULL, null=True, verbose_name=_("Anzeigebild"), blank=True
     )
+    thumbnails = JSONField(
+        _("Vorschaubilder"), default=dict, blank=True, editable=False
+    )
     teaser = models.TextField(
         max_length=140, verbose_name=_("Teaser"), null=True, blank=True
     )
@@ -185,6 +198,8 @@ class Content(ModelMeta, RulesModelMixin, PublisherModel, PolymorphicModel):
         inherit=True, history_change_reason_field=models.TextField(null=True)
     )
 
+    fingerprint_exclude = ("created", "modified", "view_count", "thumbnails", "image")
+
     _metadata = {
         "title": "name",
         "description": "teaser",
@@ -349,56 +364,63 @@ class Content(ModelMeta, RulesModelMixin, PublisherModel, PolymorphicModel):
             Review.objects.create(content=self, is_active=True, submitted_by=by_user)
         self.send_content_submitted_mail(by_user=by_user)
 
+    def get_relation_fingerprint_data(self):
+        data = super(Content, self).get_relation_fingerprint_data()
+        data["image"] = self.image_id
+        # the public version links the public versions of the related contents
+        data["related_content"] = sorted(
+            Content.objects.published()
+            .filter(publisher_draft__in=self.related_content.all())
+            .values_list("pk", flat=True)
+        )
+        data["links"] = list(
+            self.contentlink_set.order_by("pk").values_list("url", "name", "type")
+        )
+        data["files"] = list(
+            self.contentfile_set.order_by("pk").values_list("title", "file_id")
+        )
+        return data
+
     def copy_relations(self, draft_instance, public_instance):
-        # image
+        # the public version shares the image with the draft
         super(Content, self).copy_relations(draft_instance, public_instance)
-        if draft_instance.image:
-            public_image = draft_instance.image
-            public_image.pk = None
-            public_image.id = None
-            file_name, extension = os.path.splitext(public_image.label)
-            file_name += " (public)"
-            public_image.name = file_name + extension
-            public_image.save()
-            public_instance.image = public_image
-            public_instance.save()
-
-        # co-authors
-        public_instance.co_authors.add(*draft_instance.co_authors.all())
+        if public_instance.image_id and not public_instance.thumbnails:
+            public_instance.schedule_thumbnails()
+
+        # co-authors, competences
+        copy_m2m(draft_instance, public_instance, "co_authors")
+        copy_m2m(draft_instance, public_instance, "competences")
+        copy_m2m(draft_instance, public_instance, "sub_competences")
 
         # related content
         public_related_content = Content.objects.published().filter(
             publisher_draft__in=draft_instance.related_content.all()
         )
-        public_instance.related_content.add(*public_related_content)
-
-        # competences
-        public_instance.competences.add(*draft_instance.competences.all())
-        public_instance.sub_competences.add(*draft_instance.sub_competences.all())
+        copy_m2m(
+            draft_instance,
+            public_instance,
+            "related_content",
+            targets=public_related_content.values_list("pk", flat=True),
+        )
 
         # tags
-        public_instance.tags.add(*draft_instance.tags.all())
+        copy_tags(draft_instance, public_instance)
 
         # links and files
-        for link in draft_instance.contentlink_set.all():
-            link.pk, link.id, link.created, link.modified = None, None, None, None
-            link.content = public_instance
-            link.save()
-
-        for file in draft_instance.contentfile_set.all():
-            # create a copy of the filer file object
-            public_file = file.file
-            public_file.pk, public_file.id = None, None
-            file_name, extension = os.path.splitext(public_file.label)
-            file_name += " (public)"
-            public_file.name = file_name + extension
-            public_file.save()
-
-            # create a new instance of the ContentFile object
-            file.pk, file.id, file.created, file.modified = None, None, None, None
-            file.file = public_file
-            file.content = public_instance
-            file.save()
+        clone_objects(
+            draft_instance.contentlink_set.all(),
+            created=None,
+            modified=None,
+            content=public_instance,
+        )
+
+        # the content files share their filer files with the draft
+        clone_objects(
+            draft_instance.contentfile_set.all(),
+            created=None,
+            modified=None,
+            content=public_instance,
+        )
 
     def suggest_related_content(self):
         """Suggested related content based on Solr results"""
@@ -409,7 +431,13 @@ class Content(ModelMeta, RulesModelMixin, PublisherModel, PolymorphicModel):
 
     def update_or_add_image_from_path(self, path, update=False, image_name=None):
         base = self.base_folder or custom_slugify(self.name)
-        if self.image:
+        # the public version might share the image
+        if (
+            self.image
+            and not Content.objects.filter(image_id=self.image_id)
+            .exclude(pk=self.pk)
+            .exists()
+        ):
             self.image.delete()
         base_folder, created = Folder.objects.get_or_create(
             name=self.__class__._meta.verbose_name_plural, level=0
@@ -489,15 +517,40 @@ class Content(ModelMeta, RulesModelMixin, PublisherModel, PolymorphicModel):
                     )
 
     def get_image(self):
-        if self.image is not None:
-            try:
-                thumbnailer = get_thumbnailer(self.image)
-                thumb = thumbnailer.get_thumbnail({"size": (300, 300), "crop": True})
-                return thumb.url
-            except InvalidImageFormatError:
-                return None
-        else:
+        if self.image is None:
+            return None
+        if "og" in self.thumbnails:
+            return self.thumbnails["og"]
+        return self.get_thumbnail_url("list")
+
+    def get_thumbnail_url(self, alias):
+        """
+        Returns the url of a thumbnail of the image (see CONTENT_THUMBNAIL_OPTIONS),
+        or None if it has not been generated yet.
+        """
+        if self.image is None:
             return None
+        if alias in self.thumbnails:
+            return self.thumbnails[alias]
+        # thumbnails are generated by a task, never while rendering a page
+        try:
+            thumbnailer = get_thumbnailer(self.image)
+            thumb = thumbnailer.get_thumbnail(
+                CONTENT_THUMBNAIL_OPTIONS[alias], generate=False
+            )
+        except InvalidImageFormatError:
+            return None
+        return thumb.url if thumb else None
+
+    def schedule_thumbnails(self):
+        """Generates the thumbnails of the image after the transaction commits."""
+        from dll.content.tasks import generate_content_thumbnails
+
+        if self.image_id:
+            pk, image_pk = self.pk, self.image_id
+            transaction.on_commit(
+                lambda: generate_content_thumbnails.delay(pk, image_pk)
+            )
 
     @cached_property
     def content_files(self):
@@ -661,8 +714,8 @@ class TeachingModule(Content):
 
     def copy_relations(self, draft_instance, public_instance):
         super(TeachingModule, self).copy_relations(draft_instance, public_instance)
-        public_instance.subjects.add(*draft_instance.subjects.all())
-        public_instance.school_types.add(*draft_instance.school_types.all())
+        copy_m2m(draft_instance, public_instance, "subjects")
+        copy_m2m(draft_instance, public_instance, "school_types")
 
     def get_absolute_url(self):
         return reverse(
@@ -846,12 +899,29 @@ class Tool(Content):
     def get_review_url(self):
         return reverse("review-tool", kwargs={"slug": self.slug})
 
+    def get_relation_fingerprint_data(self):
+        data = super(Tool, self).get_relation_fingerprint_data()
+        data["url"] = list(
+            ToolLink.objects.filter(tool=self).values_list("url", "name")
+        )
+        assessment_fields = [
+            field.attname
+            for field in DataPrivacyAssessment._meta.concrete_fields
+            if field.name not in ("id", "tool", "created", "modified")
+        ]
+        data["data_privacy_assessment"] = (
+            DataPrivacyAssessment.objects.filter(tool=self)
+            .values(*assessment_fields)
+            .first()
+        )
+        return data
+
     def copy_relations(self, draft_instance, public_instance):
         super(Tool, self).copy_relations(draft_instance, public_instance)
-        public_instance.operating_systems.add(*draft_instance.operating_systems.all())
-        public_instance.applications.add(*draft_instance.applications.all())
-        public_instance.functions.add(*draft_instance.functions.all())
-        public_instance.potentials.add(*draft_instance.potentials.all())
+        copy_m2m(draft_instance, public_instance, "operating_systems")
+        copy_m2m(draft_instance, public_instance, "applications")
+        copy_m2m(draft_instance, public_instance, "functions")
+        copy_m2m(draft_instance, public_instance, "potentials")
         try:
             assessment = draft_instance.data_privacy_assessment
             assessment.pk = None
@@ -1666,6 +1736,78 @@ class Favorite(TimeStampedModel):
         unique_together = ("user", "content")
 
 
+class ContentRecommendation(models.Model):
+    """Precomputed 'more like this' result, shown as suggested contents on detail pages.
+
+    Like favorites, both relations refer to the draft versions of the contents, so recommendations survive
+    republishing. They are recomputed by ``dll.content.tasks.update_content_recommendations`` once a published
+    content is indexed and by the
+    ``rebuild_recommendations`` management command.
+    """
+
+    content = models.ForeignKey(
+        Content, on_delete=models.CASCADE, related_name="recommendations"
+    )
+    recommended = models.ForeignKey(
+        Content, on_delete=models.CASCADE, related_name="recommended_in"
+    )
+    score = models.FloatField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("content", "recommended")
+        indexes = [models.Index(fields=["content", "-score"])]
+
+
+class ToolFilterIndex(models.Model):
+    """Denormalized filter attributes of a published tool.
+
+    The tool filters are answered from this single table (array overlap/containment on GIN indexes) instead of
+    joining every M2M relation. Rows are written on publish and removed together with the public tool.
+    """
+
+    tool = models.OneToOneField(
+        Tool, on_delete=models.CASCADE, primary_key=True, related_name="filter_index"
+    )
+    status = models.CharField(max_length=7, null=True)
+    with_costs = models.BooleanField(default=False)
+    data_privacy = models.CharField(max_length=32, null=True)
+    applications = ArrayField(models.IntegerField(), default=list)
+    operating_systems = ArrayField(models.IntegerField(), default=list)
+    functions = ArrayField(models.IntegerField(), default=list)
+    potentials = ArrayField(models.IntegerField(), default=list)
+    subjects = ArrayField(models.IntegerField(), default=list)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["applications"]),
+            GinIndex(fields=["operating_systems"]),
+            GinIndex(fields=["functions"]),
+            GinIndex(fields=["potentials"]),
+            GinIndex(fields=["subjects"]),
+        ]
+
+    @classmethod
+    def update_for_tool(cls, tool):
+        try:
+            data_privacy = tool.data_privacy_assessment.overall
+        except DataPrivacyAssessment.DoesNotExist:
+            data_privacy = None
+        return cls.objects.update_or_create(
+            tool=tool,
+            defaults={
+                "status": tool.status,
+                "with_costs": tool.with_costs,
+                "data_privacy": data_privacy,
+                "applications": [a.pk for a in tool.applications.all()],
+                "operating_systems": [o.pk for o in tool.operating_systems.all()],
+                "functions": [f.pk for f in tool.functions.all()],
+                "potentials": [p.pk for p in tool.potentials.all()],
+                "subjects": [s.pk for s in tool.subjects.all()],
+            },
+        )[0]
+
+
 class Potential(TimeStampedModel, VideoEmbedMixin):
     name = models.CharField(max_length=100)
     description = models.CharField(verbose_name=_("Beschreibung"), max_length=600)
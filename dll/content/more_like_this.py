@@ -1,12 +1,28 @@
 import pysolr
-from environs import Env
 from constance import config
-from dll.content.models import Content
+from django.conf import settings
+from django.db import transaction
 
+from dll.content.models import Content, ContentRecommendation
 
-def more_like_this(content):
-    content_str = f"content.{content.type}.{content.pk}".replace("-", "")
+_solr = None
+
+
+def get_solr():
+    """
+    Returns the module wide Solr client. pysolr keeps a requests session, so
+    connections are reused across MLT queries.
+    """
+    global _solr
+    if _solr is None:
+        _solr = pysolr.Solr(
+            settings.HAYSTACK_CONNECTIONS["default"]["URL"],
+            timeout=settings.MORE_LIKE_THIS_TIMEOUT,
+        )
+    return _solr
 
+
+def get_mlt_params():
     def mlt_append(use: bool, name: str, boost: float, mlt_fl, mlt_qf):
         if use:
             mlt_fl.append(name)
@@ -57,54 +73,130 @@ def more_like_this(content):
         mlt_fl, mlt_qf = mlt_append(
             parameter["use"], parameter["name"], parameter["boost"], mlt_fl, mlt_qf
         )
-    mlt_fl = ",".join(mlt_fl)
-    mlt_qf = " ".join(mlt_qf)
 
-    env = Env()
-    solr = pysolr.Solr(
-        f"http://{env.str('SOLR_HOSTNAME')}:8983/solr/dll-default", always_commit=True
-    )
-    response = solr.search(
-        q=f"id:{content_str}",
-        **{
-            "fl": "*,score",
-            # Common Parameters for MoreLikeThis
-            "mlt.fl": mlt_fl,
-            "mlt.mintf": 1,
-            "mlt.mindf": 1,
-            # "mlt.maxdf": 1,
-            "mlt.minwl": 4,
-            # "mlt.maxwl": 25,
-            "mlt.maxqt": 1000,
-            "mlt.maxntp": 100,
-            "mlt.boost": "true",
-            "mlt.qf": mlt_qf,
-            # Parameters for the MoreLikeThisComponent
-            "mlt": "true",
-            "mlt.count": config.MORE_LIKE_THIS_COUNT,
-            # Parameters for the MoreLikeThisHandler
-            "mlt.match.include": "false",
-            "mlt.match.offset": 0,
-            "mlt.interestingTerms": "none",  # "none" / "details"
-        },
-    )
+    return {
+        "fl": "*,score",
+        # Common Parameters for MoreLikeThis
+        "mlt.fl": ",".join(mlt_fl),
+        "mlt.mintf": 1,
+        "mlt.mindf": 1,
+        # "mlt.maxdf": 1,
+        "mlt.minwl": 4,
+        # "mlt.maxwl": 25,
+        "mlt.maxqt": 1000,
+        "mlt.maxntp": 100,
+        "mlt.boost": "true",
+        "mlt.qf": " ".join(mlt_qf),
+        # Parameters for the MoreLikeThisComponent
+        "mlt": "true",
+        "mlt.count": config.MORE_LIKE_THIS_COUNT,
+        # Parameters for the MoreLikeThisHandler
+        "mlt.match.include": "false",
+        "mlt.match.offset": 0,
+        "mlt.interestingTerms": "none",  # "none" / "details"
+    }
+
+
+def get_solr_id(content):
+    return f"content.{content.type}.{content.pk}".replace("-", "")
 
-    try:
-        raw = response.raw_response
-        docs = raw["moreLikeThis"][content_str]["docs"]
-        result_list = [{"django_id": d["django_id"], "score": d["score"]} for d in docs]
 
-        result_list = sorted(result_list, key=lambda k: k["score"])
+def fetch_more_like_this(contents):
+    """
+    Runs a single MLT query for a batch of published contents.
+    Returns a dict of content pk -> list of (recommended pk, score).
+    """
+    solr_ids = {get_solr_id(content): content.pk for content in contents}
+    params = dict(get_mlt_params(), rows=len(solr_ids))
+    response = get_solr().search(q=f"id:({' OR '.join(solr_ids)})", **params)
 
-        result_score_cutoff = [
-            result["django_id"]
-            for result in result_list
-            if result["score"] > config.MORE_LIKE_THIS_SCORE_CUTOFF
+    results = {}
+    for solr_id, mlt in response.raw_response.get("moreLikeThis", {}).items():
+        if solr_id not in solr_ids:
+            continue
+        results[solr_ids[solr_id]] = [
+            (int(doc["django_id"]), doc["score"])
+            for doc in mlt["docs"]
+            if doc["score"] > config.MORE_LIKE_THIS_SCORE_CUTOFF
         ]
-        mlt_polymorphic_qs = Content.objects.filter(pk__in=result_score_cutoff)
-        mlt_real_qs = mlt_polymorphic_qs.get_real_instances()
-    except Exception as e:
-        print(e)
-        return None
+    return results
 
-    return mlt_real_qs
+
+def update_recommendations(contents):
+    """
+    Recomputes the stored recommendations for the given published contents.
+    Returns the number of stored recommendations.
+    """
+    results = fetch_more_like_this(contents)
+    public_pks = set(results.keys())
+    for recommendations in results.values():
+        public_pks.update(pk for pk, score in recommendations)
+    drafts = dict(
+        Content.objects.filter(publisher_linked__in=public_pks).values_list(
+            "publisher_linked_id", "pk"
+        )
+    )
+
+    new_recommendations = [
+        ContentRecommendation(
+            content_id=drafts[content_pk],
+            recommended_id=drafts[recommended_pk],
+            score=score,
+        )
+        for content_pk, recommendations in results.items()
+        if content_pk in drafts
+        for recommended_pk, score in recommendations
+        if recommended_pk in drafts
+    ]
+    with transaction.atomic():
+        # contents missing in the response are not indexed yet, they keep their
+        # recommendations until the next update
+        ContentRecommendation.objects.filter(
+            content__publisher_linked__in=results.keys()
+        ).delete()
+        ContentRecommendation.objects.bulk_create(
+            new_recommendations, ignore_conflicts=True
+        )
+    return len(new_recommendations)
+
+
+def rebuild_recommendations(batch_size=50):
+    """
+    Recomputes the recommendations of all published contents, sending one MLT
+    query per batch. Returns the number of contents and stored recommendations.
+    """
+    ContentRecommendation.objects.filter(
+        content__publisher_linked__isnull=True
+    ).delete()
+    pks = list(Content.objects.published().order_by("pk").values_list("pk", flat=True))
+    total = 0
+    for start in range(0, len(pks), batch_size):
+        contents = Content.objects.filter(pk__in=pks[start : start + batch_size])
+        total += update_recommendations(list(contents))
+    return len(pks), total
+
+
+def more_like_this(content):
+    """Returns the stored recommendations for a (draft or published) content."""
+    if content.publisher_is_draft:
+        recommendations = ContentRecommendation.objects.filter(content=content)
+    else:
+        recommendations = ContentRecommendation.objects.filter(
+            content__publisher_linked=content
+        )
+    pks = list(
+        recommendations.filter(recommended__publisher_linked__isnull=False)
+        .order_by("-score")
+        .values_list("recommended__publisher_linked", flat=True)[
+            : config.MORE_LIKE_THIS_COUNT
+        ]
+    )
+    if not pks:
+        return []
+    contents = {
+        c.pk: c
+        for c in Content.objects.filter(pk__in=pks)
+        .select_related("image")
+        .prefetch_related("competences")
+    }
+    return [contents[pk] for pk in pks if pk in contents]
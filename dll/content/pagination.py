@@ -0,0 +1,49 @@
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from rest_framework.pagination import PageNumberPagination
+
+
+def hydrate_search_results(queryset, pks):
+    """
+    Loads the contents of the given search hits (one query per content type)
+    and returns them in the order of the hits.
+    """
+    contents = {content.pk: content for content in queryset.filter(pk__in=pks)}
+    return [contents[pk] for pk in pks if pk in contents]
+
+
+class SolrSearchPagination(PageNumberPagination):
+    """
+    Paginates the search results of ``SolrTagFilter`` in Solr, keeping the Solr
+    ordering. Without a search it behaves like ``PageNumberPagination``.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        search_queryset = getattr(view, "search_queryset", None)
+        if search_queryset is None:
+            return super(SolrSearchPagination, self).paginate_queryset(
+                queryset, request, view=view
+            )
+        results = super(SolrSearchPagination, self).paginate_queryset(
+            search_queryset, request, view=view
+        )
+        return hydrate_search_results(queryset, [int(result.pk) for result in results])
+
+
+class SearchPaginator(Paginator):
+    """
+    Paginates a ``SearchQuerySet``. The page is sliced before the hit count is read,
+    so Solr returns both with a single request.
+    """
+
+    def page(self, number):
+        try:
+            number = max(int(number), 1)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom : bottom + self.per_page])
+        if number > self.num_pages and not (
+            number == 1 and self.allow_empty_first_page
+        ):
+            raise EmptyPage("That page contains no results")
+        return self._get_page(object_list, number, self)
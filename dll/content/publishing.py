@@ -0,0 +1,119 @@
+import logging
+import multiprocessing
+
+import pysolr
+from django.conf import settings
+from django.db import connections as db_connections
+
+from dll.content.indexing import update_documents
+from dll.content.models import Content
+from dll.content.signals import defer_search_index_updates
+from dll.content.tasks import update_content_recommendations
+
+logger = logging.getLogger("dll.content.publishing")
+
+
+def get_published_drafts(models=None, site_id=None, modified_since=None):
+    """
+    Returns the drafts which have a public version and are not under review,
+    optionally filtered.
+    """
+    drafts = (
+        Content.objects.drafts()
+        .filter(publisher_linked__isnull=False)
+        .exclude(reviews__is_active=True)
+    )
+    if models:
+        drafts = drafts.instance_of(*models)
+    if site_id:
+        drafts = drafts.filter(site_id=site_id)
+    if modified_since:
+        drafts = drafts.filter(modified__date__gte=modified_since)
+    return drafts.order_by("pk")
+
+
+def republish(pks):
+    """
+    Republishes the given drafts, each in its own transaction, so that their
+    public versions are copied again (e.g. after ``copy_relations`` changed).
+    Only the reviewed state is republished: drafts which were edited since their
+    last publication or which are under review are skipped.
+    Returns the counts and a (model label, old public pk, new public pk) triple
+    of every republished content.
+    """
+    result = {"republished": [], "skipped": 0, "failed": 0}
+    drafts = (
+        Content.objects.drafts()
+        .filter(pk__in=pks, publisher_linked__isnull=False)
+        .exclude(reviews__is_active=True)
+        .order_by("pk")
+    )
+    for draft in drafts:
+        if draft.has_unpublished_changes():
+            continue
+        old_pk = draft.publisher_linked_id
+        try:
+            public = draft.publish(force=True)
+        except Exception:
+            logger.exception("Republishing content {} failed".format(draft.pk))
+            result["failed"] += 1
+            continue
+        result["republished"].append((draft._meta.label_lower, old_pk, public.pk))
+    # edited drafts and drafts which were submitted for review in the meantime
+    result["skipped"] = len(pks) - len(result["republished"]) - result["failed"]
+    return result
+
+
+def update_search_index(republished):
+    changes = {}
+    for model_label, old_pk, new_pk in republished:
+        pks, removed_pks = changes.setdefault(model_label, (set(), set()))
+        pks.add(new_pk)
+        removed_pks.add(old_pk)
+    try:
+        update_documents(changes)
+    except (IOError, pysolr.SolrError) as e:
+        logger.warning(
+            "Updating the search index failed, run reconcile_search_index: "
+            "{}".format(e)
+        )
+        return
+    # the MLT queries need the documents of the new public versions
+    pks = [new_pk for model_label, old_pk, new_pk in republished]
+    batch_size = settings.MORE_LIKE_THIS_BATCH_SIZE
+    for start in range(0, len(pks), batch_size):
+        update_content_recommendations.delay(pks[start : start + batch_size])
+
+
+def republish_drafts(pks, chunk_size=50, workers=1, progress=None):
+    """
+    Republishes the given drafts in chunks (in a process pool if ``workers`` > 1).
+    The search index is not updated per content but in bulk at the end.
+    ``progress`` is called with the totals after every chunk.
+    """
+    chunks = [
+        pks[start : start + chunk_size] for start in range(0, len(pks), chunk_size)
+    ]
+    totals = {"republished": [], "skipped": 0, "failed": 0}
+
+    def add(result):
+        totals["republished"] += result["republished"]
+        totals["skipped"] += result["skipped"]
+        totals["failed"] += result["failed"]
+        if progress:
+            progress(totals)
+
+    with defer_search_index_updates():
+        if workers > 1 and len(chunks) > 1:
+            # forked workers must not share the parent's database connections
+            db_connections.close_all()
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                for result in pool.imap_unordered(republish, chunks):
+                    add(result)
+        else:
+            for chunk in chunks:
+                add(republish(chunk))
+
+    if totals["republished"]:
+        update_search_index(totals["republished"])
+    return totals
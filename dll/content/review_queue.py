@@ -0,0 +1,79 @@
+from django.db.models import Exists, OuterRef
+
+from dll.content.models import Review, TeachingModule, Tool, Trend
+from dll.user.permissions import get_group_names
+
+BSB_REVIEWER_GROUP = "BSB-Reviewer"
+TUHH_REVIEWER_GROUP = "TUHH-Reviewer"
+
+# content types each reviewer group reviews, see rules.check_content_for_review
+REVIEWED_TYPES = {
+    BSB_REVIEWER_GROUP: (TeachingModule,),
+    TUHH_REVIEWER_GROUP: (Tool, Trend),
+}
+
+
+class ReviewerQueue:
+    """
+    The contents waiting for review as seen by one reviewer. The reviewer's
+    groups are resolved once, the active reviews of a page are loaded in bulk
+    and the capabilities of every row are derived in memory from both,
+    following the content.assign_reviewer and content.claim_review rules.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.is_superuser = user.is_active and user.is_superuser
+        groups = get_group_names(user)
+        self.reviewed_types = tuple(
+            model
+            for group, models in REVIEWED_TYPES.items()
+            if group in groups
+            for model in models
+        )
+        self.can_assign = self.is_superuser or bool(self.reviewed_types)
+        self.active_reviews = {}
+
+    def get_queryset(self, qs):
+        """Restricts the contents to those pending review the user may see."""
+        pending_reviews = Review.objects.filter(
+            content=OuterRef("pk"),
+            is_active=True,
+            status__in=[Review.NEW, Review.IN_PROGRESS],
+        )
+        qs = qs.filter(Exists(pending_reviews))
+        if self.is_superuser:
+            return qs
+        if not self.reviewed_types:
+            return qs.none()
+        return qs.instance_of(*self.reviewed_types)
+
+    def load(self, contents):
+        """Loads the active reviews and assigned reviewers of the given contents."""
+        pks = [content.pk for content in contents]
+        reviews = (
+            Review.objects.filter(content__in=pks, is_active=True)
+            .select_related("assigned_reviewer")
+            .order_by("modified")
+        )
+        self.active_reviews.update(dict.fromkeys(pks))
+        # the latest active review wins, as in Content.review
+        self.active_reviews.update({review.content_id: review for review in reviews})
+
+    def get_review(self, content):
+        if content.pk not in self.active_reviews:
+            self.load([content])
+        return self.active_reviews.get(content.pk)
+
+    def can_claim(self, content):
+        return self.is_superuser or isinstance(content, self.reviewed_types)
+
+    def can_unassign(self, content):
+        review = self.get_review(content)
+        return bool(review and review.assigned_reviewer_id == self.user.pk)
+
+    def get_reviewer(self, content):
+        review = self.get_review(content)
+        if review and review.assigned_reviewer:
+            return review.assigned_reviewer
+        return None
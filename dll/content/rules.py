@@ -1,16 +1,23 @@
 import rules
 
 from dll.content.models import Review, TeachingModule, Testimonial, Tool, Trend, Content
+from dll.user.permissions import get_group_names
 
 
 @rules.predicate
 def is_author(user, obj: Content):
-    return obj.author == user
+    return user.pk is not None and obj.author_id == user.pk
 
 
 @rules.predicate
 def is_co_author(user, obj: Content):
-    return user in obj.co_authors.all()
+    if user.pk is None:
+        return False
+    if "co_authors" in getattr(obj, "_prefetched_objects_cache", {}):
+        return user in obj.co_authors.all()
+    return Content.co_authors.through.objects.filter(
+        content=obj.pk, dlluser=user.pk
+    ).exists()
 
 
 @rules.predicate
@@ -28,9 +35,19 @@ def content_review_in_progress(user, obj: Content):
     return review_in_progress(user, review)
 
 
+def is_group_member(group):
+    """Like rules.is_group_member, with the group names cached across requests."""
+
+    @rules.predicate(f"is_group_member:{group}")
+    def fn(user):
+        return group in get_group_names(user)
+
+    return fn
+
+
 is_authenticated = rules.is_authenticated
-is_bsb_reviewer = rules.is_group_member("BSB-Reviewer")
-is_tuhh_reviewer = rules.is_group_member("TUHH-Reviewer")
+is_bsb_reviewer = is_group_member("BSB-Reviewer")
+is_tuhh_reviewer = is_group_member("TUHH-Reviewer")
 
 
 def can_assign_reviewer(user, content: Content):
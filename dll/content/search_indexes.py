@@ -1,11 +1,25 @@
 from haystack import indexes
+from haystack.fields import FacetMultiValueField
 
-from dll.content.models import Content, Tool, TeachingModule, Trend
+from dll.content.models import (
+    Content,
+    DataPrivacyAssessment,
+    Tool,
+    TeachingModule,
+    Trend,
+)
+
+# open ends of a school class range are indexed as these bounds, so range
+# queries on the school class match them
+SCHOOL_CLASS_MIN = -(10**6)
+SCHOOL_CLASS_MAX = 10**6
 
 
 class ContentIndex(indexes.SearchIndex):
     text = indexes.CharField(document=True, use_template=True)
     name = indexes.CharField(model_attr="name", boost=2)
+    name_sort = indexes.FacetCharField()
+    name_auto = indexes.EdgeNgramField(model_attr="name", stored=False)
     teaser = indexes.CharField(model_attr="teaser", boost=1.5, null=True)
     additional_info = indexes.CharField(
         model_attr="additional_info", boost=1, null=True
@@ -14,54 +28,148 @@ class ContentIndex(indexes.SearchIndex):
     tags = indexes.MultiValueField()
     authors = indexes.MultiValueField()
     published = indexes.DateTimeField(model_attr="created", null=True)
+    view_count = indexes.IntegerField(model_attr="view_count")
+
+    # filter attributes, the search results are filtered on them
+    competences = FacetMultiValueField()
+
+    # relations read by the prepare methods, loaded in bulk when indexing
+    prefetch_related_fields = ("tags", "co_authors", "competences")
 
     def get_model(self):
         return Content
 
     def index_queryset(self, using=None):
-        return self.get_model().objects.published()
+        return (
+            self.get_model()
+            .objects.published()
+            .select_related("author")
+            .prefetch_related(*self.prefetch_related_fields)
+        )
 
     def prepare_name(self, obj):
         return obj.name
 
+    def prepare_name_sort(self, obj):
+        return obj.name.lower()
+
     def prepare_tags(self, obj):
-        return list(obj.tags.values_list("name", flat=True))
+        return [tag.name for tag in obj.tags.all()]
 
     def prepare_authors(self, obj):
         """
         a list of author and all co-authors full names
         """
-        return [obj.author.full_name, *[i.full_name for i in obj.co_authors.all()]]
+        # contents of retired users without co-authors have no author
+        authors = [obj.author.full_name] if obj.author else []
+        return [*authors, *[i.full_name for i in obj.co_authors.all()]]
 
     def prepare_url(self, obj):
         instance = obj.get_real_instance()
         return instance.get_absolute_url()
 
+    def prepare_competences(self, obj):
+        return [competence.pk for competence in obj.competences.all()]
+
 
 class ToolsIndex(ContentIndex, indexes.Indexable):
     operating_systems = indexes.MultiValueField()
+    status = indexes.FacetCharField(model_attr="status", null=True)
+    with_costs = indexes.BooleanField(model_attr="with_costs")
+    data_privacy = indexes.FacetCharField(null=True)
+    applications = FacetMultiValueField()
+    operating_system_ids = FacetMultiValueField()
+    functions = FacetMultiValueField()
+    potentials = FacetMultiValueField()
+    subject_ids = FacetMultiValueField()
+
+    prefetch_related_fields = ContentIndex.prefetch_related_fields + (
+        "operating_systems",
+        "applications",
+        "functions",
+        "potentials",
+        "subjects",
+        "data_privacy_assessment",
+    )
 
     def get_model(self):
         return Tool
 
     def prepare_operating_systems(self, obj):
-        return list(obj.operating_systems.values_list("name", flat=True))
+        return [system.name for system in obj.operating_systems.all()]
+
+    def prepare_data_privacy(self, obj):
+        try:
+            return obj.data_privacy_assessment.overall
+        except DataPrivacyAssessment.DoesNotExist:
+            return None
+
+    def prepare_applications(self, obj):
+        return [application.pk for application in obj.applications.all()]
+
+    def prepare_operating_system_ids(self, obj):
+        return [system.pk for system in obj.operating_systems.all()]
+
+    def prepare_functions(self, obj):
+        return [function.pk for function in obj.functions.all()]
+
+    def prepare_potentials(self, obj):
+        return [potential.pk for potential in obj.potentials.all()]
+
+    def prepare_subject_ids(self, obj):
+        return [subject.pk for subject in obj.subjects.all()]
 
 
 class TeachingModulesIndex(ContentIndex, indexes.Indexable):
     subjects = indexes.MultiValueField()
     school_types = indexes.MultiValueField()
+    subject_ids = FacetMultiValueField()
+    school_type_ids = FacetMultiValueField()
+    state = indexes.FacetCharField(model_attr="state", null=True)
+    hybrid = indexes.BooleanField(model_attr="hybrid")
+    school_class_from = indexes.IntegerField(null=True)
+    school_class_to = indexes.IntegerField(null=True)
+
+    prefetch_related_fields = ContentIndex.prefetch_related_fields + (
+        "subjects",
+        "school_types",
+    )
 
     def get_model(self):
         return TeachingModule
 
     def prepare_school_types(self, obj):
-        return list(obj.school_types.values_list("name", flat=True))
+        return [school_type.name for school_type in obj.school_types.all()]
 
     def prepare_subjects(self, obj):
-        return list(obj.subjects.values_list("name", flat=True))
+        return [subject.name for subject in obj.subjects.all()]
+
+    def prepare_subject_ids(self, obj):
+        return [subject.pk for subject in obj.subjects.all()]
+
+    def prepare_school_type_ids(self, obj):
+        return [school_type.pk for school_type in obj.school_types.all()]
+
+    def prepare_school_class_from(self, obj):
+        """
+        The school class range is indexed as the first class and the class
+        after the last, like the database stores it.
+        """
+        if not obj.school_class or obj.school_class.isempty:
+            return None
+        lower = obj.school_class.lower
+        return SCHOOL_CLASS_MIN if lower is None else lower
+
+    def prepare_school_class_to(self, obj):
+        if not obj.school_class or obj.school_class.isempty:
+            return None
+        upper = obj.school_class.upper
+        return SCHOOL_CLASS_MAX if upper is None else upper
 
 
 class TrendsIndex(ContentIndex, indexes.Indexable):
+    language = indexes.FacetCharField(model_attr="language", null=True)
+    category = indexes.FacetCharField(model_attr="category", null=True)
+
     def get_model(self):
         return Trend
@@ -4,6 +4,7 @@ from time import strftime
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import prefetch_related_objects
 from django.template.defaultfilters import slugify
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -14,7 +15,7 @@ from rest_framework.fields import SerializerMethodField, IntegerField, CharField
 from rest_framework.relations import RelatedField
 from rest_polymorphic.serializers import PolymorphicSerializer
 
-from dll.content.utils import is_favored
+from dll.content.utils import is_favored, get_favored_pks, get_thumbnail_urls
 from dll.communication.models import CoAuthorshipInvitation
 from dll.content.fields import RangeField
 from dll.content.models import (
@@ -39,6 +40,7 @@ from dll.content.models import (
     ToolLink,
     Favorite,
     ToolFunction,
+    LIST_THUMBNAIL_OPTIONS,
 )
 from dll.general.utils import custom_slugify
 from dll.user.models import DllUser
@@ -47,6 +49,37 @@ from dll.user.models import DllUser
 logger = logging.getLogger("dll.communication.serializers")
 
 
+class ContentListBatchSerializer(serializers.ListSerializer):
+    """
+    Serializes a whole page of contents at once. Relations, thumbnails and the
+    favorites of the requesting user are loaded for all rows upfront, so the
+    number of queries does not grow with the page size.
+    """
+
+    prefetch_lookups = ["co_authors", "competences", "image"]
+
+    def to_representation(self, data):
+        iterable = data.all() if hasattr(data, "all") else data
+        contents = list(iterable)
+        self.preload(contents)
+        return [self.child.to_representation(item) for item in contents]
+
+    def preload(self, contents):
+        prefetch_related_objects(contents, *self.prefetch_lookups)
+        # contents whose thumbnails are still being generated
+        self.context["image_urls"] = get_thumbnail_urls(
+            [
+                content.image
+                for content in contents
+                if content.image_id and "list" not in content.thumbnails
+            ],
+            LIST_THUMBNAIL_OPTIONS,
+        )
+        request = self.context.get("request")
+        if request:
+            self.context["favored_pks"] = get_favored_pks(request.user)
+
+
 class ContentListSerializer(serializers.ModelSerializer):
     image = (
         serializers.SerializerMethodField()
@@ -61,6 +94,7 @@ class ContentListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Content
+        list_serializer_class = ContentListBatchSerializer
         fields = [
             "id",
             "name",
@@ -76,6 +110,11 @@ class ContentListSerializer(serializers.ModelSerializer):
         ]
 
     def get_image(self, obj):
+        if "list" in obj.thumbnails:
+            return obj.thumbnails["list"]
+        image_urls = self.context.get("image_urls", {})
+        if obj.image_id in image_urls:
+            return image_urls[obj.image_id]
         return obj.get_image()
 
     def get_co_authors(self, obj):
@@ -95,6 +134,9 @@ class ContentListSerializer(serializers.ModelSerializer):
         return obj.get_absolute_url()
 
     def get_favored(self, obj):
+        favored_pks = self.context.get("favored_pks")
+        if favored_pks is not None:
+            return obj.pk in favored_pks
         request = self.context.get("request")
         favored = False
         if request:
@@ -118,23 +160,28 @@ class ContentListInternalSerializer(ContentListSerializer):
         return obj.get_edit_url()
 
     def get_status(self, obj):
+        if hasattr(obj, "active_review_status"):
+            # see ContentQuerySet.with_review_status
+            review_status = obj.active_review_status
+            has_reviews = obj.has_reviews
+        else:
+            review = obj.review
+            review_status = review.status if review else None
+            has_reviews = obj.reviews.exists()
+
         status = _("Draft")
-        if obj.publisher_linked:
-            if obj.review:
-                if obj.review.status == Review.DECLINED:
+        if obj.publisher_linked_id:
+            if review_status is not None:
+                if review_status == Review.DECLINED:
                     return _("Approved - Resubmission declined.")
                 else:
                     return _("Approved - Resubmission pending.")
             return _("Approved")
 
-        if (
-            obj.publisher_is_draft
-            and obj.review
-            and obj.review.status == Review.DECLINED
-        ):
+        if obj.publisher_is_draft and review_status == Review.DECLINED:
             return _("Declined")
 
-        if obj.publisher_is_draft and obj.reviews.count():
+        if obj.publisher_is_draft and has_reviews:
             return _("Submitted")
 
         return status
@@ -186,6 +233,19 @@ class ContentListInvitationSerializer(ContentListInternalSerializer):
         ]
 
 
+class ReviewQueueBatchSerializer(ContentListBatchSerializer):
+    """
+    Additionally loads the active reviews of the page into the reviewer queue
+    passed in the context (see dll.content.review_queue.ReviewerQueue).
+    """
+
+    def preload(self, contents):
+        super(ReviewQueueBatchSerializer, self).preload(contents)
+        queue = self.context.get("review_queue")
+        if queue is not None:
+            queue.load(contents)
+
+
 class ContentListInternalReviewSerializer(ContentListInternalSerializer):
     review_url = SerializerMethodField(allow_null=True)
     assign_reviewer_url = SerializerMethodField(allow_null=True)
@@ -198,11 +258,18 @@ class ContentListInternalReviewSerializer(ContentListInternalSerializer):
     can_claim = serializers.SerializerMethodField(allow_null=False)
     submitted = serializers.SerializerMethodField(allow_null=True)
 
+    def get_review(self, obj):
+        queue = self.context.get("review_queue")
+        if queue is not None:
+            return queue.get_review(obj)
+        return obj.review
+
     def get_review_url(self, obj):
         return obj.get_review_url()
 
     def get_has_assigned_reviewer(self, obj):
-        return obj.has_assigned_reviewer
+        review = self.get_review(obj)
+        return bool(review and review.assigned_reviewer_id)
 
     def get_assign_reviewer_url(self, obj):
         return obj.get_assign_reviewer_url()
@@ -211,6 +278,9 @@ class ContentListInternalReviewSerializer(ContentListInternalSerializer):
         return obj.get_unassign_reviewer_url()
 
     def get_can_unassign(self, obj):
+        queue = self.context.get("review_queue")
+        if queue is not None:
+            return queue.can_unassign(obj)
         user = self.context.get("request").user
         return (
             user
@@ -221,25 +291,34 @@ class ContentListInternalReviewSerializer(ContentListInternalSerializer):
 
     def get_can_assign(self, obj):
         """Provides information whether current user can assign others as reviewers."""
+        queue = self.context.get("review_queue")
+        if queue is not None:
+            return queue.can_assign
         user = self.context.get("request").user
         return user.has_perm("content.assign_reviewer")
 
     def get_can_claim(self, obj):
         """Provides information whether current user can assign others as reviewers."""
+        queue = self.context.get("review_queue")
+        if queue is not None:
+            return queue.can_claim(obj)
         user = self.context.get("request").user
         return user.has_perm("content.claim_review", obj.review)
 
     def get_reviewer(self, obj):
-        if obj.review and obj.review.assigned_reviewer:
-            return obj.review.assigned_reviewer.full_name
+        review = self.get_review(obj)
+        if review and review.assigned_reviewer:
+            return review.assigned_reviewer.full_name
         return None
 
     def get_submitted(self, obj):
-        if obj.review and obj.review.created:
-            return obj.review.created.strftime("%d.%m.%Y")
+        review = self.get_review(obj)
+        if review and review.created:
+            return review.created.strftime("%d.%m.%Y")
         return None
 
     class Meta(ContentListInternalSerializer.Meta):
+        list_serializer_class = ReviewQueueBatchSerializer
         fields = [
             "id",
             "name",
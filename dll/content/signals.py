@@ -1,13 +1,67 @@
-from django.db import models
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
 from django.dispatch import receiver
 from haystack.signals import BaseSignalProcessor
 
-from dll.content.models import TeachingModule, Tool, Trend, Content, ContentFile
+from dll.content.models import (
+    TeachingModule,
+    Tool,
+    Trend,
+    Content,
+    ContentFile,
+    DataPrivacyAssessment,
+    Favorite,
+    Potential,
+    ToolFilterIndex,
+)
+from dll.content.indexing import get_pending_update_key
+from dll.content.media import is_file_referenced, is_image_referenced
+from dll.content.tasks import update_search_index
+from dll.content.utils import invalidate_published_pks, invalidate_tool_box
 from dll.general.signals import post_publish, post_unpublish
 import sys
 
 TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
 
+_search_index_updates_deferred = False
+
+
+@contextmanager
+def defer_search_index_updates():
+    """
+    Suppresses the index updates of single contents, the caller is responsible
+    for updating the index of the changed contents in bulk.
+    """
+    global _search_index_updates_deferred
+    previous = _search_index_updates_deferred
+    _search_index_updates_deferred = True
+    try:
+        yield
+    finally:
+        _search_index_updates_deferred = previous
+
+
+def schedule_search_index_update(instance):
+    """
+    Queues an index update for the given content once the transaction is committed.
+    Updates of the same content within SEARCH_INDEX_UPDATE_DELAY are coalesced
+    into one task, which indexes whatever state the content has by then.
+    """
+    if _search_index_updates_deferred:
+        return
+    model_label = instance._meta.label_lower
+    pk = instance.pk
+
+    def schedule():
+        delay = settings.SEARCH_INDEX_UPDATE_DELAY
+        if cache.add(get_pending_update_key(model_label, pk), 1, delay * 10):
+            update_search_index.apply_async((model_label, pk), countdown=delay)
+
+    transaction.on_commit(schedule)
+
 
 class ContentSignalProcessor(BaseSignalProcessor):
     def setup(self):
@@ -28,14 +82,68 @@ class ContentSignalProcessor(BaseSignalProcessor):
             post_unpublish.disconnect(self.handle_delete, sender=Tool)
             post_unpublish.disconnect(self.handle_delete, sender=Trend)
 
+    def handle_save(self, sender, instance, **kwargs):
+        schedule_search_index_update(instance)
+
+    def handle_delete(self, sender, instance, **kwargs):
+        schedule_search_index_update(instance)
+
 
 @receiver(models.signals.post_delete, sender=Content)
 def auto_delete_filer_image_on_delete(sender, instance, **kwargs):
     # for reasons unknown, this works without specifying the concrete sender model
-    if instance.image:
+    # draft and public version share their image, the last one deletes it
+    if instance.image_id and not is_image_referenced(instance.image_id):
         instance.image.delete()
 
 
 @receiver(models.signals.post_delete, sender=ContentFile)
 def auto_delete_filer_file_on_delete(sender, instance, **kwargs):
-    instance.file.delete()
+    # filer only deletes the blob once no other filer file references it
+    if not is_file_referenced(instance.file_id):
+        instance.file.delete()
+
+
+@receiver(post_publish, sender=Tool)
+def update_tool_filter_index_on_publish(sender, instance, **kwargs):
+    ToolFilterIndex.update_for_tool(instance)
+
+
+@receiver(models.signals.post_save, sender=DataPrivacyAssessment)
+@receiver(models.signals.post_delete, sender=DataPrivacyAssessment)
+def update_tool_filter_index_data_privacy(sender, instance, **kwargs):
+    # the assessment of a public tool can be edited in the admin without a
+    # publish; drafts have no index row, so this is a no-op for them
+    deleted = kwargs["signal"] is models.signals.post_delete
+    data_privacy = None if deleted else instance.overall
+    updated = ToolFilterIndex.objects.filter(tool_id=instance.tool_id).update(
+        data_privacy=data_privacy
+    )
+    if updated:
+        # the assessment is part of the search index document, too
+        schedule_search_index_update(Tool(pk=instance.tool_id))
+
+
+@receiver(post_publish)
+@receiver(post_unpublish)
+def invalidate_published_pks_on_publish(sender, instance, **kwargs):
+    if isinstance(instance, Content):
+        model = type(instance)
+        invalidate_published_pks(model)
+        # again after commit, a concurrent request may have cached the old pool
+        transaction.on_commit(lambda: invalidate_published_pks(model))
+
+
+@receiver(models.signals.post_save, sender=Favorite)
+@receiver(models.signals.post_delete, sender=Favorite)
+def invalidate_tool_box_on_favorite(sender, instance, **kwargs):
+    invalidate_tool_box(instance.user_id)
+
+
+@receiver(post_publish, sender=Tool)
+@receiver(post_unpublish, sender=Tool)
+@receiver(models.signals.post_save, sender=Potential)
+@receiver(models.signals.post_delete, sender=Potential)
+def invalidate_tool_boxes(sender, instance, **kwargs):
+    invalidate_tool_box()
+    transaction.on_commit(invalidate_tool_box)
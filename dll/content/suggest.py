@@ -0,0 +1,71 @@
+import hashlib
+import logging
+import re
+
+import pysolr
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger("dll.content.suggest")
+
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 50
+# characters with a meaning in the lucene query syntax
+SPECIAL_CHARACTERS = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+_solr = None
+
+
+def get_solr():
+    """
+    Returns the Solr client of the suggestions. Its short timeout is the latency
+    budget of a suggestion request.
+    """
+    global _solr
+    if _solr is None:
+        _solr = pysolr.Solr(
+            settings.HAYSTACK_CONNECTIONS["default"]["URL"],
+            timeout=settings.SUGGEST_TIMEOUT,
+        )
+    return _solr
+
+
+def normalize_prefix(prefix):
+    return " ".join(prefix.lower().split())[:MAX_PREFIX_LENGTH]
+
+
+def build_query(prefix):
+    terms = [SPECIAL_CHARACTERS.sub(r"\\\1", term) for term in prefix.split()]
+    return " AND ".join(f"name_auto:{term}" for term in terms)
+
+
+def fetch_suggestions(prefix):
+    params = {"fl": "name,url", "rows": settings.SUGGEST_COUNT}
+    if settings.SITE_ID == 2:
+        params["fq"] = "django_ct:content.tool"
+    results = get_solr().search(build_query(prefix), **params)
+    return [{"title": doc["name"], "url": doc["url"]} for doc in results.docs]
+
+
+def suggest(prefix):
+    """
+    Returns the titles and urls of the contents whose name contains words
+    starting with the words of the prefix. Results are cached per prefix, a
+    slow or failing Solr yields no suggestions instead of blocking the navbar.
+    """
+    prefix = normalize_prefix(prefix)
+    if len(prefix) < MIN_PREFIX_LENGTH:
+        return []
+    cache = caches["suggest"]
+    key = "suggest:{}:{}".format(
+        settings.SITE_ID, hashlib.md5(prefix.encode()).hexdigest()
+    )
+    suggestions = cache.get(key)
+    if suggestions is None:
+        try:
+            suggestions = fetch_suggestions(prefix)
+        except (IOError, pysolr.SolrError) as e:
+            logger.warning("Fetching suggestions failed: {}".format(e))
+            return []
+        cache.set(key, suggestions)
+    return suggestions
@@ -0,0 +1,81 @@
+import logging
+
+import pysolr
+from django.conf import settings
+from django.core.cache import cache
+from easy_thumbnails.exceptions import InvalidImageFormatError
+from filer.models import Image
+
+from dll.configuration.celery import app
+from dll.content.indexing import get_pending_update_key, update_document
+from dll.content.models import Content
+from dll.content.more_like_this import update_recommendations, rebuild_recommendations
+from dll.content.thumbnails import generate_thumbnails
+from dll.content.view_counts import flush_view_counts
+
+logger = logging.getLogger("dll.content.tasks")
+
+
+@app.task(bind=True, default_retry_delay=5 * 60, max_retries=3)
+def update_content_recommendations(self, content_pks):
+    contents = list(Content.objects.published().filter(pk__in=content_pks))
+    if not contents:
+        return
+    try:
+        count = update_recommendations(contents)
+    except pysolr.SolrError as e:
+        logger.warning("Updating recommendations failed: {}".format(e))
+        raise self.retry(exc=e)
+    logger.debug(
+        "Stored {} recommendations for {} contents".format(count, len(contents))
+    )
+
+
+@app.task
+def rebuild_content_recommendations():
+    contents, count = rebuild_recommendations(
+        batch_size=settings.MORE_LIKE_THIS_BATCH_SIZE
+    )
+    logger.info(
+        "Rebuilt recommendations for {} contents ({} recommendations)".format(
+            contents, count
+        )
+    )
+
+
+@app.task(bind=True, max_retries=5)
+def update_search_index(self, model_label, pk):
+    # updates requested from now on need a new task
+    cache.delete(get_pending_update_key(model_label, pk))
+    try:
+        indexed = update_document(model_label, pk)
+    except (IOError, pysolr.SolrError) as e:
+        logger.warning(
+            "Updating search index of {} {} failed: {}".format(model_label, pk, e)
+        )
+        raise self.retry(exc=e, countdown=30 * 2**self.request.retries)
+    # the MLT query needs the document of the content in the core
+    if indexed:
+        update_content_recommendations.delay([pk])
+
+
+@app.task(bind=True, default_retry_delay=60, max_retries=3)
+def generate_content_thumbnails(self, content_pk, image_pk):
+    image = Image.objects.filter(pk=image_pk).first()
+    if image is None:
+        return
+    try:
+        urls = generate_thumbnails(image)
+    except InvalidImageFormatError as e:
+        logger.warning("Generating thumbnails of {} failed: {}".format(image_pk, e))
+        return
+    except IOError as e:
+        raise self.retry(exc=e)
+    # the image might have been replaced in the meantime
+    Content.objects.filter(pk=content_pk, image_id=image_pk).update(thumbnails=urls)
+
+
+@app.task
+def flush_content_view_counts():
+    views = flush_view_counts()
+    logger.debug("Flushed {} content views".format(views))
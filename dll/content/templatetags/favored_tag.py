@@ -8,7 +8,11 @@ register = template.Library()
 @register.inclusion_tag("dll/includes/favorite.html", takes_context=True)
 def favored_snippet(context, content):
     request = context.get("request")
+    favored_pks = context.get("favored_pks")
     favored = False
-    if request:
+    if favored_pks is not None:
+        # lists can look up the user's favorites once (see get_favored_pks)
+        favored = content.pk in favored_pks
+    elif request:
         favored = is_favored(request.user, content)
     return {"favored": favored}
@@ -0,0 +1,12 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag
+def content_thumbnail(content, alias):
+    """
+    Returns the url of an already generated thumbnail of the content image or an
+    empty string, unlike ``{% thumbnail %}`` it never generates one.
+    """
+    return content.get_thumbnail_url(alias) or ""
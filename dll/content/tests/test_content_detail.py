@@ -0,0 +1,100 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from dll.content.detail import clear_taxonomies
+from dll.content.models import (
+    Competence,
+    ContentLink,
+    TeachingModule,
+    Tool,
+    ToolLink,
+    Trend,
+)
+from dll.content.tests.test_content_views import BaseTestCase
+
+# queries of a detail page, including session, user, menus and settings
+DETAIL_QUERY_BUDGET = 35
+
+
+class ContentDetailQueryTests(BaseTestCase):
+    fixtures = ["dll/fixtures/sites.json"]
+
+    def setUp(self):
+        super(ContentDetailQueryTests, self).setUp()
+        clear_taxonomies(Competence)
+        self.client.login(email="test+alice@blueshoe.de", password="password")
+
+    def _add_relations(self, draft, count):
+        for i in range(count):
+            competence, created = Competence.objects.get_or_create(cid=2 + i)
+            draft.competences.add(competence)
+            ContentLink.objects.create(
+                url=f"https://www.foo.org/{i}", name="Foo", type="href", content=draft
+            )
+            ContentLink.objects.create(
+                url=f"https://www.foo.org/v{i}", name="Foo", type="video", content=draft
+            )
+            for model in (Tool, TeachingModule, Trend):
+                related = model.objects.create(
+                    name=f"{model.__name__} Related {draft.pk} {i}", author=self.author
+                )
+                if model is Tool:
+                    related.url = ToolLink.objects.create(
+                        url="www.foo.bar", name="Foo", tool=related
+                    )
+                    related.save()
+                related.competences.add(competence)
+                related.publish()
+                draft.related_content.add(related)
+                related.favor(self.author)
+        draft.publish()
+        return draft.get_published()
+
+    def _get(self, public):
+        url = public.get_absolute_url()
+        # the first request loads the taxonomies and creates the settings
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def _assert_constant_queries(self, draft):
+        response, few_queries = self._get(self._add_relations(draft, 1))
+        response, many_queries = self._get(self._add_relations(draft, 3))
+        self.assertEqual(few_queries, many_queries)
+        self.assertLessEqual(many_queries, DETAIL_QUERY_BUDGET)
+        return response
+
+    def test_teaching_module_detail(self):
+        draft = TeachingModule.objects.drafts().get(name="TeachingModule Ut a")
+        response = self._assert_constant_queries(draft)
+        self.assertContains(response, "https://www.foo.org/2")
+        self.assertContains(response, f"Tool Related {draft.pk} 2")
+        self.assertContains(response, f"Trend Related {draft.pk} 2")
+        self.assertContains(response, f"TeachingModule Related {draft.pk} 2")
+
+    def test_tool_detail(self):
+        draft = Tool.objects.drafts().get(name="Tool Fusce egestas")
+        response = self._assert_constant_queries(draft)
+        self.assertContains(response, f"Tool Related {draft.pk} 2")
+        self.assertContains(response, f"TeachingModule Related {draft.pk} 2")
+
+    def test_trend_detail(self):
+        draft = Trend.objects.drafts().get(name="Trend Nullam nulla")
+        response = self._assert_constant_queries(draft)
+        self.assertContains(response, "https://www.foo.org/2")
+        self.assertContains(response, f"Tool Related {draft.pk} 2")
+
+    def test_taxonomies_are_cached(self):
+        draft = Tool.objects.drafts().get(name="Tool Fusce egestas")
+        public = self._add_relations(draft, 1)
+        response, queries = self._get(public)
+        self.assertEqual(len(response.context["competences"]), 2)
+
+        Competence.objects.create(cid=6)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(public.get_absolute_url())
+        self.assertEqual(len(ctx.captured_queries), queries + 3)
+        self.assertEqual(len(response.context["competences"]), 3)
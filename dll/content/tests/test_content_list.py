@@ -0,0 +1,77 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from dll.content.models import Competence, Content, Tool, ToolLink
+from dll.content.tests.test_content_views import BaseTestCase
+from dll.user.models import DllUser
+
+
+class ContentListQueryTests(BaseTestCase):
+    fixtures = ["dll/fixtures/sites.json"]
+
+    def setUp(self):
+        super(ContentListQueryTests, self).setUp()
+        self.co_author = DllUser.objects.create(
+            username="bob", first_name="Bob", last_name="Doe"
+        )
+        self.client.login(email="test+alice@blueshoe.de", password="password")
+
+    def _create_tools(self, count):
+        for i in range(count):
+            tool = Tool.objects.create(
+                name=f"Tool Batch {i:02d}", teaser="Lorem ipsum", author=self.author
+            )
+            tool.url = ToolLink.objects.create(url="www.foo.bar", name="Foo", tool=tool)
+            tool.save()
+            tool.co_authors.add(self.co_author)
+            tool.competences.add(self.competence)
+            tool.publish()
+            if i % 2:
+                tool.favor(self.author)
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_tool_list_query_count_is_constant(self):
+        url = reverse("tools-data-filter")
+        self._create_tools(2)
+        response, few_queries = self._get(url)
+        self.assertEqual(len(response.json()["results"]), 4)
+
+        self._create_tools(25)
+        response, many_queries = self._get(url)
+        self.assertEqual(len(response.json()["results"]), 20)
+        self.assertEqual(few_queries, many_queries)
+
+    def test_content_list_query_count_is_constant(self):
+        # oldest first, so both pages contain all three content types
+        url = reverse("public-content-list") + "?sorting=latest"
+        response, few_queries = self._get(url)
+        self.assertEqual(len(response.json()["results"]), 9)
+
+        self._create_tools(15)
+        response, many_queries = self._get(url)
+        self.assertEqual(len(response.json()["results"]), 20)
+        self.assertEqual(few_queries, many_queries)
+
+    def test_batched_fields(self):
+        self._create_tools(2)
+        response = self.client.get(reverse("tools-data-filter"), {"q": ""})
+        results = {r["name"]: r for r in response.json()["results"]}
+
+        self.assertFalse(results["Tool Batch 00"]["favored"])
+        self.assertTrue(results["Tool Batch 01"]["favored"])
+        self.assertEqual(results["Tool Batch 01"]["co_authors"], ["Bob Doe"])
+        self.assertEqual(
+            results["Tool Batch 01"]["competences"], [self.competence.to_dict()]
+        )
+        self.assertEqual(results["Tool Batch 01"]["type"], "tool")
+        public_tool = Content.objects.published().get(name="Tool Batch 01")
+        self.assertEqual(
+            results["Tool Batch 01"]["url"], public_tool.get_absolute_url()
+        )
+        self.assertIsNone(results["Tool Batch 01"]["image"])
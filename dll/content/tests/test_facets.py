@@ -0,0 +1,214 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from django.core.management import call_command
+
+from dll.content.models import (
+    DataPrivacyAssessment,
+    OperatingSystem,
+    Tool,
+    ToolApplication,
+    ToolFilterIndex,
+    ToolLink,
+)
+from dll.content.tests.test_content_views import BaseTestCase
+
+
+class ToolFacetsTests(BaseTestCase):
+    def setUp(self):
+        super(ToolFacetsTests, self).setUp()
+        self.url = reverse("tools-facets")
+        self.linux = OperatingSystem.objects.create(name="Linux")
+        self.windows = OperatingSystem.objects.create(name="Windows")
+        self.app = ToolApplication.objects.create(name="App")
+        self._create_tool("Tool A", "on", [self.linux], with_costs=True)
+        self._create_tool("Tool B", "on", [self.linux, self.windows])
+        self._create_tool("Tool C", "off", [self.windows])
+
+    def _create_tool(self, name, status, operating_systems, with_costs=False):
+        tool = Tool.objects.create(
+            name=name, status=status, with_costs=with_costs, author=self.author
+        )
+        tool.url = ToolLink.objects.create(url="www.foo.bar", name="Foo", tool=tool)
+        tool.save()
+        tool.operating_systems.add(*operating_systems)
+        tool.applications.add(self.app)
+        tool.publish()
+
+    def test_counts(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        facets = response.json()
+        self.assertEqual(facets["status"], {"on": 2, "off": 1})
+        self.assertEqual(
+            facets["operatingSystems"],
+            {str(self.linux.pk): 2, str(self.windows.pk): 2},
+        )
+        self.assertEqual(facets["applications"], {"App": 3})
+        self.assertEqual(facets["withCosts"], {"1": 1, "0": 4})
+        self.assertEqual(facets["potentials"], {})
+
+    def test_counts_respect_other_filters(self):
+        response = self.client.get(
+            self.url, {"status": "on", "operatingSystems[]": [self.windows.pk]}
+        )
+        facets = response.json()
+        # the status counts ignore the selected status, but not the os filter
+        self.assertEqual(facets["status"], {"on": 1, "off": 1})
+        self.assertEqual(
+            facets["operatingSystems"],
+            {str(self.linux.pk): 2, str(self.windows.pk): 1},
+        )
+        self.assertEqual(facets["applications"], {"App": 1})
+
+    def test_data_privacy_filter(self):
+        response = self.client.get(
+            reverse("tools-data-filter"), {"dataPrivacy": "compliant"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 0)
+
+
+class ToolFilterIndexTests(ToolFacetsTests):
+    def _names(self, params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("tools-data-filter"), params)
+        self.assertEqual(response.status_code, 200)
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn("content_tool_operating_systems", sql)
+        self.assertNotIn("DISTINCT", sql)
+        return sorted(r["name"] for r in response.json()["results"])
+
+    def test_index_written_on_publish(self):
+        tool = Tool.objects.published().get(name="Tool B")
+        index = ToolFilterIndex.objects.get(tool=tool)
+        self.assertEqual(index.status, "on")
+        self.assertEqual(index.applications, [self.app.pk])
+        self.assertEqual(
+            sorted(index.operating_systems), [self.linux.pk, self.windows.pk]
+        )
+
+        draft = Tool.objects.drafts().get(name="Tool B")
+        draft.operating_systems.remove(self.linux)
+        draft.publish()
+        tool = Tool.objects.published().get(name="Tool B")
+        self.assertEqual(tool.filter_index.operating_systems, [self.windows.pk])
+        self.assertEqual(ToolFilterIndex.objects.count(), 5)
+
+    def test_filters(self):
+        self.assertEqual(
+            self._names({"operatingSystems[]": [self.linux.pk]}), ["Tool A", "Tool B"]
+        )
+        self.assertEqual(
+            self._names(
+                {"operatingSystems[]": [self.windows.pk], "applications[]": ["App"]}
+            ),
+            ["Tool B", "Tool C"],
+        )
+        self.assertEqual(
+            self._names({"status": "on", "withCosts": "1"}),
+            ["Tool A"],
+        )
+        self.assertEqual(self._names({"applications[]": ["Other"]}), [])
+
+    def test_renamed_application(self):
+        self.app.name = "Website"
+        self.app.save()
+        self.assertEqual(
+            self._names({"applications[]": ["Website"]}), ["Tool A", "Tool B", "Tool C"]
+        )
+        self.assertEqual(self._names({"applications[]": ["App"]}), [])
+
+    def test_data_privacy_assessment_edited_without_publish(self):
+        tool = Tool.objects.published().get(name="Tool B")
+        with mock.patch(
+            "dll.content.signals.schedule_search_index_update"
+        ) as schedule_search_index_update:
+            assessment = DataPrivacyAssessment.objects.create(
+                tool=tool, overall=DataPrivacyAssessment.COMPLIANT[0]
+            )
+        self.assertEqual(schedule_search_index_update.call_args[0][0].pk, tool.pk)
+        self.assertEqual(self._names({"dataPrivacy": "compliant"}), ["Tool B"])
+        assessment.delete()
+        self.assertEqual(self._names({"dataPrivacy": "compliant"}), [])
+
+        # the assessment of a draft is only indexed on publish
+        draft = Tool.objects.drafts().get(name="Tool C")
+        DataPrivacyAssessment.objects.create(
+            tool=draft, overall=DataPrivacyAssessment.COMPLIANT[0]
+        )
+        self.assertEqual(self._names({"dataPrivacy": "compliant"}), [])
+        draft.publish()
+        self.assertEqual(self._names({"dataPrivacy": "compliant"}), ["Tool C"])
+
+    def test_rebuild_command(self):
+        ToolFilterIndex.objects.all().delete()
+        call_command("rebuild_tool_filter_index", stdout=mock.Mock())
+        self.assertEqual(ToolFilterIndex.objects.count(), 5)
+        self.assertEqual(
+            self._names({"operatingSystems[]": [self.windows.pk]}), ["Tool B", "Tool C"]
+        )
+
+
+class ToolSearchFacetsTests(ToolFacetsTests):
+    def _search_facets(self, params):
+        requests = []
+
+        def facet_counts(sqs):
+            requests.append((set(sqs.query.narrow_queries), set(sqs.query.facets)))
+            return {
+                "fields": {
+                    "status": [("on", 2), ("off", 1)],
+                    "applications": [(str(self.app.pk), 3)],
+                    "with_costs": [("true", 1), ("false", 2)],
+                }
+            }
+
+        with mock.patch(
+            "haystack.query.SearchQuerySet.facet_counts", autospec=True
+        ) as search_facet_counts, mock.patch(
+            "haystack.query.SearchQuerySet.values_list"
+        ) as values_list:
+            search_facet_counts.side_effect = facet_counts
+            response = self.client.get(self.url, {"q": "Lorem", **params})
+        self.assertEqual(response.status_code, 200)
+        values_list.assert_not_called()
+        return response.json(), requests
+
+    def test_search_counts_are_solr_facets(self):
+        facets, requests = self._search_facets({})
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(facets["status"], {"on": 2, "off": 1})
+        self.assertEqual(facets["applications"], {"App": 3})
+        self.assertEqual(facets["withCosts"], {"1": 1, "0": 2})
+        self.assertEqual(facets["potentials"], {})
+
+    def test_search_counts_ignore_own_selection(self):
+        facets, requests = self._search_facets(
+            {"status": "on", "operatingSystems[]": [self.windows.pk]}
+        )
+        self.assertEqual(len(requests), 3)
+        unselected, status, operating_systems = requests
+        os_query = f'operating_system_ids:("{self.windows.pk}")'
+        self.assertEqual(unselected[0], {'status:("on")', os_query})
+        self.assertIn("applications", unselected[1])
+        self.assertEqual(status, ({os_query}, {"status"}))
+        self.assertEqual(
+            operating_systems, ({'status:("on")'}, {"operating_system_ids"})
+        )
+
+
+class TeachingModuleFacetsTests(BaseTestCase):
+    def test_counts(self):
+        response = self.client.get(reverse("teaching-modules-facets"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.json().keys()),
+            {"subjects", "schoolType", "state", "competences"},
+        )
@@ -0,0 +1,132 @@
+from io import StringIO
+from unittest import mock
+
+import pysolr
+from celery.exceptions import Retry
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from dll.content.indexing import prepare_documents
+from dll.content.models import Tool, ToolLink
+from dll.content.signals import schedule_search_index_update
+from dll.content.tasks import update_search_index
+from dll.content.tests.test_content_views import BaseTestCase
+
+
+class ReindexTests(BaseTestCase):
+    def _backend(self, indexed_pks=()):
+        backend = mock.Mock()
+
+        def search(query, fl, rows):
+            pks = indexed_pks if query == "django_ct:content.tool" else []
+            return mock.Mock(
+                hits=len(pks), docs=[{"django_id": str(pk)} for pk in pks][:rows]
+            )
+
+        backend.conn.search.side_effect = search
+        return backend
+
+    def test_prepare_documents_query_count(self):
+        for i in range(10):
+            tool = Tool.objects.create(
+                name=f"Tool Index {i}", author=self.author, teaser="Lorem"
+            )
+            tool.url = ToolLink.objects.create(url="www.foo.bar", name="Foo", tool=tool)
+            tool.save()
+            tool.tags.add("foo", "bar")
+            tool.publish()
+        pks = list(Tool.objects.published().values_list("pk", flat=True))
+
+        with CaptureQueriesContext(connection) as ctx:
+            docs = prepare_documents("content.tool", pks)
+        self.assertEqual(len(docs), 12)
+        # tools, tags, co-authors, competences and the tool relations
+        # (operating systems, applications, functions, potentials, subjects and
+        # data privacy assessments)
+        self.assertEqual(len(ctx.captured_queries), 10)
+
+        doc = next(doc for doc in docs if doc["name"] == "Tool Index 3")
+        self.assertEqual(sorted(doc["tags"]), ["bar", "foo"])
+        self.assertEqual(doc["authors"], ["Alice Doe"])
+        self.assertEqual(
+            doc["url"],
+            Tool.objects.published().get(pk=doc["django_id"]).get_absolute_url(),
+        )
+
+    def test_reindex_command(self):
+        backend = self._backend(indexed_pks=[1234])
+        with mock.patch("dll.content.indexing.get_backend", return_value=backend):
+            call_command("reindex_content", batch_size=2, workers=1, stdout=mock.Mock())
+
+        conn = backend.conn
+        # 2 tools, 5 teaching modules and 2 trends in batches of 2
+        self.assertEqual(conn.add.call_count, 5)
+        ids = {doc["id"] for call in conn.add.call_args_list for doc in call.args[0]}
+        self.assertEqual(len(ids), 9)
+        self.assertTrue(
+            all(call.kwargs["commit"] is False for call in conn.add.call_args_list)
+        )
+        conn.delete.assert_called_once_with(id=["content.tool.1234"], commit=False)
+        conn.commit.assert_called_once_with()
+
+
+class IndexUpdateTests(BaseTestCase):
+    def setUp(self):
+        super(IndexUpdateTests, self).setUp()
+        cache.clear()
+        self.tool = Tool.objects.published().get(name="Tool Fusce egestas")
+
+    def test_updates_are_coalesced(self):
+        with mock.patch.object(update_search_index, "apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule_search_index_update(self.tool)
+                schedule_search_index_update(self.tool)
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule_search_index_update(self.tool)
+        apply_async.assert_called_once_with(
+            ("content.tool", self.tool.pk), countdown=settings.SEARCH_INDEX_UPDATE_DELAY
+        )
+
+    @mock.patch("dll.content.tasks.update_content_recommendations")
+    def test_task_indexes_current_state(self, update_recommendations):
+        backend = mock.Mock()
+        with mock.patch("dll.content.indexing.get_backend", return_value=backend):
+            update_search_index("content.tool", self.tool.pk)
+            self.assertEqual(
+                backend.conn.add.call_args.args[0][0]["name"], self.tool.name
+            )
+            update_recommendations.delay.assert_called_once_with([self.tool.pk])
+
+            self.tool.delete()
+            update_search_index("content.tool", self.tool.pk)
+            backend.conn.delete.assert_called_once_with(
+                id=f"content.tool.{self.tool.pk}", commit=True
+            )
+            update_recommendations.delay.assert_called_once()
+
+    def test_task_retries_on_solr_errors(self):
+        backend = mock.Mock()
+        backend.conn.add.side_effect = pysolr.SolrError("down")
+        with mock.patch("dll.content.indexing.get_backend", return_value=backend):
+            with mock.patch.object(
+                update_search_index, "retry", side_effect=Retry
+            ) as retry:
+                with self.assertRaises(Retry):
+                    update_search_index("content.tool", self.tool.pk)
+        self.assertEqual(retry.call_args.kwargs["countdown"], 30)
+
+    def test_reconcile_command(self):
+        backend = ReindexTests._backend(self, indexed_pks=[self.tool.pk, 1234])
+        stdout = StringIO()
+        with mock.patch("dll.content.indexing.get_backend", return_value=backend):
+            call_command("reconcile_search_index", "--fix", stdout=stdout)
+
+        self.assertIn("content.tool: 1 missing, 1 stale documents", stdout.getvalue())
+        self.assertIn("content.trend: 2 missing, 0 stale documents", stdout.getvalue())
+        backend.conn.delete.assert_called_once_with(
+            id=["content.tool.1234"], commit=False
+        )
+        backend.conn.commit.assert_called_once_with()
@@ -0,0 +1,71 @@
+from io import StringIO
+
+from django.core.files.base import ContentFile as BaseContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from filer import settings as filer_settings
+from filer.models import File as FilerFile, Image
+
+from dll.content.media import create_filer_file, find_orphaned_files
+from dll.content.models import ContentFile, TeachingModule
+from dll.content.tests.test_review_submission import BaseTestCase
+
+
+class MediaTests(BaseTestCase):
+    def _upload(self, name="upload.png"):
+        with open("dll/static/img/cc_license.png", "rb") as f:
+            upload = SimpleUploadedFile(name, f.read(), "image/png")
+        return create_filer_file(Image, upload, folder=self.content.get_folder())
+
+    def test_identical_uploads_share_their_blob(self):
+        first = self._upload()
+        second = self._upload(name="other.png")
+        self.assertNotEqual(first.pk, second.pk)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertIn(first.sha1, first.file.name)
+        self.assertEqual(second.original_filename, "other.png")
+        self.assertEqual((second.width, second.height), (first.width, first.height))
+        first.delete()
+        self.assertTrue(second.file.storage.exists(second.file.name))
+
+    def test_public_version_shares_media(self):
+        public = self.content.publish()
+        image_pk = self.content.image_id
+        file_pk = self.content.contentfile_set.get().file_id
+        self.assertEqual(public.image_id, image_pk)
+        self.assertEqual(public.contentfile_set.get().file_id, file_pk)
+
+        TeachingModule.objects.filter(pk=self.content.pk).delete()
+        self.assertTrue(Image.objects.filter(pk=image_pk).exists())
+        self.assertTrue(FilerFile.objects.filter(pk=file_pk).exists())
+
+        TeachingModule.objects.filter(pk=public.pk).delete()
+        self.assertFalse(Image.objects.filter(pk=image_pk).exists())
+        self.assertFalse(FilerFile.objects.filter(pk=file_pk).exists())
+
+    def test_orphaned_files_are_collected(self):
+        orphan = self._upload()
+        file = self._upload(name="file.png")
+        ContentFile.objects.create(file=file, title="File", content=self.content)
+        self.assertEqual(list(find_orphaned_files()), [orphan])
+
+        out = StringIO()
+        call_command("collect_orphaned_media", "--dry-run", stdout=out)
+        self.assertIn("Found 1 orphaned files", out.getvalue())
+        self.assertTrue(FilerFile.objects.filter(pk=orphan.pk).exists())
+
+        call_command("collect_orphaned_media", stdout=StringIO())
+        self.assertFalse(FilerFile.objects.filter(pk=orphan.pk).exists())
+        self.assertTrue(FilerFile.objects.filter(pk=file.pk).exists())
+        self.assertTrue(file.file.storage.exists(file.file.name))
+
+    def test_orphaned_blobs_are_listed(self):
+        storage = filer_settings.FILER_PUBLICMEDIA_STORAGE
+        name = storage.save("filer_public/orphaned/blob.txt", BaseContentFile(b"x"))
+        try:
+            out = StringIO()
+            call_command("collect_orphaned_media", "--dry-run", "--blobs", stdout=out)
+        finally:
+            storage.delete(name)
+        self.assertIn(f"Blob: {name}", out.getvalue())
+        self.assertNotIn(self.content.image.file.name, out.getvalue())
@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.core.management import call_command
+
+from dll.content.models import Content, ContentRecommendation, Tool
+from dll.content.more_like_this import (
+    get_solr_id,
+    more_like_this,
+    update_recommendations,
+)
+from dll.content.tests.test_content_views import BaseTestCase
+
+
+class MoreLikeThisTests(BaseTestCase):
+    def setUp(self):
+        super(MoreLikeThisTests, self).setUp()
+        self.tool = Tool.objects.published().get(name="Tool Fusce egestas")
+        self.other_tool = Tool.objects.published().get(name="Tool Duis leo")
+        self.trend = Content.objects.published().get(name="Trend Nullam nulla")
+
+    def _solr(self, results):
+        solr = mock.Mock()
+        solr.search.return_value.raw_response = {
+            "moreLikeThis": {
+                get_solr_id(content): {
+                    "docs": [
+                        {"django_id": str(c.pk), "score": score}
+                        for c, score in recommendations
+                    ]
+                }
+                for content, recommendations in results.items()
+            }
+        }
+        return solr
+
+    def test_update_recommendations(self):
+        solr = self._solr(
+            {
+                self.tool: [(self.trend, 160.0), (self.other_tool, 300.0)],
+                self.other_tool: [(self.tool, 10.0)],  # below score cutoff
+            }
+        )
+        with mock.patch("dll.content.more_like_this.get_solr", return_value=solr):
+            count = update_recommendations([self.tool, self.other_tool])
+
+        self.assertEqual(solr.search.call_count, 1)
+        self.assertEqual(count, 2)
+        self.assertEqual(more_like_this(self.tool), [self.other_tool, self.trend])
+        self.assertEqual(more_like_this(self.other_tool), [])
+
+    def test_recommendations_survive_republish(self):
+        solr = self._solr({self.tool: [(self.other_tool, 300.0)]})
+        with mock.patch("dll.content.more_like_this.get_solr", return_value=solr):
+            update_recommendations([self.tool])
+
+        self.other_tool.get_draft().publish()
+        republished = Tool.objects.published().get(name="Tool Duis leo")
+        self.assertNotEqual(republished.pk, self.other_tool.pk)
+        self.assertEqual(more_like_this(self.tool), [republished])
+        self.assertEqual(more_like_this(self.tool.get_draft()), [republished])
+
+    def test_unindexed_republished_content_keeps_recommendations(self):
+        solr = self._solr({self.tool: [(self.other_tool, 300.0)]})
+        with mock.patch("dll.content.more_like_this.get_solr", return_value=solr):
+            update_recommendations([self.tool])
+
+        draft = self.tool.get_draft()
+        draft.tags.add("new")
+        republished = draft.publish()
+        self.assertNotEqual(republished.pk, self.tool.pk)
+        # the new public version is not in the core yet
+        solr = self._solr({})
+        with mock.patch("dll.content.more_like_this.get_solr", return_value=solr):
+            count = update_recommendations([republished])
+
+        self.assertEqual(count, 0)
+        self.assertEqual(more_like_this(republished), [self.other_tool])
+
+    def test_rebuild_command(self):
+        solr = self._solr({self.tool: [(self.trend, 300.0)]})
+        with mock.patch("dll.content.more_like_this.get_solr", return_value=solr):
+            call_command("rebuild_recommendations", batch_size=4, stdout=mock.Mock())
+
+        # 9 published contents in batches of 4
+        self.assertEqual(solr.search.call_count, 3)
+        self.assertEqual(ContentRecommendation.objects.count(), 1)
+        self.assertEqual(more_like_this(self.tool), [self.trend])
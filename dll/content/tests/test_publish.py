@@ -0,0 +1,263 @@
+from io import StringIO
+from unittest import mock
+
+import pysolr
+
+from django.core.files import File
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from filer.models import File as FilerFile
+
+from dll.content.models import (
+    Competence,
+    ContentFile,
+    ContentLink,
+    TeachingModule,
+    Tool,
+    Trend,
+)
+from dll.content.tests.test_content_views import BaseTestCase as ContentBaseTestCase
+from dll.content.tests.test_review_submission import BaseTestCase
+from dll.general.signals import post_publish
+
+
+class PublishTests(BaseTestCase):
+    def setUp(self):
+        super(PublishTests, self).setUp()
+        self.content.competences.add(Competence.objects.create(cid=1))
+        self.content.publish()
+
+    def _add_links_and_files(self, count):
+        ContentLink.objects.bulk_create(
+            ContentLink(
+                url=f"https://www.foo.org/{i}",
+                name="Foo",
+                type="href",
+                content=self.content,
+            )
+            for i in range(count)
+        )
+        for i in range(count):
+            file = File(open("dll/static/img/cc_license.png", "rb"), name=f"File{i}")
+            ContentFile.objects.create(
+                file=FilerFile.objects.create(file=file),
+                title=f"File{i}",
+                content=self.content,
+            )
+
+    def _count_publish_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.content.publish()
+        return len(ctx.captured_queries)
+
+    def test_relations_are_copied(self):
+        public = self.content.get_published()
+        self.assertEqual(set(public.tags.names()), {"tag1", "tag2", "tag3"})
+        self.assertEqual(list(public.co_authors.all()), [self.co_author])
+        self.assertEqual(public.competences.get().cid, 1)
+        self.assertEqual(public.contentlink_set.get().url, "https://www.foo.org")
+        public_file = public.contentfile_set.get()
+        self.assertNotEqual(public_file.pk, self.content.contentfile_set.get().pk)
+        # the filer files are shared instead of copied
+        self.assertEqual(
+            public_file.file_id, self.content.contentfile_set.get().file_id
+        )
+        self.assertEqual(public.image_id, self.content.image_id)
+
+    def test_related_content_is_symmetrical(self):
+        related = TeachingModule.objects.drafts().get(name="Bar")
+        related.publish()
+        public = self.content.publish()
+        public_related = related.get_published()
+        self.assertEqual(list(public.related_content.all()), [public_related])
+        self.assertIn(public, public_related.related_content.all())
+
+    def test_query_count_does_not_grow_with_relations(self):
+        self._add_links_and_files(2)
+        queries = self._count_publish_queries()
+        self._add_links_and_files(8)
+        # only deleting the former public files costs queries per row
+        self.assertLess(self._count_publish_queries() - queries, 2 * 8)
+        public = self.content.get_published()
+        self.assertEqual(public.contentlink_set.count(), 11)
+        self.assertEqual(public.contentfile_set.count(), 11)
+
+    def test_copy_is_inserted_in_bulk(self):
+        self._add_links_and_files(10)
+        with CaptureQueriesContext(connection) as ctx:
+            self.content.publish()
+        inserts = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith('INSERT INTO "content_contentlink"')
+            or q["sql"].startswith('INSERT INTO "content_contentfile"')
+        ]
+        self.assertEqual(len(inserts), 2)
+
+    def test_publish_is_atomic(self):
+        public_pk = self.content.publisher_linked_id
+        with mock.patch(
+            "dll.content.models.copy_tags", side_effect=RuntimeError("boom")
+        ):
+            with self.assertRaises(RuntimeError):
+                self.content.publish(force=True)
+        self.content.refresh_from_db()
+        self.assertEqual(self.content.publisher_linked_id, public_pk)
+        self.assertEqual(TeachingModule.objects.published().count(), 1)
+
+    def test_post_publish_is_sent_once(self):
+        receiver = mock.Mock()
+        post_publish.connect(receiver)
+        try:
+            public = self.content.publish(force=True)
+        finally:
+            post_publish.disconnect(receiver)
+        receiver.assert_called_once_with(
+            signal=post_publish, sender=TeachingModule, instance=public
+        )
+
+
+class FingerprintTests(BaseTestCase):
+    def setUp(self):
+        super(FingerprintTests, self).setUp()
+        self.content.publish()
+
+    def test_published_draft_has_no_changes(self):
+        self.assertFalse(self.content.has_unpublished_changes())
+        self.content.save()
+        self.assertFalse(self.content.has_unpublished_changes())
+
+    def test_field_change_is_detected(self):
+        self.content.name = "Foo 2"
+        self.content.save()
+        self.assertTrue(self.content.has_unpublished_changes())
+
+    def test_unchanged_draft_is_not_republished(self):
+        public = self.content.get_published()
+        files = FilerFile.objects.count()
+        self.assertEqual(self.content.publish().pk, public.pk)
+        self.assertEqual(FilerFile.objects.count(), files)
+
+    def test_field_change_updates_public_version(self):
+        public = self.content.get_published()
+        self.content.name = "Foo 2"
+        self.content.save()
+        with CaptureQueriesContext(connection) as ctx:
+            updated = self.content.publish()
+        self.assertEqual(updated.pk, public.pk)
+        self.assertEqual(updated.name, "Foo 2")
+        self.assertEqual(updated.image_id, public.image_id)
+        self.assertEqual(updated.tags.count(), 3)
+        self.assertFalse(self.content.has_unpublished_changes())
+        self.assertLess(len(ctx.captured_queries), 30)
+
+    def test_relation_change_replaces_public_version(self):
+        public = self.content.get_published()
+        self.content.tags.add("tag4")
+        self.assertNotEqual(self.content.publish().pk, public.pk)
+
+    def test_relation_changes_are_detected(self):
+        self.content.tags.add("tag4")
+        self.assertTrue(self.content.has_unpublished_changes())
+        self.content.tags.remove("tag4")
+        self.assertFalse(self.content.has_unpublished_changes())
+        self.content.contentlink_set.update(name="Changed")
+        self.assertTrue(self.content.has_unpublished_changes())
+
+
+@mock.patch("dll.content.publishing.update_content_recommendations")
+@mock.patch("dll.content.publishing.update_documents")
+class RepublishCommandTests(ContentBaseTestCase):
+    def _republish(self, *args):
+        out = StringIO()
+        call_command("republish_content", *args, stdout=out)
+        return out.getvalue()
+
+    def test_reviewed_drafts_are_republished(
+        self, update_documents, update_recommendations
+    ):
+        tool = Tool.objects.drafts().get(name="Tool Fusce egestas")
+        public_pk = tool.publisher_linked_id
+        trend = Trend.objects.drafts().get(name="Trend Nullam nulla")
+        trend_pk = trend.publisher_linked_id
+
+        output = self._republish("--chunk-size", "2")
+        self.assertIn("Republished 9 contents", output)
+        self.assertIn("9/9", output)
+        tool.refresh_from_db()
+        trend.refresh_from_db()
+        self.assertNotEqual(tool.publisher_linked_id, public_pk)
+        self.assertEqual(
+            Tool.objects.get(pk=tool.publisher_linked_id).url.url, "www.foo.bar"
+        )
+        changes = update_documents.call_args[0][0]
+        self.assertIn(tool.publisher_linked_id, changes["content.tool"][0])
+        self.assertIn(public_pk, changes["content.tool"][1])
+        self.assertIn(trend.publisher_linked_id, changes["content.trend"][0])
+        self.assertIn(trend_pk, changes["content.trend"][1])
+
+    def test_draft_with_pending_edits_is_not_published(
+        self, update_documents, update_recommendations
+    ):
+        tool = Tool.objects.drafts().get(name="Tool Fusce egestas")
+        public_pk = tool.publisher_linked_id
+        tool.teaser = "Changed"
+        tool.save()
+        trend = Trend.objects.drafts().get(name="Trend Nullam nulla")
+        trend_pk = trend.publisher_linked_id
+        trend.tags.add("new")
+
+        output = self._republish()
+        self.assertIn("Republished 7 contents", output)
+        self.assertIn("skipped 2 with unreviewed changes", output)
+        tool.refresh_from_db()
+        self.assertEqual(tool.publisher_linked_id, public_pk)
+        self.assertNotEqual(tool.get_published().teaser, "Changed")
+        self.assertTrue(tool.has_unpublished_changes())
+        trend.refresh_from_db()
+        self.assertEqual(trend.publisher_linked_id, trend_pk)
+        self.assertFalse(trend.get_published().tags.filter(name="new").exists())
+
+    def test_draft_under_review_is_not_published(
+        self, update_documents, update_recommendations
+    ):
+        tool = Tool.objects.drafts().get(name="Tool Fusce egestas")
+        public_pk = tool.publisher_linked_id
+        tool.submit_for_review(by_user=self.author)
+
+        output = self._republish("--type", "tool")
+        self.assertIn("Republished 1 contents", output)
+        tool.refresh_from_db()
+        self.assertEqual(tool.publisher_linked_id, public_pk)
+
+    def test_filters(self, update_documents, update_recommendations):
+        output = self._republish("--type", "trend")
+        self.assertIn("Republished 2 contents", output)
+        output = self._republish("--type", "tool", "--site", "2")
+        self.assertIn("Republished 0 contents", output)
+
+    def test_recommendations_are_updated_after_indexing(
+        self, update_documents, update_recommendations
+    ):
+        calls = mock.Mock()
+        calls.attach_mock(update_documents, "update_documents")
+        calls.attach_mock(update_recommendations.delay, "update_recommendations")
+        tool = Tool.objects.drafts().get(name="Tool Fusce egestas")
+        public_pk = tool.publisher_linked_id
+
+        self._republish("--type", "tool")
+        tool.refresh_from_db()
+        self.assertNotEqual(tool.publisher_linked_id, public_pk)
+        self.assertEqual(
+            [call[0] for call in calls.mock_calls],
+            ["update_documents", "update_recommendations"],
+        )
+        self.assertIn(tool.publisher_linked_id, calls.mock_calls[1].args[0])
+
+    def test_no_recommendations_update_if_indexing_fails(
+        self, update_documents, update_recommendations
+    ):
+        update_documents.side_effect = pysolr.SolrError("down")
+        self._republish("--type", "tool")
+        update_recommendations.delay.assert_not_called()
@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from dll.content.models import Content, TeachingModule, Tool, Trend
+from dll.content.tests.test_content_views import BaseTestCase
+from dll.content.utils import get_published_pks, get_random_content
+
+
+class RandomContentTests(BaseTestCase):
+    def setUp(self):
+        super(RandomContentTests, self).setUp()
+        cache.clear()
+
+    def test_sample_without_duplicates(self):
+        contents = get_random_content(
+            limit_teaching_modules=5, limit_tools=5, limit_trends=1
+        )
+        self.assertEqual(len(contents), 8)
+        self.assertEqual(len({c.pk for c in contents}), 8)
+        self.assertEqual(
+            [type(c) for c in contents],
+            [TeachingModule] * 5 + [Trend] + [Tool] * 2,
+        )
+        self.assertTrue(all(c.is_public for c in contents))
+
+    def test_pools_are_cached(self):
+        get_random_content(limit_teaching_modules=2, limit_tools=2, limit_trends=2)
+        with CaptureQueriesContext(connection) as ctx:
+            contents = get_random_content(
+                limit_teaching_modules=2, limit_tools=2, limit_trends=2
+            )
+            [c.competences.all() for c in contents]
+        # one query per content type and the competences
+        self.assertEqual(len(ctx.captured_queries), 4)
+
+    def test_pools_are_refreshed_on_publish(self):
+        self.assertEqual(len(get_published_pks(Trend)), 2)
+        trend = Trend.objects.create(name="Trend Sampling", author=self.author)
+        trend.publish()
+        self.assertEqual(len(get_published_pks(Trend)), 3)
+
+        Content.objects.published().get(name="Trend Sampling").delete()
+        self.assertEqual(len(get_published_pks(Trend)), 2)
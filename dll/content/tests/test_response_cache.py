@@ -0,0 +1,98 @@
+from unittest import mock
+
+from constance import config
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from wagtail.core.models import Site as WagtailSite
+
+from dll.cms.models import Frontpage
+from dll.content.models import Tool, Trend
+from dll.content.tests.test_content_views import BaseTestCase
+from dll.general.cache import get_response_cache_stats
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(BaseTestCase):
+    fixtures = ["dll/fixtures/sites.json"]
+
+    def setUp(self):
+        super(ResponseCacheTests, self).setUp()
+        cache.clear()
+        self.tool = Tool.objects.published().get(name="Tool Fusce egestas")
+
+    def _get(self, url, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_detail_page_is_cached(self):
+        response, _ = self._get(self.tool.get_absolute_url())
+        self.assertEqual(response["X-Cache"], "MISS")
+
+        cached, queries = self._get(self.tool.get_absolute_url())
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(get_response_cache_stats(), {"hits": 1, "misses": 1})
+
+    def test_query_string_is_normalized(self):
+        url = reverse("tools-data-filter")
+        self._get(url, {"status": "on", "sorting": "az", "utm_source": "newsletter"})
+        response, _ = self._get(url, {"sorting": "az", "status": "on"})
+        self.assertEqual(response["X-Cache"], "HIT")
+
+        response, _ = self._get(url, {"sorting": "latest", "status": "on"})
+        self.assertEqual(response["X-Cache"], "MISS")
+
+    def test_authenticated_users_bypass_cache(self):
+        self._get(self.tool.get_absolute_url())
+        self.client.login(email="test+alice@blueshoe.de", password="password")
+        response, _ = self._get(self.tool.get_absolute_url())
+        self.assertFalse(response.has_header("X-Cache"))
+
+    def test_publish_invalidates_tagged_responses(self):
+        tools_url = reverse("tools-data-filter")
+        trends_url = reverse("trends-data-filter")
+        self._get(tools_url)
+        self._get(trends_url)
+        self._get(self.tool.get_absolute_url())
+
+        trend = Trend.objects.drafts().get(name="Trend Nullam nulla")
+        trend.teaser = "Changed"
+        trend.publish()
+
+        self.assertEqual(self._get(tools_url)[0]["X-Cache"], "HIT")
+        self.assertEqual(self._get(trends_url)[0]["X-Cache"], "MISS")
+        # detail pages list recommended contents of all types
+        self.assertEqual(self._get(self.tool.get_absolute_url())[0]["X-Cache"], "MISS")
+
+    def test_unpublish_invalidates_listing(self):
+        url = reverse("tools-data-filter")
+        response, _ = self._get(url)
+        self.assertEqual(response.json()["count"], 2)
+
+        self.tool.delete()
+        response, _ = self._get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["count"], 1)
+
+    def test_config_change_invalidates_responses(self):
+        url = reverse("tools-feed")
+        self._get(url)
+        self.assertEqual(self._get(url)[0]["X-Cache"], "HIT")
+
+        config.TESTIMONIAL_DLL = not config.TESTIMONIAL_DLL
+        self.assertEqual(self._get(url)[0]["X-Cache"], "MISS")
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=60 * 60)
+    def test_frontpage_is_cached_briefly(self):
+        root = WagtailSite.objects.get(is_default_site=True).root_page
+        page = root.add_child(instance=Frontpage(title="Start", slug="start"))
+        with mock.patch("dll.general.cache.cache.set") as cache_set:
+            self._get(page.url)
+        # the random contents of the front page change with every cached copy
+        self.assertEqual(cache_set.call_args[0][2], settings.FRONTPAGE_CACHE_TIMEOUT)
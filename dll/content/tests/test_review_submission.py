@@ -250,7 +250,8 @@ class ContentEditAfterPublishingTests(BaseTestCase):
     def test_new_review_was_created(self):
         self.assertTrue(self.draft.reviews.count() == 2)
 
-    def test_old_public_version_does_not_exist(self):
-        cls = self.content.__class__
-        with self.assertRaises(cls.DoesNotExist):
-            cls.objects.get(pk=self.public1.pk)
+    def test_public_version_is_updated_in_place(self):
+        # only fields changed, so the public version keeps its pk and relations
+        self.assertEqual(self.public2.pk, self.public1.pk)
+        self.assertEqual(self.public2.name, "Foo2")
+        self.assertEqual(self.public2.tags.count(), 3)
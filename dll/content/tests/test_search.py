@@ -1,10 +1,27 @@
 import time
+from types import SimpleNamespace
+from unittest import mock
 
 from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.core import management
+from psycopg2.extras import NumericRange
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
+from dll.content.models import Competence, Content, TeachingModule, Tool, Trend
+from dll.content.pagination import SolrSearchPagination
+from dll.content.search_indexes import TeachingModulesIndex, ToolsIndex
 from dll.content.tests.test_content_views import BaseTestCase
+from dll.content.views import (
+    ContentDataFilterView,
+    PublishedContentViewSet,
+    TeachingModuleDataFilterView,
+    ToolDataFilterView,
+)
 
 
 class SearchTestCase(BaseTestCase):
@@ -25,3 +42,195 @@ class SearchTestCase(BaseTestCase):
     #     response = self.client.get(self.search_url + "?q=TeachingModule")
     #     self.assertEqual(response.status_code, 200)
     #     self.assertContains(response, "TeachingModule Ut a")
+
+
+class SolrSearchPaginationTestCase(BaseTestCase):
+    def _paginate(self, search_results, page=1):
+        request = Request(APIRequestFactory().get("/", {"page": page}))
+        view = SimpleNamespace(search_queryset=search_results)
+        paginator = SolrSearchPagination()
+        contents = paginator.paginate_queryset(
+            Content.objects.published(), request, view=view
+        )
+        return paginator, contents
+
+    def test_keeps_solr_order(self):
+        pks = list(reversed(self.published_content))
+        paginator, contents = self._paginate(
+            [SimpleNamespace(pk=str(pk)) for pk in pks]
+        )
+        self.assertEqual([c.pk for c in contents], pks)
+        self.assertEqual(paginator.page.paginator.count, len(pks))
+
+    def test_only_current_page_is_loaded(self):
+        pks = self.published_content * 3  # 27 search results
+        paginator, contents = self._paginate(
+            [SimpleNamespace(pk=str(pk)) for pk in pks], page=2
+        )
+        self.assertEqual([c.pk for c in contents], pks[20:])
+        self.assertEqual(paginator.page.paginator.count, 27)
+
+    def test_without_search(self):
+        request = Request(APIRequestFactory().get("/"))
+        paginator = SolrSearchPagination()
+        contents = paginator.paginate_queryset(
+            Content.objects.published().order_by("pk"),
+            request,
+            view=SimpleNamespace(),
+        )
+        self.assertEqual(len(contents), 9)
+
+
+class FakeSearchQuerySet(list):
+    """Search hits as returned by ``SearchQuerySet.values_list("pk", flat=True)``."""
+
+    def __init__(self, pks):
+        super(FakeSearchQuerySet, self).__init__(str(pk) for pk in pks)
+        self.query = SimpleNamespace()
+
+    def count(self):
+        return len(self)
+
+
+class SearchViewTestCase(BaseTestCase):
+    def _search(self, pks, page=1):
+        hits = FakeSearchQuerySet(pks)
+        with mock.patch("dll.content.views.SearchQuerySet") as search_queryset:
+            search_queryset().filter().values_list.return_value = hits
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(
+                    reverse("search"), {"q": "Lorem", "page": page}
+                )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(hits.query.boost_fields["name"], 2)
+        return response, len(ctx.captured_queries)
+
+    def test_results_keep_solr_ranking(self):
+        pks = list(reversed(self.published_content))
+        response, _ = self._search(pks)
+        self.assertEqual([c.pk for c in response.context["results"]], pks)
+        self.assertEqual(response.context["page_obj"].paginator.count, 9)
+        self.assertEqual(response.context["mlt"], [])
+
+    def test_results_are_paginated(self):
+        self._search([])  # constance stores its defaults on first access
+        pks = self.published_content * 3  # 27 search hits
+        response, many_queries = self._search(pks, page=2)
+        self.assertEqual([c.pk for c in response.context["results"]], pks[20:])
+        self.assertContains(response, "page=1")
+
+        response, few_queries = self._search(self.published_content[6:])
+        self.assertEqual(few_queries, many_queries)
+
+
+class ToolNameFilter(BaseFilterBackend):
+    """A database filter without a Solr counterpart."""
+
+    def filter_queryset(self, request, queryset, view):
+        return queryset.filter(name__startswith="Tool Duis")
+
+
+class SolrTagFilterTestCase(BaseTestCase):
+    def _search(self, view_class, params, user=None):
+        request = Request(APIRequestFactory().get("/", {"q": "Lorem", **params}))
+        request.user = user or self.author
+        view = view_class()
+        view.setup(request)
+        view.format_kwarg = None
+        with CaptureQueriesContext(connection) as ctx:
+            view.filter_queryset(view.get_queryset())
+        return view.search_queryset, len(ctx.captured_queries)
+
+    def test_filters_are_applied_in_solr(self):
+        sqs, queries = self._search(
+            ToolDataFilterView,
+            {
+                "status": "on",
+                "operatingSystems[]": ["1", "2"],
+                "withCosts": "1",
+                "competences[]": ["3"],
+            },
+        )
+        self.assertEqual(queries, 0)
+        self.assertEqual(sqs.query.models, {Tool})
+        self.assertEqual(
+            sqs.query.narrow_queries,
+            {
+                'status:("on")',
+                'operating_system_ids:("1" OR "2")',
+                "with_costs:true",
+                'competences:("3")',
+            },
+        )
+        self.assertEqual(sqs.query.boost_fields["name"], 3)
+
+    def test_view_filters_are_applied_in_solr(self):
+        sqs, queries = self._search(
+            TeachingModuleDataFilterView,
+            {"schoolClassFrom": "3", "schoolClassTo": "6", "hybrid": "true"},
+        )
+        self.assertEqual(queries, 0)
+        self.assertEqual(sqs.query.models, {TeachingModule})
+        self.assertEqual(
+            sqs.query.narrow_queries,
+            {"school_class_to:{3 TO *]", "school_class_from:[* TO 6}", "hybrid:true"},
+        )
+
+        competence = Competence.objects.first()
+        sqs, queries = self._search(
+            PublishedContentViewSet, {"tools": "false", "competence": competence.slug}
+        )
+        self.assertEqual(sqs.query.models, {TeachingModule, Trend})
+        self.assertEqual(sqs.query.narrow_queries, {f'competences:("{competence.pk}")'})
+
+    def test_favorites(self):
+        sqs, _ = self._search(ToolDataFilterView, {"favorites": "true"})
+        self.assertEqual(len(sqs), 0)
+
+        tool = Tool.objects.drafts().get(name="Tool Duis leo")
+        tool.favor(self.author)
+        sqs, _ = self._search(ToolDataFilterView, {"favorites": "true"})
+        self.assertEqual(
+            sqs.query.narrow_queries,
+            {"{!terms f=django_id}%s" % tool.get_published().pk},
+        )
+
+    def test_database_only_filters_restrict_the_pks(self):
+        class ToolNameFilterView(ContentDataFilterView):
+            model = Tool
+            filter_backends = [ToolNameFilter] + ContentDataFilterView.filter_backends
+
+        sqs, _ = self._search(ToolNameFilterView, {})
+        tool = Tool.objects.published().get(name="Tool Duis leo")
+        self.assertEqual(sqs.query.narrow_queries, {"{!terms f=django_id}%s" % tool.pk})
+
+
+class SearchIndexTestCase(BaseTestCase):
+    def test_filter_attributes_are_indexed(self):
+        tool = Tool.objects.drafts().get(name="Tool Duis leo")
+        tool.status = "on"
+        tool.save()
+        tool.publish()
+        data = ToolsIndex().full_prepare(tool.get_published())
+        self.assertEqual(data["status"], "on")
+        self.assertNotIn("data_privacy", data)
+        self.assertEqual(data["applications"], [])
+
+        draft = TeachingModule.objects.drafts().get(name="TeachingModule Ut a")
+        draft.school_class = NumericRange(3, 7)
+        draft.save()
+        draft.publish()
+        data = TeachingModulesIndex().full_prepare(draft.get_published())
+        self.assertEqual((data["school_class_from"], data["school_class_to"]), (3, 7))
+
+        draft.school_class = NumericRange(None, 7)
+        draft.save()
+        draft.publish()
+        data = TeachingModulesIndex().full_prepare(draft.get_published())
+        self.assertLess(data["school_class_from"], 0)
+
+    def test_content_without_author(self):
+        tool = Tool.objects.published().get(name="Tool Duis leo")
+        Content.objects.filter(pk=tool.pk).update(author=None)
+        tool.refresh_from_db()
+        self.assertEqual(ToolsIndex().full_prepare(tool)["authors"], [])
@@ -0,0 +1,53 @@
+from unittest import mock
+
+import pysolr
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+
+from dll.content.suggest import build_query, suggest
+
+
+class SuggestTests(TestCase):
+    def setUp(self):
+        caches["suggest"].clear()
+        self.solr = mock.Mock()
+        self.solr.search.return_value.docs = [
+            {"name": "Tool Fusce egestas", "url": "/tools/tool-fusce-egestas"}
+        ]
+        patcher = mock.patch("dll.content.suggest.get_solr", return_value=self.solr)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_endpoint(self):
+        response = self.client.get(reverse("search-suggest"), {"q": "Fus"})
+        self.assertEqual(
+            response.json(),
+            [{"title": "Tool Fusce egestas", "url": "/tools/tool-fusce-egestas"}],
+        )
+        self.solr.search.assert_called_once_with(
+            "name_auto:fus", fl="name,url", rows=10
+        )
+
+    def test_prefixes_are_cached(self):
+        suggest("Tool  Fus")
+        suggest(" tool fus")
+        self.assertEqual(self.solr.search.call_count, 1)
+        self.assertEqual(
+            self.solr.search.call_args.args[0], "name_auto:tool AND name_auto:fus"
+        )
+
+    def test_short_prefix(self):
+        self.assertEqual(suggest("f"), [])
+        self.solr.search.assert_not_called()
+
+    def test_solr_failure(self):
+        self.solr.search.side_effect = pysolr.SolrError("timeout")
+        self.assertEqual(suggest("fus"), [])
+        self.solr.search.side_effect = None
+        self.assertEqual(len(suggest("fus")), 1)
+
+    def test_query_escaping(self):
+        self.assertEqual(
+            build_query('c++ "a:b'), 'name_auto:c\\+\\+ AND name_auto:\\"a\\:b'
+        )
@@ -0,0 +1,119 @@
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.client import MULTIPART_CONTENT, encode_multipart, BOUNDARY
+from django.urls import reverse
+from filer.models import Image as FilerImage
+from PIL import Image
+
+from dll.content.models import CONTENT_THUMBNAIL_OPTIONS, Content, Tool
+from dll.content.tasks import generate_content_thumbnails
+from dll.content.tests.test_content_views import BaseTestCase
+from dll.content.thumbnails import generate_thumbnails
+
+
+class ThumbnailTests(BaseTestCase):
+    fixtures = ["dll/fixtures/sites.json"]
+
+    def setUp(self):
+        super(ThumbnailTests, self).setUp()
+        self.client.login(username="test+alice@blueshoe.de", password="password")
+        self.tool = Tool.objects.drafts().get(name="Tool Fusce egestas")
+
+    def _upload_image(self, color=None):
+        if color:
+            data = BytesIO()
+            Image.new("RGB", (800, 600), color).save(data, "PNG")
+            image = SimpleUploadedFile("preview.png", data.getvalue(), "image/png")
+        else:
+            with open("dll/static/img/cc_license.png", "rb") as f:
+                image = SimpleUploadedFile("preview.png", f.read(), "image/png")
+        url = reverse("add-preview-image", kwargs={"slug": self.tool.slug})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                url,
+                encode_multipart(BOUNDARY, {"image": image}),
+                content_type=MULTIPART_CONTENT,
+            )
+        self.assertEqual(response.status_code, 201)
+        self.tool.refresh_from_db()
+
+    def test_upload_generates_thumbnails(self):
+        self._upload_image()
+        self.assertEqual(len(self.tool.thumbnails), 2 * len(CONTENT_THUMBNAIL_OPTIONS))
+        self.assertTrue(self.tool.thumbnails["list"].endswith(".png"))
+        self.assertTrue(self.tool.thumbnails["list_webp"].endswith(".webp"))
+        self.assertEqual(self.tool.get_image(), self.tool.thumbnails["og"])
+
+    def test_generation_is_idempotent(self):
+        self._upload_image()
+        self.assertEqual(generate_thumbnails(self.tool.image), self.tool.thumbnails)
+
+    def test_publish_reuses_thumbnails(self):
+        self._upload_image()
+        with mock.patch("dll.content.tasks.generate_thumbnails") as generate:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.tool.publish()
+        generate.assert_not_called()
+        public = Tool.objects.published().get(name="Tool Fusce egestas")
+        self.assertEqual(public.image_id, self.tool.image_id)
+        self.assertEqual(public.thumbnails, self.tool.thumbnails)
+
+    def test_listing_uses_stored_thumbnails(self):
+        self._upload_image()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool.publish()
+        with mock.patch(
+            "easy_thumbnails.files.Thumbnailer.get_thumbnail"
+        ) as get_thumbnail:
+            response = self.client.get(reverse("tools-data-filter"))
+        get_thumbnail.assert_not_called()
+        images = {r["name"]: r["image"] for r in response.json()["results"]}
+        self.assertEqual(images["Tool Fusce egestas"], self.tool.thumbnails["list"])
+
+    def test_stale_task_keeps_new_image(self):
+        self._upload_image()
+        thumbnails = self.tool.thumbnails
+        old_image_pk = self.tool.image_id
+        self._upload_image(color="red")
+        generate_content_thumbnails(self.tool.pk, old_image_pk)
+        self.assertEqual(
+            Content.objects.get(pk=self.tool.pk).thumbnails, self.tool.thumbnails
+        )
+        self.assertNotEqual(self.tool.thumbnails["list"], thumbnails["list"])
+
+    def _other_image(self):
+        data = BytesIO()
+        Image.new("RGB", (800, 600), "blue").save(data, "PNG")
+        return FilerImage.objects.create(
+            file=SimpleUploadedFile("other.png", data.getvalue(), "image/png"),
+            original_filename="other.png",
+        )
+
+    def test_pages_never_generate_thumbnails(self):
+        self._upload_image()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool.publish()
+        public = Tool.objects.published().get(name="Tool Fusce egestas")
+        # the task has not stored the urls yet
+        Content.objects.filter(pk=public.pk).update(thumbnails={})
+        with mock.patch(
+            "easy_thumbnails.files.Thumbnailer.generate_thumbnail"
+        ) as generate_thumbnail:
+            response = self.client.get(public.get_absolute_url())
+        generate_thumbnail.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        # already generated thumbnails are still shown
+        self.assertContains(response, self.tool.thumbnails["detail"])
+        self.assertContains(response, self.tool.thumbnails["detail_2x"])
+
+        Content.objects.filter(pk=public.pk).update(
+            thumbnails={}, image=self._other_image()
+        )
+        with mock.patch(
+            "easy_thumbnails.files.Thumbnailer.generate_thumbnail"
+        ) as generate_thumbnail:
+            response = self.client.get(public.get_absolute_url())
+        generate_thumbnail.assert_not_called()
+        self.assertNotContains(response, 'class="content-info__image"')
@@ -0,0 +1,127 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from dll.content.models import Tool, Trend
+from dll.content.tasks import flush_content_view_counts
+from dll.content.tests.test_content_views import BaseTestCase
+from dll.content.view_counts import flush_view_counts, get_view_count_key
+
+
+@mock.patch("dll.content.view_counts.update_documents")
+class ViewCountTests(BaseTestCase):
+    fixtures = ["dll/fixtures/sites.json"]
+
+    def setUp(self):
+        super(ViewCountTests, self).setUp()
+        cache.clear()
+        self.tool = Tool.objects.published().get(name="Tool Fusce egestas")
+        self.trend = Trend.objects.published().get(name="Trend Nullam nulla")
+
+    def _view(self, content, user_agent="Firefox"):
+        response = self.client.get(
+            content.get_absolute_url(), HTTP_USER_AGENT=user_agent
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_views_are_buffered(self, update_documents):
+        with CaptureQueriesContext(connection) as ctx:
+            self._view(self.tool)
+        self.assertFalse(
+            [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        )
+        self.tool.refresh_from_db()
+        self.assertEqual(self.tool.view_count, 0)
+
+    def test_flush_updates_public_versions_and_drafts(self, update_documents):
+        self._view(self.tool)
+        self._view(self.tool, user_agent="Chrome")
+        self._view(self.trend)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(flush_view_counts(), 3)
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+
+        self.tool.refresh_from_db()
+        self.assertEqual(self.tool.view_count, 2)
+        self.assertEqual(self.tool.get_draft().view_count, 2)
+        self.trend.refresh_from_db()
+        self.assertEqual(self.trend.view_count, 1)
+        update_documents.assert_called_once_with(
+            {
+                "content.tool": ({self.tool.pk}, set()),
+                "content.trend": ({self.trend.pk}, set()),
+            }
+        )
+
+        # the buffer is empty now
+        self.assertEqual(flush_view_counts(), 0)
+        self._view(self.tool, user_agent="Safari")
+        flush_content_view_counts()
+        self.tool.refresh_from_db()
+        self.assertEqual(self.tool.view_count, 3)
+
+    def test_flush_reads_only_viewed_contents(self, update_documents):
+        self._view(self.tool)
+        self._view(self.tool, user_agent="Chrome")
+        with mock.patch(
+            "dll.content.view_counts.cache.get_many", wraps=cache.get_many
+        ) as get_many:
+            self.assertEqual(flush_view_counts(), 2)
+        counted_keys = set(get_many.call_args_list[-1][0][0])
+        self.assertEqual(
+            counted_keys, {get_view_count_key("content.tool", self.tool.slug)}
+        )
+
+        # the log of viewed contents is cleared by the flush
+        with mock.patch(
+            "dll.content.view_counts.cache.get_many", wraps=cache.get_many
+        ) as get_many:
+            with self.assertNumQueries(0):
+                self.assertEqual(flush_view_counts(), 0)
+        get_many.assert_called_once_with([])
+
+    def test_views_of_unpublished_contents_are_dropped(self, update_documents):
+        self._view(self.trend)
+        self.trend.delete()
+        self.assertEqual(flush_view_counts(), 0)
+        self.assertIsNone(
+            cache.get(get_view_count_key("content.trend", self.trend.slug))
+        )
+
+    def test_views_are_counted_once_per_session(self, update_documents):
+        self.client.login(username="test+alice@blueshoe.de", password="password")
+        self._view(self.tool)
+        self._view(self.tool, user_agent="Chrome")
+        self.assertEqual(flush_view_counts(), 1)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_cached_responses_are_counted(self, update_documents):
+        self._view(self.tool)
+        self._view(self.tool, user_agent="Chrome")
+        self.assertEqual(flush_view_counts(), 2)
+
+    def test_count_is_kept_when_republished(self, update_documents):
+        self._view(self.tool)
+        flush_view_counts()
+        draft = self.tool.get_draft()
+        draft.tags.add("new")
+        public = draft.publish()
+        self.assertNotEqual(public.pk, self.tool.pk)
+        self.assertEqual(public.view_count, 1)
+
+    def test_most_viewed_sorting(self, update_documents):
+        self._view(self.trend)
+        self._view(self.trend, user_agent="Chrome")
+        self._view(self.tool)
+        flush_view_counts()
+        response = self.client.get(
+            reverse("public-content-list"), {"sorting": "most-viewed"}
+        )
+        names = [content["name"] for content in response.json()["results"]]
+        self.assertEqual(names[:2], [self.trend.name, self.tool.name])
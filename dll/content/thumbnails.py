@@ -0,0 +1,34 @@
+import logging
+
+from easy_thumbnails.files import get_thumbnailer
+
+from dll.content.models import CONTENT_THUMBNAIL_OPTIONS
+
+logger = logging.getLogger("dll.content.thumbnails")
+
+WEBP_SUFFIX = "_webp"
+
+
+def get_webp_thumbnailer(image):
+    thumbnailer = get_thumbnailer(image)
+    thumbnailer.thumbnail_preserve_extensions = False
+    thumbnailer.thumbnail_extension = "webp"
+    thumbnailer.thumbnail_transparency_extension = "webp"
+    return thumbnailer
+
+
+def generate_thumbnails(image):
+    """
+    Generates (or looks up) all thumbnails of a content image in the original
+    format and as webp. Returns a dict of alias -> url, the webp variants use
+    the alias with a ``_webp`` suffix.
+    """
+    urls = {}
+    for suffix, thumbnailer in (
+        ("", get_thumbnailer(image)),
+        (WEBP_SUFFIX, get_webp_thumbnailer(image)),
+    ):
+        for alias, options in CONTENT_THUMBNAIL_OPTIONS.items():
+            urls[alias + suffix] = thumbnailer.get_thumbnail(options).url
+    logger.debug("Generated %s thumbnails of %s", len(urls), image)
+    return urls
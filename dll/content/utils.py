@@ -1,10 +1,29 @@
 # -*- coding: utf-8 -*-
 import csv
 import random
+import uuid
 
-from dll.content.models import Favorite, Content, Tool, Trend, TeachingModule
+from django.core.cache import cache
+from django.db.models import Count, Q, prefetch_related_objects
+from easy_thumbnails.models import Thumbnail
+from easy_thumbnails.utils import get_storage_hash
+from filer.models import Image
+
+from dll.content.models import (
+    Favorite,
+    Content,
+    Potential,
+    Tool,
+    Trend,
+    TeachingModule,
+)
 from dll.communication.models import NewsletterSubscrption
 
+PUBLISHED_PKS_CACHE_KEY = "published-pks:{}"
+TOOL_BOX_CACHE_KEY = "tool-box:{}:{}"
+TOOL_BOX_VERSION_CACHE_KEY = "tool-box:version"
+TOOL_BOX_TIMEOUT = 24 * 60 * 60
+
 
 def create_newsletter_subscriptions_from_csv(csvfile):
     reader = csv.reader(csvfile)
@@ -21,20 +40,139 @@ def is_favored(user, content):
     return favored
 
 
-def get_random_content(limit_teaching_modules, limit_tools, limit_trends):
-    content_pks = []
-    try:
-        content_pks += random.choices(
-            TeachingModule.objects.published().values_list("pk", flat=True),
-            k=limit_teaching_modules,
-        )
-        content_pks += random.choices(
-            Trend.objects.published().values_list("pk", flat=True), k=limit_trends
-        )
-        content_pks += random.choices(
-            Tool.objects.published().values_list("pk", flat=True), k=limit_tools
+def get_favored_pks(user):
+    """
+    Returns the pks of all contents (drafts and their public versions) the user
+    has favored, so a whole list can be checked with a single query.
+    """
+    if not user.is_authenticated:
+        return set()
+    favored_pks = set()
+    for draft_pk, public_pk in Favorite.objects.filter(user=user).values_list(
+        "content_id", "content__publisher_linked_id"
+    ):
+        favored_pks.add(draft_pk)
+        if public_pk:
+            favored_pks.add(public_pk)
+    return favored_pks
+
+
+def get_thumbnail_urls(images, thumbnail_options):
+    """
+    Looks up already generated thumbnails for a list of filer images with a
+    single query. Returns a dict of image pk -> thumbnail url, images without
+    an up to date thumbnail are left out.
+    """
+    thumbnailers = {}
+    candidates = {}
+    for image in images:
+        if not isinstance(image, Image):
+            continue
+        thumbnailer = image.easy_thumbnails_thumbnailer
+        thumbnailers[image.pk] = thumbnailer
+        candidates[image.pk] = {
+            thumbnailer.get_thumbnail_name(thumbnail_options, transparent=False),
+            thumbnailer.get_thumbnail_name(thumbnail_options, transparent=True),
+        }
+    if not thumbnailers:
+        return {}
+
+    thumbnails = Thumbnail.objects.filter(
+        source__name__in=[t.name for t in thumbnailers.values()],
+        name__in=set.union(*candidates.values()),
+    ).select_related("source")
+    by_source = {}
+    for thumbnail in thumbnails:
+        by_source.setdefault(thumbnail.source.name, []).append(thumbnail)
+
+    urls = {}
+    for pk, thumbnailer in thumbnailers.items():
+        storage_hash = get_storage_hash(thumbnailer.thumbnail_storage)
+        for thumbnail in by_source.get(thumbnailer.name, []):
+            if (
+                thumbnail.name in candidates[pk]
+                and thumbnail.storage_hash == storage_hash
+                and thumbnail.source.modified <= thumbnail.modified
+            ):
+                urls[pk] = thumbnailer.thumbnail_storage.url(thumbnail.name)
+                break
+    return urls
+
+
+def get_published_pks(model):
+    """
+    Returns the pks of all published contents of the given type. The pool is
+    cached until a content of that type is (un)published.
+    """
+    key = PUBLISHED_PKS_CACHE_KEY.format(model._meta.model_name)
+    pks = cache.get(key)
+    if pks is None:
+        pks = list(model.objects.published().values_list("pk", flat=True))
+        cache.set(key, pks, None)
+    return pks
+
+
+def invalidate_published_pks(model):
+    cache.delete(PUBLISHED_PKS_CACHE_KEY.format(model._meta.model_name))
+
+
+def get_tool_box_key(user_pk):
+    # bumping the version invalidates the tool boxes of all users
+    version = cache.get_or_set(TOOL_BOX_VERSION_CACHE_KEY, 1, None)
+    return TOOL_BOX_CACHE_KEY.format(version, user_pk)
+
+
+def get_tool_box_information(user):
+    """
+    Returns the number of the user's favorite tools per potential, counted on
+    the published tools with a single grouped query. The result is cached until
+    the user's favorites change or a tool or potential is changed.
+    """
+    key = get_tool_box_key(user.pk)
+    information = cache.get(key)
+    if information is None:
+        # favorites refer to the drafts, the tool box counts their public versions
+        favored_tools = user.favorites.filter(publisher_linked__isnull=False).values(
+            "publisher_linked"
         )
-    except IndexError:
-        pass  # no content yet
+        potentials = Potential.objects.annotate(
+            count=Count("tool", filter=Q(tool__in=favored_tools))
+        ).order_by("pk")
+        information = {
+            potential.slug: {
+                "name": potential.name,
+                "count": potential.count,
+                "pk": potential.pk,
+            }
+            for potential in potentials
+        }
+        cache.set(key, information, TOOL_BOX_TIMEOUT)
+    return information
+
+
+def invalidate_tool_box(user_pk=None):
+    """Drops the cached tool box of the given user, or of all users."""
+    if user_pk is None:
+        cache.set(TOOL_BOX_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+    else:
+        cache.delete(get_tool_box_key(user_pk))
 
-    return Content.objects.filter(pk__in=content_pks)
+
+def get_random_content(limit_teaching_modules, limit_tools, limit_trends):
+    """
+    Returns randomly chosen published contents, without duplicates, grouped by
+    type. Sampling works on the cached pk pools, so only the chosen contents
+    are loaded.
+    """
+    contents = []
+    for model, limit in (
+        (TeachingModule, limit_teaching_modules),
+        (Trend, limit_trends),
+        (Tool, limit_tools),
+    ):
+        pks = get_published_pks(model)
+        sample = random.sample(pks, min(limit, len(pks)))
+        if sample:
+            contents += model.objects.filter(pk__in=sample)
+    prefetch_related_objects(contents, "competences")
+    return contents
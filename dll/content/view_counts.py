@@ -0,0 +1,177 @@
+import hashlib
+import logging
+from functools import wraps
+
+import pysolr
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from dll.content.indexing import update_documents
+from dll.content.models import Content
+
+logger = logging.getLogger("dll.content.view_counts")
+
+VIEW_COUNT_PREFIX = "content-views"
+# the keys of the counted views are appended to a log in the cache, its entries
+# are numbered by this counter and read up to this position by the last flush
+PENDING_COUNTER_KEY = f"{VIEW_COUNT_PREFIX}:pending:counter"
+PENDING_FLUSHED_KEY = f"{VIEW_COUNT_PREFIX}:pending:flushed"
+
+
+def get_view_count_key(model_label, slug):
+    return f"{VIEW_COUNT_PREFIX}:{model_label}:{slug}"
+
+
+def get_pending_entry_key(position):
+    return f"{VIEW_COUNT_PREFIX}:pending:{position}"
+
+
+def add_pending_key(key):
+    """Logs that the view count ``key`` has views to flush."""
+    try:
+        position = cache.incr(PENDING_COUNTER_KEY)
+    except ValueError:
+        cache.add(PENDING_COUNTER_KEY, 0, None)
+        position = cache.incr(PENDING_COUNTER_KEY)
+    cache.set(get_pending_entry_key(position), key, None)
+
+
+def pop_pending_keys():
+    """
+    Returns the view count keys logged since the last flush and removes them
+    from the log. A key logged concurrently may be missed, it is logged again
+    with the next view of its content.
+    """
+    counter = cache.get(PENDING_COUNTER_KEY, 0)
+    flushed = cache.get(PENDING_FLUSHED_KEY, 0)
+    entry_keys = [
+        get_pending_entry_key(position) for position in range(flushed + 1, counter + 1)
+    ]
+    keys = set(cache.get_many(entry_keys).values())
+    cache.delete_many(entry_keys)
+    cache.set(PENDING_FLUSHED_KEY, counter, None)
+    return keys
+
+
+def get_visitor(request):
+    """Identifies a visitor by session or, without one, by address and browser."""
+    session_key = request.session.session_key
+    if session_key:
+        return session_key
+    return "{}|{}".format(
+        request.META.get("REMOTE_ADDR", ""), request.META.get("HTTP_USER_AGENT", "")
+    )
+
+
+def record_view(request, model_label, slug):
+    """
+    Counts a view of a published content in the cache, once per visitor within
+    VIEW_COUNT_DEDUP_TIMEOUT. The database is only written by flush_view_counts.
+    Returns whether the view was counted.
+    """
+    visitor = hashlib.md5(
+        f"{get_visitor(request)}|{model_label}|{slug}".encode()
+    ).hexdigest()
+    if not cache.add(
+        f"{VIEW_COUNT_PREFIX}:seen:{visitor}", 1, settings.VIEW_COUNT_DEDUP_TIMEOUT
+    ):
+        return False
+    key = get_view_count_key(model_label, slug)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+    add_pending_key(key)
+    return True
+
+
+def count_content_view(view_func):
+    """
+    Records the views of a content detail page. Wraps the response cache, so
+    cached responses are counted as well.
+    """
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        if request.method == "GET" and response.status_code == 200 and "slug" in kwargs:
+            model = request.resolver_match.func.view_class.model
+            record_view(request, model._meta.label_lower, kwargs["slug"])
+        return response
+
+    return _wrapped_view
+
+
+def get_pending_view_counts():
+    """
+    Returns the buffered view counts of the contents viewed since the last flush
+    as a dict of cache key -> (model label, public pk, count). Counts of contents
+    that are no longer published are dropped.
+    """
+    keys = pop_pending_keys()
+    if not keys:
+        return {}
+    counts = {key: count for key, count in cache.get_many(keys).items() if count > 0}
+    slugs = {}
+    for key in counts:
+        model_label, slug = key[len(VIEW_COUNT_PREFIX) + 1 :].split(":", 1)
+        slugs[key] = (model_label, slug)
+
+    contents = {}
+    for pk, slug, ctype_id in (
+        Content.objects.published()
+        .filter(slug__in={slug for model_label, slug in slugs.values()})
+        .order_by()
+        .values_list("pk", "slug", "polymorphic_ctype_id")
+    ):
+        model_label = (
+            ContentType.objects.get_for_id(ctype_id).model_class()._meta.label_lower
+        )
+        contents[(model_label, slug)] = pk
+
+    pending = {}
+    for key, count in counts.items():
+        if slugs[key] in contents:
+            pending[key] = (slugs[key][0], contents[slugs[key]], count)
+        else:
+            cache.delete(key)
+    return pending
+
+
+def flush_view_counts():
+    """
+    Adds the buffered view counts to the published contents and their drafts
+    (whose count is copied when they are published again) with a single UPDATE
+    and takes them from the buffer. The search index of the counted contents is
+    updated in bulk for the "most viewed" sorting. Returns the number of views.
+    """
+    pending = get_pending_view_counts()
+    if not pending:
+        return 0
+    increment = Case(
+        *[
+            When(Q(pk=pk) | Q(publisher_linked_id=pk), then=Value(count))
+            for model_label, pk, count in pending.values()
+        ],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    public_pks = [pk for model_label, pk, count in pending.values()]
+    Content.objects.filter(
+        Q(pk__in=public_pks) | Q(publisher_linked_id__in=public_pks)
+    ).update(view_count=F("view_count") + increment)
+    # views recorded since reading the buffer are kept
+    for key, (model_label, pk, count) in pending.items():
+        cache.decr(key, count)
+
+    changes = {}
+    for model_label, pk, count in pending.values():
+        changes.setdefault(model_label, (set(), set()))[0].add(pk)
+    try:
+        update_documents(changes)
+    except (IOError, pysolr.SolrError) as e:
+        logger.warning("Updating the view counts in the index failed: {}".format(e))
+    return sum(count for model_label, pk, count in pending.values())
@@ -9,15 +9,16 @@ from django.core.exceptions import (
     PermissionDenied,
 )
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.db.models import CharField, Count, Q, Value, prefetch_related_objects
+from django.db.models.functions import Cast
 from django.http import JsonResponse, Http404, HttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.sites.shortcuts import get_current_site
-from django.contrib.sites.models import Site
 from django.urls import reverse_lazy, resolve
 from django.views import View
 from django.views.generic import TemplateView, DetailView, FormView, UpdateView
 from django.views.generic.base import ContextMixin
+from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
 from django_filters.rest_framework import DjangoFilterBackend
 from django_select2.views import AutoResponseView
@@ -46,12 +47,15 @@ from rest_framework.views import APIView
 from rules.contrib.rest_framework import AutoPermissionViewSetMixin
 
 from dll.content.filters import (
+    CompetenceFilter,
+    PolymorphicAttributeFilter,
     SolrTagFilter,
     SortingFilter,
     ToolPotentialFilter,
     ToolSubjectFilter,
     ToolWithCostsFilter,
     FavoriteFilter,
+    narrow_to_terms,
 )
 from dll.content.rules import is_bsb_reviewer, is_tuhh_reviewer
 from dll.content.models import (
@@ -83,6 +87,8 @@ from dll.content.serializers import (
     ImageFileSerializer,
     ContentPolymorphicSubmissionSerializer,
 )
+from dll.general.cache import cache_public_response
+from dll.general.sites import get_site
 from dll.general.utils import GERMAN_STATES
 from dll.user.models import DllUser
 from .filters import (
@@ -95,9 +101,12 @@ from .filters import (
     TeachingModuleSchoolTypeFilter,
     ToolFunctionFilter,
 )
+from .detail import get_detail_queryset, get_taxonomies, prepare_detail_object
 from .forms import TestimonialForm
+from .media import create_filer_file
 from .models import Testimonial, TestimonialReview, ToolFunction, Favorite
 from .more_like_this import more_like_this
+from .pagination import SearchPaginator, SolrSearchPagination, hydrate_search_results
 from .serializers import (
     ContentListSerializer,
     ContentPolymorphicSerializer,
@@ -106,7 +115,9 @@ from .serializers import (
     TestimonialReviewSerializer,
     TestimonialSerializer,
 )
-from .utils import get_random_content
+from .suggest import suggest
+from .utils import get_favored_pks, get_random_content
+from .view_counts import count_content_view
 
 
 class ReviewerPermission(BasePermission):
@@ -129,8 +140,7 @@ class SiteRedirectMixin(View):
         if settings.SITE_ID == 2:
             return super().get(self.request)
         else:
-            site = Site.objects.get(pk=2)
-            domain = site.domain
+            domain = get_site(2).domain
             return redirect(f"//{domain}{self.request.path}")
 
 
@@ -182,6 +192,13 @@ class ContentDetailBase(DetailView):
         context = self.get_context_data(object=self.object)
         return self.render_to_response(context)
 
+    def get_queryset(self):
+        return get_detail_queryset(super(ContentDetailBase, self).get_queryset())
+
+    def get_object(self, queryset=None):
+        obj = super(ContentDetailBase, self).get_object(queryset=queryset)
+        return prepare_detail_object(obj)
+
     def get_testimonial_form(self):
         return TestimonialForm(author=self.request.user, content=self.object)
 
@@ -192,17 +209,17 @@ class ContentDetailBase(DetailView):
             ctx["can_add_testimonial"] = not Testimonial.objects.filter(
                 author=self.request.user, content=self.object
             ).exists()
-        ctx["competences"] = Competence.objects.all()
-        ctx["functions"] = ToolFunction.objects.all()
-        ctx["potentials"] = Potential.objects.all()
+        ctx.update(get_taxonomies())
         ctx["recommended_content"] = more_like_this(self.object)
         if self.request.user.is_authenticated:
-            ctx["favored"] = Favorite.objects.filter(
-                user=self.request.user, content=self.get_object().get_draft()
-            ).exists()
+            # drafts and public versions, also used by the teasers on the page
+            ctx["favored_pks"] = get_favored_pks(self.request.user)
+            ctx["favored"] = self.object.pk in ctx["favored_pks"]
         return ctx
 
 
+@method_decorator(count_content_view, name="dispatch")
+@method_decorator(cache_public_response("content"), name="dispatch")
 class ContentDetailView(ContentDetailBase):
     def get_queryset(self):
         qs = super(ContentDetailView, self).get_queryset()
@@ -210,7 +227,7 @@ class ContentDetailView(ContentDetailBase):
 
     def get_context_data(self, **kwargs):
         ctx = super(ContentDetailView, self).get_context_data(**kwargs)
-        ctx["meta"] = self.get_object().as_meta(self.request)
+        ctx["meta"] = self.object.as_meta(self.request)
         if (
             self.request.user.is_authenticated and config.TESTIMONIAL_DLL
             if settings.SITE_ID == 1
@@ -246,12 +263,12 @@ class ToolDetailView(ContentDetailView):
         ctx = super(ToolDetailView, self).get_context_data(**kwargs)
         ctx["show_banner"] = True
         if settings.SITE_ID == 1:
-            dlt_domain = Site.objects.get(pk=2).domain
+            dlt_domain = get_site(2).domain
             ctx[
                 "dlt_tool_url"
             ] = f"{self.request.scheme}://{dlt_domain}/tools/{self.object.slug}"
         if settings.SITE_ID == 2:
-            dll_domain = Site.objects.get(pk=1).domain
+            dll_domain = get_site(1).domain
             ctx[
                 "canonical"
             ] = f"{self.request.scheme}://{dll_domain}/tools/{self.object.slug}/"
@@ -267,8 +284,7 @@ class TrendDetailView(ContentDetailView):
         if settings.SITE_ID == 1:
             return super().get(self.request)
         else:
-            site = Site.objects.get(pk=1)
-            domain = site.domain
+            domain = get_site(1).domain
             return redirect(f"//{domain}{self.request.path}")
 
 
@@ -280,8 +296,7 @@ class TeachingModuleDetailView(ContentDetailView):
         if settings.SITE_ID == 1:
             return super().get(self.request)
         else:
-            site = Site.objects.get(pk=1)
-            domain = site.domain
+            domain = get_site(1).domain
             return redirect(f"//{domain}{self.request.path}")
 
 
@@ -304,27 +319,46 @@ class PublishedContentViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ContentPolymorphicSerializer
     queryset = Content.objects.published()
     filter_backends = [DjangoFilterBackend, SolrTagFilter, SortingFilter]
+    pagination_class = SolrSearchPagination
     permission_classes = []
 
     def get_queryset(self):
         competence = self.request.GET.get("competence", "")
-        teaching_modules = self.request.GET.get("teachingModules", "true")
-        trends = self.request.GET.get("trends", "true")
-        tools = self.request.GET.get("tools", "true")
 
         qs = super(PublishedContentViewSet, self).get_queryset()
 
         if competence:
             qs = qs.filter(competences__slug=competence)
-        if teaching_modules != "true":
-            qs = qs.not_instance_of(TeachingModule)
-        if trends != "true":
-            qs = qs.not_instance_of(Trend)
-        if tools != "true":
-            qs = qs.not_instance_of(Tool)
+        for model in {TeachingModule, Trend, Tool} - set(self.get_content_models()):
+            qs = qs.not_instance_of(model)
 
         return qs
 
+    def get_content_models(self):
+        models = []
+        if self.request.GET.get("teachingModules", "true") == "true":
+            models.append(TeachingModule)
+        if self.request.GET.get("trends", "true") == "true":
+            models.append(Trend)
+        if self.request.GET.get("tools", "true") == "true":
+            models.append(Tool)
+        return models
+
+    def filter_search_queryset(self, sqs):
+        """The filters of ``get_queryset`` as Solr filter queries."""
+        models = self.get_content_models()
+        if not models:
+            return sqs.none()
+        sqs = sqs.models(*models)
+        competence = self.request.GET.get("competence", "")
+        if competence:
+            sqs = narrow_to_terms(
+                sqs,
+                "competences",
+                Competence.objects.filter(slug=competence).values_list("pk", flat=True),
+            )
+        return sqs
+
     def get_serializer_class(self):
         name = resolve(self.request.path_info).url_name
         if name == "public-content-list" and self.request.method == "GET":
@@ -495,7 +529,13 @@ class CompetenceFilterView(DetailView):
 class ContentDataFilterView(ListAPIView):
     queryset = Content
     serializer_class = ContentListSerializer
-    filter_backends = [DjangoFilterBackend, SolrTagFilter, SortingFilter]
+    filter_backends = [
+        DjangoFilterBackend,
+        CompetenceFilter,
+        SolrTagFilter,
+        SortingFilter,
+    ]
+    pagination_class = SolrSearchPagination
     model = None
     permission_classes = []
 
@@ -505,14 +545,104 @@ class ContentDataFilterView(ListAPIView):
             .get_queryset()
             .objects.instance_of(self.model)
         )
-        qs = qs.published()
+        return qs.published()
 
-        competences = self.request.GET.getlist("competences[]", [])
-        if competences:
-            qs = qs.filter(competences__pk__in=competences)
+    def filter_search_queryset(self, sqs):
+        """The filters of ``get_queryset`` as Solr filter queries."""
+        return sqs.models(self.model)
+
+
+class ContentFacetsView(APIView):
+    """
+    Returns the number of matching contents per option of every filter of
+    ``data_view_class`` for the current filter state. The counts of a filter
+    ignore its own selection, so they tell how many results each option would
+    add. All counts are computed with a single aggregated query; the counts of
+    a free text search are Solr facets (see ``get_search_facets``).
+    """
 
+    data_view_class = None
+    permission_classes = []
+
+    def get_facet_queryset(self, data_view, exclude=None):
+        qs = data_view.get_queryset()
+        for backend in data_view.filter_backends:
+            if backend in (exclude, SolrTagFilter, SortingFilter):
+                continue
+            qs = backend().filter_queryset(self.request, qs, data_view)
+        if self.search_pks is not None:
+            qs = qs.filter(pk__in=self.search_pks)
         return qs
 
+    def get_search_facets(self, data_view, sqs, facet_filters):
+        """
+        Counts the options of a free text search with Solr facets. The filters
+        without a selection share one request, every selected filter is counted
+        in a request without its own selection. Returns None if a filter of the
+        view can only be applied in the database.
+        """
+        selected = [f for f in facet_filters if f.get_value(self.request)]
+        unselected = [f for f in facet_filters if f not in selected]
+        requests = [(None, unselected)] if unselected else []
+        requests += [(type(f), [f]) for f in selected]
+        facets = {}
+        for exclude, filters in requests:
+            filtered = SolrTagFilter().narrow_search_queryset(
+                self.request, sqs, data_view, exclude=exclude
+            )
+            if filtered is None:
+                return None
+            for f in filters:
+                filtered = filtered.facet(f.search_field, limit=-1, mincount=1)
+            counts = filtered.facet_counts().get("fields", {})
+            for f in filters:
+                facets[f.facet_name] = f.format_search_facet_counts(
+                    counts.get(f.search_field, [])
+                )
+        return facets
+
+    def get(self, request, *args, **kwargs):
+        data_view = self.data_view_class()
+        data_view.setup(request, *args, **kwargs)
+        data_view.format_kwarg = None
+
+        facet_filters = [
+            backend()
+            for backend in data_view.filter_backends
+            if issubclass(backend, PolymorphicAttributeFilter)
+        ]
+
+        sqs = SolrTagFilter().get_search_queryset(request)
+        self.search_pks = None
+        if sqs is not None:
+            facets = self.get_search_facets(data_view, sqs, facet_filters)
+            if facets is not None:
+                return Response(facets)
+            # a filter of the view can only be applied in the database
+            self.search_pks = [int(pk) for pk in sqs.values_list("pk", flat=True)]
+        counts = [
+            data_view.model.objects.filter(
+                pk__in=self.get_facet_queryset(data_view, exclude=type(f)).values("pk")
+            )
+            .annotate(
+                facet=Value(f.facet_name, output_field=CharField()),
+                option=Cast(f.facet_field, output_field=CharField()),
+            )
+            .order_by()
+            .values("facet", "option")
+            .annotate(count=Count("pk", distinct=True))
+            .values_list("facet", "option", "count")
+            for f in facet_filters
+        ]
+
+        facets = {f.facet_name: {} for f in facet_filters}
+        formatters = {f.facet_name: f.format_facet_value for f in facet_filters}
+        if counts:
+            for facet, option, count in counts[0].union(*counts[1:], all=True):
+                if option is not None:
+                    facets[facet][formatters[facet](option)] = count
+        return Response(facets)
+
 
 class BaseFilterView(TemplateView):
     rss_feed_url = None
@@ -547,6 +677,7 @@ class TeachingModuleFilterView(BaseFilterView):
         return ctx
 
 
+@method_decorator(cache_public_response("teachingmodule"), name="dispatch")
 class TeachingModuleDataFilterView(ContentDataFilterView):
     model = TeachingModule
     filter_backends = [
@@ -555,34 +686,30 @@ class TeachingModuleDataFilterView(ContentDataFilterView):
         TeachingModuleStateFilter,
     ] + ContentDataFilterView.filter_backends
 
+    def get_school_classes(self):
+        """Returns the selected first and last school class."""
+        school_classes = []
+        for param in ("schoolClassFrom", "schoolClassTo"):
+            try:
+                school_classes.append(int(self.request.GET.get(param, "")))
+            except ValueError:
+                school_classes.append(None)
+        return school_classes
+
     def get_queryset(self):
         qs = super(TeachingModuleDataFilterView, self).get_queryset()
 
-        class_from = self.request.GET.get("schoolClassFrom", [])
-        class_to = self.request.GET.get("schoolClassTo", [])
+        class_from, class_to = self.get_school_classes()
         hybrid = self.request.GET.get("hybrid") == "true"
 
-        try:
-            if class_from:
-                class_from = int(class_from)
-        except ValueError:
-            class_from = None
-        try:
-            if class_to:
-                class_to = int(class_to)
-        except ValueError:
-            class_to = None
-
         if class_from:
             qs = qs.filter(
-                TeachingModule___school_class__overlap=NumericRange(
-                    int(class_from), None
-                )
+                TeachingModule___school_class__overlap=NumericRange(class_from, None)
             )
 
         if class_to:
             qs = qs.filter(
-                TeachingModule___school_class__overlap=NumericRange(None, int(class_to))
+                TeachingModule___school_class__overlap=NumericRange(None, class_to)
             )
 
         if hybrid:
@@ -590,6 +717,26 @@ class TeachingModuleDataFilterView(ContentDataFilterView):
 
         return qs.distinct()
 
+    def filter_search_queryset(self, sqs):
+        sqs = super(TeachingModuleDataFilterView, self).filter_search_queryset(sqs)
+
+        class_from, class_to = self.get_school_classes()
+
+        # the indexed upper bound is exclusive, see TeachingModulesIndex
+        if class_from:
+            sqs = sqs.narrow(f"school_class_to:{{{class_from} TO *]")
+        if class_to:
+            sqs = sqs.narrow(f"school_class_from:[* TO {class_to}}}")
+        if self.request.GET.get("hybrid") == "true":
+            sqs = sqs.narrow("hybrid:true")
+
+        return sqs
+
+
+@method_decorator(cache_public_response("teachingmodule"), name="dispatch")
+class TeachingModuleFacetsView(ContentFacetsView):
+    data_view_class = TeachingModuleDataFilterView
+
 
 class ToolFilterView(BaseFilterView):
     template_name = "dll/filter/tools.html"
@@ -634,6 +781,7 @@ class ToolFilterView(BaseFilterView):
         return ctx
 
 
+@method_decorator(cache_public_response("tool"), name="dispatch")
 class ToolDataFilterView(ContentDataFilterView):
     model = Tool
     filter_backends = [
@@ -649,11 +797,17 @@ class ToolDataFilterView(ContentDataFilterView):
     ] + ContentDataFilterView.filter_backends
 
 
+@method_decorator(cache_public_response("tool"), name="dispatch")
+class ToolFacetsView(ContentFacetsView):
+    data_view_class = ToolDataFilterView
+
+
 class TrendFilterView(BaseFilterView):
     template_name = "dll/filter/trends.html"
     rss_feed_url = reverse_lazy("trends-feed")
 
 
+@method_decorator(cache_public_response("trend"), name="dispatch")
 class TrendDataFilterView(ContentDataFilterView):
     model = Trend
 
@@ -671,6 +825,20 @@ class TrendDataFilterView(ContentDataFilterView):
 
         return qs.distinct()
 
+    def filter_search_queryset(self, sqs):
+        sqs = super(TrendDataFilterView, self).filter_search_queryset(sqs)
+
+        language = self.request.GET.get("language", None)
+        trend_types = self.request.GET.getlist("trendTypes[]", [])
+
+        if language:
+            sqs = narrow_to_terms(sqs, "language", [language])
+
+        if trend_types:
+            sqs = narrow_to_terms(sqs, "category", trend_types)
+
+        return sqs
+
 
 class DropdownSmallPagination(PageNumberPagination):
     page_size = 50
@@ -813,15 +981,14 @@ class ImageUploadView(FileUploadBaseView):
         if file_serializer.is_valid():
             image = file_serializer.validated_data["image"]
             filer_folder = obj.get_folder()
-            filer_image = Image.objects.create(
-                original_filename=image.name,
-                file=image,
-                folder=filer_folder,
-                owner=self.request.user,
+            filer_image = create_filer_file(
+                Image, image, folder=filer_folder, owner=self.request.user
             )
 
             obj.image = filer_image
+            obj.thumbnails = {}
             obj.save()
+            obj.schedule_thumbnails()
             return Response(file_serializer.data, status=status.HTTP_201_CREATED)
         else:
             return Response(file_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -849,11 +1016,8 @@ class FileUploadView(FileUploadBaseView):
             file = file_serializer.validated_data["file"]
             folder = obj.get_folder()
 
-            filer_file = File.objects.create(
-                original_filename=file.name,
-                file=file,
-                folder=folder,
-                owner=self.request.user,
+            filer_file = create_filer_file(
+                File, file, folder=folder, owner=self.request.user
             )
             cf = ContentFile.objects.create(
                 content=obj,
@@ -910,6 +1074,7 @@ class ContentFeed(Feed):
         return self.model.objects.published().order_by("-created")[:50]
 
 
+@method_decorator(cache_public_response("trend"), name="__call__")
 class TrendsFeed(ContentFeed):
     model = Trend
     title = "Trends Feed"
@@ -917,6 +1082,7 @@ class TrendsFeed(ContentFeed):
     description = "DLL Trend Updates"
 
 
+@method_decorator(cache_public_response("tool"), name="__call__")
 class ToolsFeed(ContentFeed):
     model = Tool
     title = "Tools Feed"
@@ -924,6 +1090,7 @@ class ToolsFeed(ContentFeed):
     description = "DLL Tool Updates"
 
 
+@method_decorator(cache_public_response("teachingmodule"), name="__call__")
 class TeachingModulesFeed(ContentFeed):
     model = TeachingModule
     title = "Unterrichtsbausteine Feed"
@@ -941,19 +1108,34 @@ def search_view(request):
         | SQ(subjects=q)
         | SQ(school_types=q)
     )
-    sqs.query.boost_fields = {
+    boost_fields = {
         "name": 2,
         "teaser": 1.5,
         "additional_info": 1,
         "authors": 1,
     }
     if request.is_ajax():
+        sqs.query.boost_fields = boost_fields
         results = [{"title": result.name, "url": result.url} for result in sqs[:10]]
         return JsonResponse(results, safe=False)
 
+    if settings.SITE_ID == 2:
+        sqs = sqs.models(Tool)
+    # only fetch the pks, the contents are loaded from the database
+    sqs = sqs.values_list("pk", flat=True)
+    # set last, cloning the query drops the boosts
+    sqs.query.boost_fields = boost_fields
+
+    paginator = SearchPaginator(sqs, settings.REST_FRAMEWORK["PAGE_SIZE"])
+    page = paginator.get_page(request.GET.get("page"))
+    page.object_list = hydrate_search_results(
+        Content.objects.all(), [int(pk) for pk in page.object_list]
+    )
+    prefetch_related_objects(page.object_list, "image", "competences")
+
     # If there are no results - display random Content objects.
     suggestions = []
-    if sqs.count() == 0:
+    if paginator.count == 0:
         if settings.SITE_ID == 1:
             suggestions = get_random_content(
                 limit_teaching_modules=2, limit_tools=2, limit_trends=2
@@ -963,16 +1145,20 @@ def search_view(request):
                 limit_teaching_modules=0, limit_tools=6, limit_trends=0
             )
 
-    if settings.SITE_ID == 2:
-        sqs = sqs.models(Tool)
-
     ctx = {
-        "results": Content.objects.filter(pk__in=sqs.values_list("pk", flat=True)),
+        "results": page.object_list,
+        "page_obj": page,
+        "query": request.GET.get("q", ""),
+        "favored_pks": get_favored_pks(request.user),
         "mlt": suggestions,
     }
     return render(request, "dll/search.html", ctx)
 
 
+def suggest_view(request):
+    return JsonResponse(suggest(request.GET.get("q", "")), safe=False)
+
+
 class FavoriteListApiView(ListAPIView):
     serializer_class = FavoriteSerializer
     permission_classes = [IsAuthenticated]
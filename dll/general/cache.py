@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import uuid
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
+
+logger = logging.getLogger("dll.general.cache")
+
+RESPONSE_CACHE_PREFIX = "response-cache"
+# every cached response depends on the constance config
+CONFIG_TAG = "config"
+IGNORED_QUERY_PARAMETERS = ("fbclid", "gclid")
+
+
+def _tag_key(tag):
+    return f"{RESPONSE_CACHE_PREFIX}:tag:{tag}"
+
+
+def get_tag_versions(tags):
+    """
+    Returns the current version token of each tag. Tokens are random, so a tag
+    that was evicted never falls back to a version used by stale responses.
+    """
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(*tags):
+    """Drops all cached responses depending on one of the given tags."""
+    cache.set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, None)
+    logger.debug("Invalidated response cache tags %s", ", ".join(tags))
+
+
+def normalize_query_string(query_dict):
+    params = sorted(
+        (key, value)
+        for key, values in query_dict.lists()
+        if not key.startswith("utm_") and key not in IGNORED_QUERY_PARAMETERS
+        for value in values
+    )
+    return urlencode(params)
+
+
+def get_response_cache_key(request, tags):
+    site = get_current_site(request)
+    url = f"{request.scheme}://{request.path}?{normalize_query_string(request.GET)}"
+    tag_versions = ":".join(get_tag_versions(tags))
+    digest = hashlib.md5(f"{url}|{tag_versions}".encode()).hexdigest()
+    return f"{RESPONSE_CACHE_PREFIX}:{site.pk}:{digest}"
+
+
+def _count(name):
+    key = f"{RESPONSE_CACHE_PREFIX}:{name}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_response_cache_stats():
+    counters = cache.get_many(
+        [f"{RESPONSE_CACHE_PREFIX}:hits", f"{RESPONSE_CACHE_PREFIX}:misses"]
+    )
+    return {
+        "hits": counters.get(f"{RESPONSE_CACHE_PREFIX}:hits", 0),
+        "misses": counters.get(f"{RESPONSE_CACHE_PREFIX}:misses", 0),
+    }
+
+
+def is_cacheable_request(request):
+    return (
+        settings.RESPONSE_CACHE_ENABLED
+        and request.method == "GET"
+        and not request.user.is_authenticated
+        and not len(messages.get_messages(request))
+    )
+
+
+def is_cacheable_response(response):
+    return response.status_code == 200 and not response.streaming
+
+
+def cache_public_response(*tags, timeout=None):
+    """
+    Caches the responses of a view for anonymous visitors. The cache key consists of
+    the site, the path and the normalized query string, the cached response is
+    dropped as soon as one of the given tags (or the config) is invalidated.
+    """
+    tags = (CONFIG_TAG,) + tags
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+            key = get_response_cache_key(request, tags)
+            response = cache.get(key)
+            if response is not None:
+                _count("hits")
+                response["X-Cache"] = "HIT"
+                return response
+            _count("misses")
+            response = view_func(request, *args, **kwargs)
+            if not is_cacheable_response(response):
+                return response
+
+            def store(response):
+                # never share cookies or a csrf token between visitors
+                if response.cookies or request.META.get("CSRF_COOKIE_USED"):
+                    return
+                cache.set(
+                    key,
+                    response,
+                    settings.RESPONSE_CACHE_TIMEOUT if timeout is None else timeout,
+                )
+
+            if hasattr(response, "render") and callable(response.render):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return _wrapped_view
+
+    return decorator
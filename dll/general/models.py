@@ -1,7 +1,11 @@
+import hashlib
+import json
 import logging
+import time
 
 from django.conf import settings
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
 from django.utils import timezone
 
 from django.utils.translation import gettext_lazy as _
@@ -31,6 +35,12 @@ class PublisherModelBase(TimeStampedModel):
     publisher_is_draft = models.BooleanField(
         default=STATE_DRAFT, editable=False, db_index=True
     )
+    # fingerprint of the draft when it was published the last time
+    publisher_fingerprint = models.CharField(max_length=64, blank=True, editable=False)
+
+    # fields which a partial update does not copy to the public version, the
+    # relation fingerprint has to cover those which are not derived
+    fingerprint_exclude = ("created", "modified")
 
     class Meta:
         abstract = True
@@ -61,6 +71,53 @@ class PublisherModelBase(TimeStampedModel):
             return self
         return self.publisher_linked
 
+    def get_fingerprint_fields(self):
+        return [
+            field
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and not field.name.startswith("publisher_")
+            and field.name not in self.fingerprint_exclude
+        ]
+
+    def get_fingerprint_data(self):
+        """Returns the values of the fields which are copied on publishing."""
+        return {
+            field.attname: field.value_to_string(self)
+            for field in self.get_fingerprint_fields()
+        }
+
+    def get_relation_fingerprint_data(self):
+        """
+        Returns the pks of the many-to-many relations. Subclasses add the data of
+        their other relations.
+        """
+        return {
+            field.name: sorted(getattr(self, field.name).values_list("pk", flat=True))
+            for field in self._meta.many_to_many
+        }
+
+    def get_fingerprint(self):
+        """
+        Returns the fingerprint of the instance: a hash of its fields followed by
+        a hash of its relations (32 hex digits each).
+        """
+        return "".join(
+            hashlib.sha256(
+                json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()
+            ).hexdigest()[:32]
+            for data in (
+                self.get_fingerprint_data(),
+                self.get_relation_fingerprint_data(),
+            )
+        )
+
+    def has_unpublished_changes(self):
+        """Returns whether the draft differs from the published version."""
+        if not self.publisher_linked_id:
+            return True
+        return self.publisher_fingerprint != self.get_fingerprint()
+
 
 class PublisherModel(PublisherModelBase):
     # objects = PublisherQuerySet.as_manager()
@@ -69,15 +126,36 @@ class PublisherModel(PublisherModelBase):
         abstract = True
         permissions = (("can_publish", "Can publish"),)
 
-    def publish(self):
+    def publish(self, force=False):
+        """
+        Replaces the public version with a copy of the draft. The whole swap runs in
+        one transaction, ``post_publish`` is sent once all relations are copied.
+        Returns the new public instance.
+
+        Unless ``force`` is set, a draft which did not change since it was
+        published is not published again, and if only its fields changed they are
+        copied to the existing public version.
+        """
         if not self.publisher_is_draft:
             logger.exception("Can only publish drafts")
             return
-        else:
-            logger.debug(
-                "Publish {} with pk {}".format(self.__class__.__name__, self.pk)
-            )
+        fingerprint = self.get_fingerprint()
+        if self.publisher_linked_id and not force:
+            if self.publisher_fingerprint == fingerprint:
+                logger.debug(
+                    "{} with pk {} is unchanged".format(
+                        self.__class__.__name__, self.pk
+                    )
+                )
+                return self.publisher_linked
+            if self.publisher_fingerprint[32:] == fingerprint[32:]:
+                return self.update_published(fingerprint)
+
+        logger.debug("Publish {} with pk {}".format(self.__class__.__name__, self.pk))
+        start = time.monotonic()
+        with transaction.atomic():
             draft_obj = self
+            draft_obj.publisher_fingerprint = fingerprint
             if draft_obj.publisher_linked:
                 draft_obj.publisher_linked.delete()
                 draft_obj._change_reason = _(
@@ -90,6 +168,7 @@ class PublisherModel(PublisherModelBase):
             publish_obj.created = timezone.now()
             publish_obj.modified = None
             publish_obj.publisher_is_draft = self.STATE_PUBLISHED
+            publish_obj.publisher_fingerprint = draft_obj.publisher_fingerprint
             publish_obj.save()
             self.copy_relations(draft_obj, publish_obj)
             draft_obj.publisher_linked = publish_obj
@@ -97,6 +176,48 @@ class PublisherModel(PublisherModelBase):
             signals.post_publish.send(
                 sender=publish_obj.__class__, instance=publish_obj
             )
+        logger.info(
+            "Published {} {} as {} in {:.0f} ms".format(
+                self.__class__.__name__,
+                self.pk,
+                publish_obj.pk,
+                (time.monotonic() - start) * 1000,
+            )
+        )
+        return publish_obj
+
+    def update_published(self, fingerprint):
+        """
+        Copies the fields of the draft to its public version, which keeps its pk
+        and relations. Returns the updated public instance.
+        """
+        start = time.monotonic()
+        values = {
+            field.attname: getattr(self, field.attname)
+            for field in self.get_fingerprint_fields()
+        }
+        with transaction.atomic():
+            self.__class__.objects.filter(pk=self.publisher_linked_id).update(
+                modified=timezone.now(), publisher_fingerprint=fingerprint, **values
+            )
+            self.__class__.objects.filter(pk=self.pk).update(
+                publisher_fingerprint=fingerprint
+            )
+            self.publisher_fingerprint = fingerprint
+            publish_obj = self.__class__.objects.get(pk=self.publisher_linked_id)
+            self.publisher_linked = publish_obj
+            signals.post_publish.send(
+                sender=publish_obj.__class__, instance=publish_obj
+            )
+        logger.info(
+            "Updated public version {} of {} {} in {:.0f} ms".format(
+                publish_obj.pk,
+                self.__class__.__name__,
+                self.pk,
+                (time.monotonic() - start) * 1000,
+            )
+        )
+        return publish_obj
 
     def copy_relations(self, src, dst):
         pass
@@ -0,0 +1,55 @@
+"""
+Bulk copy helpers for ``PublisherModel.copy_relations``. Each helper copies a
+whole relation of a draft to its public version with a single insert.
+"""
+
+
+def copy_m2m(src, dst, field_name, targets=None):
+    """
+    Copies the rows of a many-to-many relation from ``src`` to ``dst``. The pks of
+    the related objects can be replaced by passing ``targets``. Reverse rows of
+    symmetrical relations are created as well, like ``add()`` does.
+    """
+    field = src._meta.get_field(field_name)
+    through = field.remote_field.through
+    source = through._meta.get_field(field.m2m_field_name()).attname
+    target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+    if targets is None:
+        targets = through.objects.filter(**{source: src.pk}).values_list(
+            target, flat=True
+        )
+    rows = []
+    for pk in targets:
+        rows.append(through(**{source: dst.pk, target: pk}))
+        if field.remote_field.symmetrical:
+            rows.append(through(**{source: pk, target: dst.pk}))
+    through.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def copy_tags(src, dst):
+    """Copies the taggit tags of ``src`` to ``dst``."""
+    through = src.tags.through
+    tag_pks = through.objects.filter(**through.lookup_kwargs(src)).values_list(
+        "tag_id", flat=True
+    )
+    lookup = through.lookup_kwargs(dst)
+    rows = [through(tag_id=pk, **lookup) for pk in tag_pks]
+    through.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def clone_objects(objs, **changes):
+    """
+    Saves copies of the given objects (of a single model without multi-table
+    inheritance) with one insert. ``changes`` are applied to every copy.
+    """
+    objs = list(objs)
+    if not objs:
+        return []
+    for obj in objs:
+        obj.pk = None
+        obj._state.adding = True
+        for name, value in changes.items():
+            setattr(obj, name, value)
+    return type(objs[0])._default_manager.bulk_create(objs)
@@ -1,5 +1,9 @@
+from constance.signals import config_updated
 from django.db.models import signals
 from django.dispatch import Signal
+from wagtail.core.signals import page_published, page_unpublished
+
+from dll.general.cache import CONFIG_TAG, invalidate_tags
 
 
 post_publish = Signal()
@@ -11,4 +15,23 @@ def unpublish(sender, instance, using, **kwargs):
         post_unpublish.send(sender=sender, instance=instance)
 
 
+def invalidate_content_responses(sender, instance, **kwargs):
+    invalidate_tags("content", sender._meta.model_name)
+
+
+def invalidate_page_responses(sender, instance, **kwargs):
+    invalidate_tags("cms")
+
+
+def invalidate_config_responses(sender, key, old_value, new_value, **kwargs):
+    # constance stores missing keys with their default on first access
+    if old_value is not None and old_value != new_value:
+        invalidate_tags(CONFIG_TAG)
+
+
 signals.post_delete.connect(unpublish)
+post_publish.connect(invalidate_content_responses)
+post_unpublish.connect(invalidate_content_responses)
+page_published.connect(invalidate_page_responses)
+page_unpublished.connect(invalidate_page_responses)
+config_updated.connect(invalidate_config_responses)
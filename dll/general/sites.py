@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.db.models.signals import post_delete, post_save
+
+# static branding of each platform, the defaults are the ones of the dll
+PLATFORM_BRANDING = {
+    1: {
+        "main_js": "main_dll",
+        "main_css": "main_dll",
+        "template_suffix": "dll",
+        "title": "digital.learning.lab",
+        "dll_logo": "img/logo/dll_logo_rgb_claim_rechts.png",
+        "logo_desktop_1x": "img/logo/dll_logo_rgb_claim_rechts.png",
+        "logo_desktop_2x": "img/logo/dll_logo_rgb_claim_rechts_large.png",
+        "logo_mobile_1x": "img/logo/dll_logo_rgb_ohne_claim.png",
+        "logo_mobile_2x": "img/logo/dll_logo_rgb_ohne_claim_large.png",
+        "SITE_ID": 1,
+    },
+    2: {
+        "main_js": "main_dlt",
+        "main_css": "main_dlt",
+        "template_suffix": "dlt",
+        "title": "digital.learning.tools",
+        "dll_logo": "img/logo/dll_logo_rgb_claim_rechts.png",
+        "logo_desktop_1x": "img/logo/logo_dlt.svg",
+        "logo_desktop_2x": "img/logo/logo_dlt.svg",
+        "dlt_logo": "img/logo/logo_dlt.svg",
+        "logo_mobile_1x": "img/logo/logo_dlt_mobile.svg",
+        "logo_mobile_2x": "img/logo/logo_dlt_mobile.svg",
+        "SITE_ID": 2,
+    },
+}
+
+_sites = None
+
+
+def get_sites():
+    """
+    Returns all sites by pk. They are loaded once per process and reloaded after
+    a site has been changed.
+    """
+    global _sites
+    if _sites is None:
+        _sites = {site.pk: site for site in Site.objects.all()}
+    return _sites
+
+
+def get_site(pk=None):
+    """Returns the site with the given pk (default: the current site)."""
+    try:
+        return get_sites()[pk or settings.SITE_ID]
+    except KeyError:
+        raise Site.DoesNotExist(f"Site {pk} does not exist")
+
+
+def get_platform_branding(pk=None):
+    return PLATFORM_BRANDING.get(pk or settings.SITE_ID, PLATFORM_BRANDING[1])
+
+
+def get_platform_urls():
+    """Returns the urls of both platforms, as far as their sites exist."""
+    sites = get_sites()
+    return {
+        key: f"https://{sites[pk].domain}"
+        for key, pk in (("dll_url", 1), ("dlt_url", 2))
+        if pk in sites
+    }
+
+
+def clear_sites(sender, **kwargs):
+    global _sites
+    _sites = None
+
+
+post_save.connect(clear_sites, sender=Site)
+post_delete.connect(clear_sites, sender=Site)
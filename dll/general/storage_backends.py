@@ -1,8 +1,27 @@
 # -*- coding: utf-8 -*-
+import os
+
+from filer.utils.files import get_valid_filename
+from filer.utils.generate_filename import randomized
 from storages.backends.s3boto3 import S3Boto3Storage
 from storages.utils import clean_name
 
 
+def content_addressed_upload_to(instance, filename):
+    """
+    Upload path of filer files: blobs are stored under the sha1 of their content,
+    so identical uploads end up at the same path.
+    """
+    if not instance.sha1:
+        return randomized(instance, filename)
+    return os.path.join(
+        instance.sha1[:2],
+        instance.sha1[2:4],
+        instance.sha1,
+        get_valid_filename(filename),
+    )
+
+
 class StaticStorage(S3Boto3Storage):
     """This is needed to set the static-location"""
 
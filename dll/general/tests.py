@@ -1,3 +1,40 @@
-from django.test import TestCase
+from django.contrib.sites.models import Site
+from django.test import RequestFactory, TestCase, override_settings
 
-# Create your tests here.
+from dll.general.context_processors import platform_variables
+from dll.general.sites import clear_sites, get_site
+
+
+class SiteRegistryTests(TestCase):
+    fixtures = ["dll/fixtures/sites.json"]
+
+    def setUp(self):
+        clear_sites(Site)
+        self.request = RequestFactory().get("/")
+
+    def test_sites_are_loaded_once(self):
+        with self.assertNumQueries(1):
+            get_site(1)
+            get_site(2)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_site().pk, 1)
+
+    def test_invalidated_on_change(self):
+        site = get_site(2)
+        site.domain = "tools.example.com"
+        site.save()
+        self.assertEqual(get_site(2).domain, "tools.example.com")
+
+        site.delete()
+        with self.assertRaises(Site.DoesNotExist):
+            get_site(2)
+
+    @override_settings(SITE_ID=2)
+    def test_platform_variables(self):
+        platform_variables(self.request)
+        with self.assertNumQueries(1):  # the uncached constance read
+            variables = platform_variables(self.request)
+        self.assertEqual(variables["title"], "digital.learning.tools")
+        self.assertEqual(variables["SITE_ID"], 2)
+        self.assertEqual(variables["dll_url"], f"https://{get_site(1).domain}")
+        self.assertEqual(variables["dlt_url"], f"https://{get_site(2).domain}")
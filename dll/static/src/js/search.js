@@ -4,13 +4,13 @@ var autocomplete = require('autocomplete.js');
 
 var source = function(query, callback) {
 	$.get({
-		url: '/suche?q=' + query,
+		url: '/suche/vorschlaege?q=' + encodeURIComponent(query),
 		success: function (data, textStatus, jqXHR) {
 			callback(data)
 		}
 	})
 }
-var debouncedSource = debounce(source, 500)
+var debouncedSource = debounce(source, 200)
 autocomplete('#autoComplete', { hint: false }, [
 	{
 		source: debouncedSource,
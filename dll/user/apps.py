@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class UserConfig(AppConfig):
     name = "dll.user"
+
+    def ready(self):
+        import dll.user.permissions
@@ -0,0 +1,15 @@
+from dll.user.permissions import end_permission_cache, start_permission_cache
+
+
+class PermissionCacheMiddleware:
+    """Scopes the permission cache of CachedObjectPermissionBackend to a request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = start_permission_cache()
+        try:
+            return self.get_response(request)
+        finally:
+            end_permission_cache(token)
@@ -1,9 +1,11 @@
-import rules
+from collections import defaultdict
+
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser, Group
-from django.db.models import JSONField
+from django.db.models import F, JSONField, OuterRef, Subquery, Value
 from django.contrib.postgres.fields import ArrayField
 from django.db import models, transaction
+from django.db.models.functions import Coalesce, Concat
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from django_extensions.db.models import TimeStampedModel
@@ -93,35 +95,75 @@ class DllUser(TimeStampedModel, AbstractUser):
         return Content.objects.filter(author=self)
 
     def qs_of_coauthored_content(self):
-        return self.collaborative_content.filter(co_authors=self)
+        return self.collaborative_content.all()
 
     def qs_any_content(self):
-        return list(self.qs_of_personal_content()) + list(
-            self.qs_of_coauthored_content()
-        )
+        from dll.content.models import Content
+
+        return Content.objects.editable_by(self)
 
     @property
     def is_reviewer(self):
         # todo: rewrite this as rule
-        return (
-            self.is_superuser
-            or rules.is_group_member("BSB-Reviewer")(self)
-            or rules.is_group_member("TUHH-Reviewer")(self)
+        from dll.user.permissions import get_group_names
+
+        return self.is_superuser or bool(
+            {"BSB-Reviewer", "TUHH-Reviewer"} & get_group_names(self)
         )
 
     def retire(self):
+        """
+        Hands the user's contents over before the account is deleted: the first
+        co-author becomes the author of the user's contents, the user is removed
+        from the contents they co-author and added to the ex-authors of both.
+        Runs a handful of set-based statements regardless of the number of
+        contents, writes the history of the changed contents in bulk and returns
+        the number of changed contents and relations.
+        """
+        from dll.content.models import Content
+
+        co_authorships = Content.co_authors.through.objects
         with transaction.atomic():
-            for content in self.qs_of_personal_content():
-                content.author = None
-                if content.co_authors.count():
-                    content.author = content.co_authors.first()
-                    content.co_authors.remove(content.author)
-                content.add_ex_author(self.full_name)
-                content.save()
-
-            for content in self.qs_of_coauthored_content():
-                content.co_authors.remove(self)
-                content.add_ex_author(self.full_name)
+            personal_pks = set(
+                Content.objects.filter(author=self).values_list("pk", flat=True)
+            )
+            coauthored_pks = set(
+                co_authorships.filter(dlluser=self).values_list("content", flat=True)
+            )
+            first_co_authors = (
+                co_authorships.filter(content=OuterRef("pk"))
+                .exclude(dlluser=self)
+                .order_by("dlluser")
+                .values("dlluser")[:1]
+            )
+            Content.objects.filter(pk__in=personal_pks).update(
+                author=Subquery(first_co_authors)
+            )
+            # the new authors are no co-authors anymore
+            promoted = co_authorships.filter(
+                content__in=personal_pks, dlluser=F("content__author")
+            ).delete()[0]
+            removed = co_authorships.filter(dlluser=self).delete()[0]
+            Content.objects.filter(pk__in=personal_pks | coauthored_pks).update(
+                ex_authors=Concat(
+                    Coalesce("ex_authors", Value("")), Value(f", {self.full_name}")
+                )
+            )
+            # update() skips save(), so the history is written in bulk as well
+            changed = defaultdict(list)
+            for content in Content.objects.filter(pk__in=personal_pks | coauthored_pks):
+                changed[content.__class__].append(content)
+            reason = _("Account von {} wurde gelöscht.").format(self.full_name)
+            for model, contents in changed.items():
+                model.history.bulk_history_create(
+                    contents, update=True, default_change_reason=reason
+                )
+        return {
+            "contents": len(personal_pks | coauthored_pks),
+            "reassigned": promoted,
+            "orphaned": len(personal_pks) - promoted,
+            "co_authorships": removed,
+        }
 
     @cached_property
     def status_list(self) -> list:
@@ -136,17 +178,9 @@ class DllUser(TimeStampedModel, AbstractUser):
 
     @cached_property
     def tool_box_information(self):
-        from dll.content.models import Potential, Tool
-
-        res = {}
-        tools = Tool.objects.filter(pk__in=self.favorites.values_list("pk", flat=True))
-        for potential in Potential.objects.all():
-            res[potential.slug] = {
-                "name": potential.name,
-                "count": tools.filter(potentials__in=[potential]).count(),
-                "pk": potential.pk,
-            }
-        return res
+        from dll.content.utils import get_tool_box_information
+
+        return get_tool_box_information(self)
 
 
 class EmailChangeRequest(TimeStampedModel):
@@ -0,0 +1,113 @@
+from contextvars import ContextVar
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from rules.permissions import ObjectPermissionBackend
+
+from dll.content.models import Content, Review, TeachingModule, Tool, Trend
+from dll.user.models import DllUser
+
+# group memberships change rarely and only in the admin, the cached group names
+# of a user are dropped whenever they do
+GROUP_NAMES_TIMEOUT = 60 * 60
+
+# permission checks of the current request, see PermissionCacheMiddleware
+_permission_cache = ContextVar("permission_cache", default=None)
+
+
+def get_group_names_key(user_pk):
+    return f"user-groups:{user_pk}"
+
+
+def get_group_names(user):
+    """
+    Returns the names of the user's groups. They are cached across requests and
+    kept on the user instance, where rules.is_group_member looks them up.
+    """
+    if not getattr(user, "pk", None):
+        return set()
+    if not hasattr(user, "_group_names_cache"):
+        key = get_group_names_key(user.pk)
+        group_names = cache.get(key)
+        if group_names is None:
+            group_names = set(user.groups.values_list("name", flat=True))
+            cache.set(key, group_names, GROUP_NAMES_TIMEOUT)
+        user._group_names_cache = group_names
+    return user._group_names_cache
+
+
+def clear_group_names(user_pks):
+    cache.delete_many([get_group_names_key(pk) for pk in user_pks])
+
+
+def get_permission_cache_key(user, perm, obj):
+    if obj is None:
+        return user.pk, perm, None
+    if not getattr(obj, "pk", None):
+        return None
+    return user.pk, perm, obj._meta.label, obj.pk
+
+
+class CachedObjectPermissionBackend(ObjectPermissionBackend):
+    """
+    Evaluates the rules of a permission once per user and object within a
+    request, until the request writes to the database. Outside of requests
+    every check is evaluated.
+    """
+
+    def has_perm(self, user, perm, *args, **kwargs):
+        permission_cache = _permission_cache.get()
+        obj = args[0] if args else None
+        key = None
+        if permission_cache is not None:
+            key = get_permission_cache_key(user, perm, obj)
+        if key is None:
+            return super().has_perm(user, perm, *args, **kwargs)
+        if key not in permission_cache:
+            permission_cache[key] = super().has_perm(user, perm, *args, **kwargs)
+        return permission_cache[key]
+
+
+def start_permission_cache():
+    return _permission_cache.set({})
+
+
+def end_permission_cache(token):
+    _permission_cache.reset(token)
+
+
+def clear_permission_cache(sender, **kwargs):
+    permission_cache = _permission_cache.get()
+    if permission_cache:
+        permission_cache.clear()
+
+
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        # user.groups was changed
+        clear_group_names([instance.pk])
+    elif pk_set is not None:
+        # group.user_set was changed
+        clear_group_names(pk_set)
+    else:
+        clear_group_names(instance.user_set.values_list("pk", flat=True))
+
+
+def group_changed(sender, instance, **kwargs):
+    clear_group_names(instance.user_set.values_list("pk", flat=True))
+
+
+# the rules depend on related objects, e.g. the reviews of a content. Deletions
+# are only watched on the models of the rules to keep bulk deletes of others fast;
+# co-authorships are covered by m2m_changed, django sends no delete signals for
+# auto-created through models
+post_save.connect(clear_permission_cache)
+for model in (Content, TeachingModule, Tool, Trend, Review):
+    post_delete.connect(clear_permission_cache, sender=model)
+m2m_changed.connect(clear_permission_cache)
+m2m_changed.connect(user_groups_changed, sender=DllUser.groups.through)
+post_save.connect(group_changed, sender=Group)
+pre_delete.connect(group_changed, sender=Group)
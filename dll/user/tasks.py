@@ -0,0 +1,25 @@
+import logging
+
+from django.db import DatabaseError, transaction
+
+from dll.configuration.celery import app
+from dll.user.models import DllUser
+
+logger = logging.getLogger("dll.user.tasks")
+
+
+@app.task(bind=True, default_retry_delay=5 * 60, max_retries=3)
+def retire_user(self, user_pk):
+    """Retires and deletes a user deactivated by ProfileViewDelete."""
+    try:
+        user = DllUser.objects.get(pk=user_pk)
+    except DllUser.DoesNotExist:
+        return
+    try:
+        with transaction.atomic():
+            changes = user.retire()
+            user.delete()
+    except DatabaseError as e:
+        logger.warning("Retiring user {} failed: {}".format(user_pk, e))
+        raise self.retry(exc=e)
+    logger.info("Retired user {}: {}".format(user_pk, changes))
@@ -0,0 +1,105 @@
+from django.core.cache import cache
+
+from dll.content.models import Competence, Content
+from dll.content.rules import is_co_author
+from dll.content.tests.test_review_submission import BaseTestCase
+from dll.user.models import DllUser
+from dll.user.permissions import (
+    end_permission_cache,
+    get_group_names,
+    start_permission_cache,
+)
+from dll.user.utils import get_bsb_reviewer_group, get_tuhh_reviewer_group
+
+
+class PermissionCacheTests(BaseTestCase):
+    def setUp(self):
+        super(PermissionCacheTests, self).setUp()
+        cache.clear()
+
+    def test_group_names_are_cached_across_requests(self):
+        self.assertEqual(get_group_names(self.bsb_reviewer), {"BSB-Reviewer"})
+        reviewer = DllUser.objects.get(pk=self.bsb_reviewer.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(reviewer.is_reviewer)
+
+    def test_group_names_are_cleared_on_changes(self):
+        get_group_names(self.author)
+        get_tuhh_reviewer_group().user_set.add(self.author)
+        author = DllUser.objects.get(pk=self.author.pk)
+        self.assertEqual(get_group_names(author), {"TUHH-Reviewer"})
+
+        author.groups.clear()
+        author = DllUser.objects.get(pk=self.author.pk)
+        self.assertFalse(author.is_reviewer)
+
+        get_bsb_reviewer_group().user_set.add(author)
+        group = get_bsb_reviewer_group()
+        group.name = "BSB-Reviewer (alt)"
+        group.save()
+        author = DllUser.objects.get(pk=self.author.pk)
+        self.assertEqual(get_group_names(author), {"BSB-Reviewer (alt)"})
+
+    def test_permissions_are_cached_within_request(self):
+        token = start_permission_cache()
+        try:
+            self.assertTrue(
+                self.co_author.has_perm("content.change_content", self.content)
+            )
+            with self.assertNumQueries(0):
+                self.assertTrue(
+                    self.co_author.has_perm("content.change_content", self.content)
+                )
+
+            # the checks are evaluated again after writes
+            self.content.submit_for_review(by_user=self.author)
+            self.content.refresh_from_db()
+            self.assertFalse(
+                self.co_author.has_perm("content.change_content", self.content)
+            )
+        finally:
+            end_permission_cache(token)
+
+    def test_permissions_are_cleared_on_deletes_of_rule_models(self):
+        self.content.submit_for_review(by_user=self.author)
+        competence = Competence.objects.create(cid=1)
+        token = start_permission_cache()
+        try:
+            self.assertFalse(
+                self.co_author.has_perm("content.change_content", self.content)
+            )
+            # deletes of other models keep the cached checks
+            competence.delete()
+            with self.assertNumQueries(0):
+                self.co_author.has_perm("content.change_content", self.content)
+
+            self.content.reviews.all().delete()
+            self.assertTrue(
+                self.co_author.has_perm("content.change_content", self.content)
+            )
+        finally:
+            end_permission_cache(token)
+
+    def test_permissions_are_evaluated_outside_of_requests(self):
+        self.co_author.has_perm("content.change_content", self.content)
+        with self.assertNumQueries(2):
+            self.co_author.has_perm("content.change_content", self.content)
+
+    def test_co_authorship_is_a_single_lookup(self):
+        self.content.co_authors.add(self.other_author)
+        with self.assertNumQueries(1):
+            self.assertTrue(is_co_author(self.co_author, self.content))
+        with self.assertNumQueries(1):
+            self.assertFalse(is_co_author(self.bsb_reviewer, self.content))
+        content = Content.objects.prefetch_related("co_authors").get(pk=self.content.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(is_co_author(self.other_author, content))
+
+    def test_editable_contents(self):
+        self.content.co_authors.add(self.other_author)
+        self.assertEqual(set(self.co_author.qs_any_content()), {self.content})
+        self.assertEqual(
+            set(self.other_author.qs_any_content()),
+            {self.content, self.content.related_content.get()},
+        )
+        self.assertFalse(self.bsb_reviewer.qs_any_content().exists())
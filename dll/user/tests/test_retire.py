@@ -0,0 +1,121 @@
+from unittest import mock
+
+from celery.exceptions import Retry
+from django.db import OperationalError, connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from dll.content.models import Content, TeachingModule
+from dll.content.tests.test_review_submission import BaseTestCase
+from dll.user.models import DllUser
+from dll.user.tasks import retire_user
+
+
+class RetireUserTests(BaseTestCase):
+    def setUp(self):
+        super(RetireUserTests, self).setUp()
+        # Foo: authored by alice, co-authored by bob and john
+        self.content.co_authors.add(self.other_author)
+        self.content.publish()
+        self.solo = TeachingModule.objects.create(name="Solo", author=self.author)
+        self.joint = TeachingModule.objects.create(
+            name="Gemeinsam", author=self.other_author, ex_authors=", Eve Doe"
+        )
+        self.joint.co_authors.add(self.author, self.co_author)
+
+    def test_contents_are_handed_over(self):
+        changes = self.author.retire()
+        self.assertEqual(
+            changes,
+            {"contents": 4, "reassigned": 2, "orphaned": 1, "co_authorships": 1},
+        )
+
+        for content in (self.content, self.content.get_published()):
+            content.refresh_from_db()
+            self.assertEqual(content.author, self.co_author)
+            self.assertEqual(list(content.co_authors.all()), [self.other_author])
+            self.assertEqual(content.ex_authors, ", Alice Doe")
+
+        self.solo.refresh_from_db()
+        self.assertIsNone(self.solo.author)
+        self.assertEqual(self.solo.ex_authors_list, ["", "Alice Doe"])
+
+        self.joint.refresh_from_db()
+        self.assertEqual(self.joint.author, self.other_author)
+        self.assertEqual(list(self.joint.co_authors.all()), [self.co_author])
+        self.assertEqual(self.joint.ex_authors, ", Eve Doe, Alice Doe")
+
+        # other authors are not affected
+        bar = Content.objects.get(name="Bar")
+        self.assertEqual(bar.author, self.other_author)
+        self.assertIsNone(bar.ex_authors)
+
+    def test_history_is_written(self):
+        self.author.retire()
+        for content in (self.content, self.content.get_published(), self.solo):
+            record = content.get_real_instance().history.latest()
+            self.assertEqual(record.history_type, "~")
+            self.assertEqual(record.ex_authors, ", Alice Doe")
+            self.assertEqual(
+                record.history_change_reason, "Account von Alice Doe wurde gelöscht."
+            )
+        self.assertEqual(self.content.history.latest().author, self.co_author)
+        self.assertIsNone(self.solo.history.latest().author)
+        self.assertEqual(self.joint.history.latest().ex_authors, ", Eve Doe, Alice Doe")
+
+    def _count_retire_queries(self):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                self.author.retire()
+            transaction.set_rollback(True)
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_constant(self):
+        few_queries = self._count_retire_queries()
+        for i in range(5):
+            content = TeachingModule.objects.create(
+                name=f"Modul {i}", author=self.author
+            )
+            content.co_authors.add(self.co_author)
+            TeachingModule.objects.create(
+                name=f"Fremd {i}", author=self.other_author
+            ).co_authors.add(self.author)
+        self.assertEqual(self._count_retire_queries(), few_queries)
+
+    def _delete_account(self):
+        self.author.set_password("password")
+        self.author.save()
+        self.client.login(username="test+alice@blueshoe.de", password="password")
+        response = self.client.post(
+            reverse("user:account_delete"), {"conditions": "on"}
+        )
+        self.assertRedirects(
+            response,
+            reverse("user:account_delete_success"),
+            fetch_redirect_response=False,
+        )
+
+    def test_delete_account(self):
+        self._delete_account()
+        self.assertFalse(DllUser.objects.filter(pk=self.author.pk).exists())
+        self.solo.refresh_from_db()
+        self.assertEqual(self.solo.ex_authors, ", Alice Doe")
+
+    @override_settings(RETIRE_USER_SYNC_LIMIT=1)
+    def test_delete_account_in_background(self):
+        # the task runs eagerly in the tests
+        self._delete_account()
+        self.assertFalse(DllUser.objects.filter(pk=self.author.pk).exists())
+        self.content.refresh_from_db()
+        self.assertEqual(self.content.author, self.co_author)
+
+    def test_task_retries_on_database_errors(self):
+        with mock.patch.object(
+            DllUser, "retire", side_effect=OperationalError("deadlock")
+        ):
+            with mock.patch.object(retire_user, "retry", side_effect=Retry) as retry:
+                with self.assertRaises(Retry):
+                    retire_user(self.author.pk)
+        self.assertIsInstance(retry.call_args.kwargs["exc"], OperationalError)
+        self.assertTrue(DllUser.objects.filter(pk=self.author.pk).exists())
@@ -0,0 +1,86 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.translation import gettext as _
+
+from dll.content.models import TeachingModule, Trend
+from dll.content.tests.test_review_submission import BaseTestCase
+
+# queries of the review queue, including session, user and groups
+REVIEW_QUEUE_QUERY_BUDGET = 12
+
+
+class ReviewerQueueTests(BaseTestCase):
+    def _submit(self, model, name, reviewer=None):
+        content = model.objects.create(name=name, author=self.author)
+        content.submit_for_review(by_user=self.author)
+        if reviewer:
+            review = content.review
+            review.assigned_reviewer = reviewer
+            review.save()
+        return content
+
+    def _submit_contents(self, count, suffix=""):
+        for i in range(count):
+            self._submit(TeachingModule, f"Modul {i}{suffix}")
+            self._submit(
+                TeachingModule, f"Modul zugewiesen {i}{suffix}", self.bsb_reviewer
+            )
+            self._submit(Trend, f"Trend {i}{suffix}", self.tuhh_reviewer)
+
+    def _get(self, user):
+        self.client.force_login(user)
+        self.client.get(reverse("content-pending"))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("content-pending"))
+        self.assertEqual(response.status_code, 200)
+        rows = {row["name"]: row for row in response.json()["results"]}
+        return rows, len(ctx.captured_queries)
+
+    def test_contents_of_the_reviewers_group(self):
+        self._submit_contents(1)
+        rows, queries = self._get(self.bsb_reviewer)
+        self.assertEqual(set(rows), {"Modul 0", "Modul zugewiesen 0"})
+        rows, queries = self._get(self.tuhh_reviewer)
+        self.assertEqual(set(rows), {"Trend 0"})
+        rows, queries = self._get(self.author)
+        self.assertEqual(rows, {})
+
+    def test_capabilities(self):
+        self._submit_contents(1)
+        rows, queries = self._get(self.bsb_reviewer)
+
+        row = rows["Modul 0"]
+        self.assertFalse(row["has_assigned_reviewer"])
+        self.assertIsNone(row["reviewer"])
+        self.assertFalse(row["can_unassign"])
+        self.assertTrue(row["can_assign"])
+        self.assertTrue(row["can_claim"])
+        self.assertIsNotNone(row["submitted"])
+        self.assertEqual(row["status"], _("Submitted"))
+
+        row = rows["Modul zugewiesen 0"]
+        self.assertTrue(row["has_assigned_reviewer"])
+        self.assertEqual(row["reviewer"], self.bsb_reviewer.full_name)
+        self.assertTrue(row["can_unassign"])
+
+    def test_superuser_sees_all_contents(self):
+        self._submit_contents(1)
+        self.other_author.is_superuser = True
+        self.other_author.save()
+        rows, queries = self._get(self.other_author)
+        self.assertEqual(len(rows), 3)
+        row = rows["Trend 0"]
+        self.assertEqual(row["reviewer"], self.tuhh_reviewer.full_name)
+        self.assertFalse(row["can_unassign"])
+        self.assertTrue(row["can_assign"])
+        self.assertTrue(row["can_claim"])
+
+    def test_query_count_is_constant(self):
+        self._submit_contents(1)
+        rows, few_queries = self._get(self.bsb_reviewer)
+        self._submit_contents(5, suffix=" 2")
+        rows, many_queries = self._get(self.bsb_reviewer)
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(few_queries, many_queries)
+        self.assertLessEqual(many_queries, REVIEW_QUEUE_QUERY_BUDGET)
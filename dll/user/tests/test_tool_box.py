@@ -0,0 +1,79 @@
+from django.core.cache import cache
+
+from dll.content.models import Potential, Tool
+from dll.content.tests.test_content_views import BaseTestCase
+from dll.content.utils import get_tool_box_information
+from dll.user.models import DllUser
+
+
+class ToolBoxTests(BaseTestCase):
+    def setUp(self):
+        super(ToolBoxTests, self).setUp()
+        cache.clear()
+        self.communicate = Potential.objects.get(slug="kommunizieren")
+        self.present = Potential.objects.get(slug="reflektieren")
+        self.tool = Tool.objects.drafts().get(name="Tool Fusce egestas")
+        self.other_tool = Tool.objects.drafts().get(name="Tool Duis leo")
+        self.tool.potentials.add(self.communicate, self.present)
+        self.tool.publish()
+        self.other_tool.potentials.add(self.communicate)
+        self.other_tool.publish()
+
+    def _counts(self, user=None):
+        information = get_tool_box_information(user or self.author)
+        return {
+            slug: info["count"]
+            for slug, info in information.items()
+            if slug in (self.communicate.slug, self.present.slug)
+        }
+
+    def test_favorites_are_counted_per_potential(self):
+        self.assertEqual(
+            self._counts(), {self.communicate.slug: 0, self.present.slug: 0}
+        )
+        cache.clear()
+        self.tool.favor(self.author)
+        self.other_tool.favor(self.author)
+        with self.assertNumQueries(1):
+            counts = self._counts()
+        self.assertEqual(counts, {self.communicate.slug: 2, self.present.slug: 1})
+
+    def test_published_versions_are_counted(self):
+        self.other_tool.favor(self.author)
+        # unpublished changes of a draft are not counted
+        self.other_tool.potentials.add(self.present)
+        unpublished = Tool.objects.create(name="Tool Neu", author=self.author)
+        unpublished.potentials.add(self.communicate)
+        unpublished.favor(self.author)
+        self.assertEqual(
+            self._counts(), {self.communicate.slug: 1, self.present.slug: 0}
+        )
+
+    def test_cache_is_invalidated(self):
+        self.assertEqual(self._counts()[self.communicate.slug], 0)
+        with self.assertNumQueries(0):
+            self._counts()
+
+        self.tool.favor(self.author)
+        self.assertEqual(self._counts()[self.communicate.slug], 1)
+        self.tool.unfavor(self.author)
+        self.assertEqual(self._counts()[self.communicate.slug], 0)
+
+        self.other_tool.favor(self.author)
+        self.assertEqual(self._counts()[self.present.slug], 0)
+        self.other_tool.potentials.add(self.present)
+        self.other_tool.publish()
+        self.assertEqual(self._counts()[self.present.slug], 1)
+
+        potentials = Potential.objects.count()
+        Potential.objects.create(name="Recherchieren")
+        self.assertEqual(len(get_tool_box_information(self.author)), potentials + 1)
+
+    def test_tool_box_of_user(self):
+        self.tool.favor(self.author)
+        user = DllUser.objects.get(pk=self.author.pk)
+        information = user.tool_box_information
+        self.assertEqual(
+            information[self.present.slug],
+            {"name": self.present.name, "count": 1, "pk": self.present.pk},
+        )
@@ -0,0 +1,91 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.translation import gettext as _
+
+from dll.content.models import TeachingModule
+from dll.content.tests.test_review_submission import BaseTestCase
+
+
+class UserContentTests(BaseTestCase):
+    def setUp(self):
+        super(UserContentTests, self).setUp()
+        self.author.set_password("password")
+        self.author.save()
+        self.client.login(username="test+alice@blueshoe.de", password="password")
+
+    def _create(self, name, submit=False, accept=False, resubmit=False, decline=False):
+        content = TeachingModule.objects.create(name=name, author=self.author)
+        content.co_authors.add(self.co_author)
+        if submit:
+            content.submit_for_review(by_user=self.author)
+        if accept:
+            content.review.accept(by_user=self.bsb_reviewer)
+        if resubmit:
+            content.submit_for_review(by_user=self.author)
+        if decline:
+            content.review.decline(by_user=self.bsb_reviewer)
+        return content
+
+    def _create_contents(self, suffix=""):
+        self._create(f"Entwurf{suffix}")
+        self._create(f"Eingereicht{suffix}", submit=True)
+        self._create(f"Abgelehnt{suffix}", submit=True, decline=True)
+        self._create(f"Freigegeben{suffix}", submit=True, accept=True)
+        self._create(f"Erneut{suffix}", submit=True, accept=True, resubmit=True)
+        self._create(
+            f"Erneut abgelehnt{suffix}",
+            submit=True,
+            accept=True,
+            resubmit=True,
+            decline=True,
+        )
+
+    def _get(self, **params):
+        # the first request of the session updates it
+        self.client.get(reverse("user-contents"), params)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("user-contents"), params)
+        self.assertEqual(response.status_code, 200)
+        statuses = {c["name"]: c["status"] for c in response.json()["results"]}
+        return statuses, len(ctx.captured_queries)
+
+    def test_status(self):
+        self._create_contents()
+        statuses, queries = self._get()
+        self.assertEqual(statuses["Entwurf"], _("Draft"))
+        self.assertEqual(statuses["Eingereicht"], _("Submitted"))
+        self.assertEqual(statuses["Abgelehnt"], _("Declined"))
+        self.assertEqual(statuses["Freigegeben"], _("Approved"))
+        self.assertEqual(statuses["Erneut"], _("Approved - Resubmission pending."))
+        self.assertEqual(
+            statuses["Erneut abgelehnt"], _("Approved - Resubmission declined.")
+        )
+
+    def test_status_filter(self):
+        self._create_contents()
+        statuses, queries = self._get(status="draft")
+        self.assertEqual(set(statuses), {"Foo", "Entwurf"})
+        statuses, queries = self._get(status="submitted")
+        self.assertEqual(set(statuses), {"Eingereicht", "Erneut"})
+        statuses, queries = self._get(status="declined")
+        self.assertEqual(set(statuses), {"Abgelehnt", "Erneut abgelehnt"})
+        statuses, queries = self._get(status="approved")
+        self.assertEqual(set(statuses), {"Freigegeben", "Erneut", "Erneut abgelehnt"})
+
+    def test_query_count_is_constant(self):
+        self._create_contents()
+        statuses, few_queries = self._get()
+        self._create_contents(suffix=" 2")
+        statuses, many_queries = self._get()
+        self.assertEqual(len(statuses), 13)
+        self.assertEqual(few_queries, many_queries)
+
+    def test_co_authored_contents_are_listed_once(self):
+        content = self._create("Gemeinsam")
+        content.co_authors.add(self.other_author, self.bsb_reviewer)
+        self.client.force_login(self.co_author)
+        response = self.client.get(reverse("user-contents"))
+        names = [content["name"] for content in response.json()["results"]]
+        self.assertEqual(sorted(names), ["Foo", "Gemeinsam"])
+        self.assertEqual(response.json()["count"], 2)
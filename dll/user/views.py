@@ -5,11 +5,12 @@ from django.contrib.auth import login, get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import render, redirect
 from django.urls import reverse_lazy, reverse
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 from constance import config
@@ -36,6 +37,7 @@ from dll.content.models import (
     Trend,
     Review,
 )
+from dll.content.review_queue import ReviewerQueue
 from dll.content.rules import is_bsb_reviewer, is_tuhh_reviewer
 from dll.content.serializers import (
     TeachingModuleSerializer,
@@ -47,6 +49,7 @@ from dll.content.serializers import (
 )
 from dll.content.views import BreadcrumbMixin, SiteRedirectMixin
 from dll.user.models import EmailChangeRequest
+from dll.user.tasks import retire_user
 from dll.user.tokens import account_activation_token, email_confirmation_token
 from .forms import SignUpForm
 from ..communication.tokens import newsletter_confirm_token
@@ -143,7 +146,7 @@ class CreateEditContentView(LoginRequiredMixin, TemplateView, BreadcrumbMixin):
         qs = self.model.objects.drafts()
         user = self.request.user
         if not user.is_superuser:
-            qs = qs.filter(Q(author=user) | Q(co_authors__in=[user.pk])).distinct()
+            qs = qs.editable_by(user)
         if not getattr(self, "object", None):
             slug = self.kwargs.get("slug", None)
             if slug:
@@ -341,9 +344,12 @@ class UserContentView(ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        qs = Content.objects.filter(Q(author=user) | Q(co_authors__in=[user]))
-
-        qs = qs.drafts()
+        qs = (
+            Content.objects.editable_by(user)
+            .drafts()
+            .with_review_status()
+            .select_related("author")
+        )
 
         type = self.request.GET.get("type", None)
         search_term = self.request.GET.get("q", None)
@@ -357,22 +363,26 @@ class UserContentView(ListAPIView):
             qs = qs.instance_of(TeachingModule)
 
         if status == "draft":
-            qs = qs.filter(publisher_linked__isnull=True, reviews__isnull=True)
+            qs = qs.filter(publisher_linked__isnull=True, has_reviews=False)
         if status == "submitted":
-            qs = qs.filter(
-                Q(reviews__status=Review.NEW) | Q(reviews__status=Review.IN_PROGRESS)
-            )
+            qs = qs.filter(self.has_review_with_status(Review.NEW, Review.IN_PROGRESS))
         if status == "approved":
             qs = qs.filter(publisher_linked__isnull=False)
         if status == "declined":
-            qs = qs.filter(reviews__status=Review.DECLINED)
+            qs = qs.filter(self.has_review_with_status(Review.DECLINED))
 
         if search_term:
             qs = qs.filter(
                 Q(name__icontains=search_term) | Q(teaser__icontains=search_term)
             )
 
-        return qs.distinct()
+        return qs
+
+    @staticmethod
+    def has_review_with_status(*statuses):
+        return Exists(
+            Review.objects.filter(content=OuterRef("pk"), status__in=statuses)
+        )
 
 
 class UserInvitationView(UserContentView):
@@ -385,7 +395,11 @@ class UserInvitationView(UserContentView):
             to=user, accepted=None
         ).values_list("content__pk", flat=True)
 
-        return Content.objects.filter(pk__in=invitation_contents)
+        return (
+            Content.objects.filter(pk__in=invitation_contents)
+            .with_review_status()
+            .select_related("author")
+        )
 
 
 def activate_user(
@@ -411,13 +425,18 @@ def activate_user(
 class PendingReviewContentView(UserContentView):
     serializer_class = ContentListInternalReviewSerializer
 
+    @cached_property
+    def review_queue(self):
+        return ReviewerQueue(self.request.user)
+
     def get_queryset(self):
-        reviews = Review.objects.filter(
-            is_active=True, status__in=[Review.NEW, Review.IN_PROGRESS]
-        )
-        qs = Content.objects.drafts().filter(reviews__in=reviews).order_by("created")
+        qs = Content.objects.drafts().with_review_status().select_related("author")
+        qs = qs.order_by("created")
         if settings.SITE_ID == 2:
-            return qs.instance_of(Tool)
+            reviews = Review.objects.filter(
+                is_active=True, status__in=[Review.NEW, Review.IN_PROGRESS]
+            )
+            return qs.filter(reviews__in=reviews).instance_of(Tool)
 
         type = self.request.GET.get("type", None)
         search_term = self.request.GET.get("q", None)
@@ -434,17 +453,12 @@ class PendingReviewContentView(UserContentView):
                 Q(name__icontains=search_term) | Q(teaser__icontains=search_term)
             )
 
-        user = self.request.user
-
-        if user.is_superuser:
-            return qs
+        return self.review_queue.get_queryset(qs)
 
-        if is_tuhh_reviewer(user):
-            return qs.not_instance_of(TeachingModule)
-        if is_bsb_reviewer(user):
-            return qs.instance_of(TeachingModule)
-
-        return qs.none()
+    def get_serializer_context(self):
+        context = super(PendingReviewContentView, self).get_serializer_context()
+        context["review_queue"] = self.review_queue
+        return context
 
 
 class BaseProfileView(FormView, BreadcrumbMixin):
@@ -560,8 +574,14 @@ class ProfileViewDelete(BaseProfileView):
 
     def form_valid(self, form):
         user = self.request.user
-        user.retire()
-        form.save()
+        if user.qs_any_content().count() > settings.RETIRE_USER_SYNC_LIMIT:
+            # the account is locked right away and handed over in the background
+            user.is_active = False
+            user.save(update_fields=["is_active"])
+            retire_user.delay(user.pk)
+        else:
+            user.retire()
+            form.save()
         return HttpResponseRedirect(self.get_success_url())
 
 
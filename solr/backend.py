@@ -52,13 +52,13 @@ class CustomSolrSearchBackend(SolrSearchBackend):
 
                 # If it's text and not being indexed, we probably don't want
                 # to do the normal lowercase/tokenize/stemming/etc. dance.
-                if field_data["type"] == "text_en":
+                if field_data["type"] == "text_german":
                     field_data["type"] = "string"
 
             # If it's a ``FacetField``, make sure we don't postprocess it.
             if hasattr(field_class, "facet_for"):
                 # If it's text, it ought to be a string.
-                if field_data["type"] == "text_en":
+                if field_data["type"] == "text_german":
                     field_data["type"] = "string"
 
             schema_fields.append(field_data)